@@ -1,16 +1,26 @@
 # routers/jobs.py
-from fastapi import APIRouter, Depends, HTTPException, Query
-from typing import List, Optional
-from sqlalchemy.orm import Session
+from datetime import datetime
 
-from app.db.database import get_db
+from fastapi import APIRouter, Depends, HTTPException, Query, Header, Response
+from fastapi.responses import StreamingResponse
+from typing import List, Optional, Literal
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.cache.redis_service import RedisService, get_redis_service
+from app.core.logging_config import get_sampled_logger
+from app.core.metrics import TimedRoute
+from app.db.database import get_db, get_read_db, get_read_sessionmaker, mark_read_your_writes
 from app.middleware.auth_middleware import require_auth
 from app.model.models import JobOffer, JobApplication
 from app.model.schemas import JobCreate, Job, JobUpdate, SearchResponse, JobApplicationResponse, JobApplicationCreate, \
-    ApplicationRequest
+    ApplicationRequest, JobBatchRequest, UserApplicationResponse, RecommendRequest, JobRecommendation, SavedSearch, \
+    SavedSearchCreate, PlaceResponse
 from app.services import job_service
+from app.services.job_stream import JOB_STREAM_ENABLED, hub
+
+router = APIRouter(prefix="/jobs", tags=["jobs"], route_class=TimedRoute)
 
-router = APIRouter(prefix="/jobs", tags=["jobs"])
+logger = get_sampled_logger(__name__)
 
 
 @router.get("/", response_model=List[Job])
@@ -18,89 +28,262 @@ async def list_jobs(
         skip: int = Query(0, ge=0),
         limit: int = Query(10, ge=1, le=100),
         active_only: bool = Query(True),
-        db: Session = Depends(get_db),
+        db: Session = Depends(get_read_db),
 ):
     jobs = await job_service.get_jobs(db, skip, limit, active_only)
 
     return jobs
 
 
+@router.get("/export")
+async def export_jobs(
+        fmt: Literal["ndjson", "csv"] = Query("ndjson", alias="format"),
+        active: Optional[bool] = Query(None),
+        since: Optional[datetime] = Query(None, description="Solo trabajos con updated_at >= since"),
+        source: Optional[str] = Query(None),
+        session_factory: sessionmaker = Depends(get_read_sessionmaker),
+):
+    """
+    Exporta el catálogo completo en streaming (NDJSON o CSV) con memoria constante.
+    """
+    media_type = "text/csv" if fmt == "csv" else "application/x-ndjson"
+    return StreamingResponse(
+        job_service.export_jobs(
+            fmt=fmt, active=active, since=since, source=source,
+            session_factory=session_factory
+        ),
+        media_type=media_type
+    )
+
+
+@router.post("/batch", response_model=List[Optional[Job]])
+async def get_jobs_batch(
+        request: JobBatchRequest,
+        db: Session = Depends(get_read_db),
+        redis_service: RedisService = Depends(get_redis_service)
+):
+    """
+    Resuelve varios trabajos por ID en un solo viaje.
+    Respeta el orden de la solicitud y devuelve null para los IDs inexistentes.
+    """
+    return await job_service.get_jobs_by_ids(db, request.ids, redis_service)
+
+
+@router.post("/recommend", response_model=List[JobRecommendation])
+async def recommend_jobs(
+        request: RecommendRequest,
+        db: Session = Depends(get_read_db),
+        redis_service: RedisService = Depends(get_redis_service)
+):
+    """
+    Recomienda ofertas activas para una lista de skills (p. ej. ProfileData.skills),
+    ordenadas por similitud TF-IDF con sus requisitos. Requiere READ_MODEL_ENABLED.
+    """
+    return await job_service.recommend_jobs(db, redis_service, request)
+
+
+@router.get("/trending", response_model=List[Job])
+async def get_trending_jobs(
+        limit: int = Query(10, ge=1, le=100),
+        db: Session = Depends(get_read_db),
+        redis_service: RedisService = Depends(get_redis_service)
+):
+    """
+    Lista los trabajos con más aplicaciones.
+    """
+    return await job_service.get_trending_jobs(db, redis_service, limit)
+
+
+@router.post("/saved-searches", response_model=SavedSearch, status_code=201)
+async def create_saved_search(
+        request: SavedSearchCreate,
+        response: Response,
+        db: Session = Depends(get_db),
+        user: dict = Depends(require_auth())
+):
+    """
+    Guarda una búsqueda (mismos criterios que /jobs/search/val). Cada oferta
+    nueva que la cumpla genera un evento SAVED_SEARCH_MATCHED en `job-alerts`.
+    """
+    saved_search = await job_service.create_saved_search(db, user.get("userId"), request)
+    mark_read_your_writes(response)
+    return saved_search
+
+
+@router.get("/saved-searches", response_model=List[SavedSearch])
+async def list_saved_searches(
+        db: Session = Depends(get_read_db),
+        user: dict = Depends(require_auth())
+):
+    """
+    Lista las búsquedas guardadas del usuario autenticado.
+    """
+    return await job_service.get_saved_searches(db, user.get("userId"))
+
+
+@router.delete("/saved-searches/{saved_search_id}", status_code=204)
+async def delete_saved_search(
+        saved_search_id: str,
+        response: Response,
+        db: Session = Depends(get_db),
+        user: dict = Depends(require_auth())
+):
+    """
+    Elimina una búsqueda guardada del usuario autenticado.
+    """
+    await job_service.delete_saved_search(db, user.get("userId"), saved_search_id)
+    mark_read_your_writes(response)
+
+
+@router.get("/stream")
+async def stream_jobs(
+        q: Optional[str] = Query(None, max_length=100),
+        location: Optional[str] = Query(None, max_length=100),
+        is_remote: Optional[bool] = None
+):
+    """
+    Server-Sent Events con las ofertas nuevas que cumplen el filtro (misma
+    semántica que /jobs/search/val), en lugar de consultar la búsqueda
+    periódicamente. Un cliente que no lee a tiempo recibe `dropped` y se desconecta.
+    """
+    subscription = hub.subscribe(q, location, is_remote) if JOB_STREAM_ENABLED else None
+    if subscription is None:
+        raise HTTPException(status_code=503, detail="Stream de ofertas no disponible")
+    return StreamingResponse(
+        hub.events(subscription),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @router.get("/{job_id}", response_model=Job)
 async def get_job_by_id(
         job_id: str,
-        db: Session = Depends(get_db)
+        db: Session = Depends(get_read_db),
+        redis_service: RedisService = Depends(get_redis_service)
 ):
     """
     Recupera un trabajo específico por su ID.
     """
-    job = await job_service.get_job_by_id(db, job_id)
+    job = await job_service.get_job_cached(db, job_id, redis_service)
     if not job:
         raise HTTPException(status_code=404, detail="Job not found")
     return job
 
 
+@router.get("/{job_id}/similar", response_model=List[Job])
+async def get_similar_jobs(
+        job_id: str,
+        limit: int = Query(10, ge=1, le=50),
+        db: Session = Depends(get_read_db),
+        redis_service: RedisService = Depends(get_redis_service)
+):
+    """
+    Ofertas similares a una oferta (título, descripción y requisitos), de
+    mayor a menor similitud. Las listas se precalculan en segundo plano.
+    """
+    return await job_service.get_similar_jobs(db, redis_service, job_id, limit)
+
+
 @router.get("/search/val", response_model=SearchResponse)
 async def search_jobs(
         q: Optional[str] = None,
         location: Optional[str] = None,
         page: int = 1,
         limit: int = 10,
-        db: Session = Depends(get_db)
+        is_remote: Optional[bool] = None,
+        job_type: Optional[str] = None,
+        level: Optional[str] = None,
+        facets: bool = Query(False, description="Incluye conteos por job_type, level, is_remote, location y company"),
+        salary_min: Optional[int] = Query(None, ge=0, description="Salario mensual mínimo aceptado"),
+        salary_max: Optional[int] = Query(None, ge=0, description="Salario mensual máximo aceptado"),
+        salary_currency: Optional[str] = Query(None, min_length=3, max_length=3, description="Código ISO, p. ej. PEN; con salary_min/salary_max, por defecto SALARY_DEFAULT_CURRENCY"),
+        place: Optional[str] = Query(None, description="place_id o nombre del lugar; incluye los lugares que contiene"),
+        radius_km: Optional[float] = Query(None, gt=0, le=1000, description="Con `place`: lugares a esta distancia"),
+        db: Session = Depends(get_read_db),
+        redis_service: RedisService = Depends(get_redis_service)
 ):
-    offset = (page - 1) * limit
-    print(f"offset: {offset}")
-    print(f"q: {q}")
-    print(f"location: {location}")
-    result = job_service.search_jobs(db, q, location, offset, limit)
-    return result
+    logger.debug("Búsqueda q=%s location=%s page=%d", q, location, page)
+    return await job_service.search_jobs_cached(
+        db, redis_service, q, location, page, limit, is_remote, job_type, level, facets,
+        salary_min, salary_max, salary_currency.upper() if salary_currency else None, place, radius_km
+    )
 
 
 @router.get("/jobs/suggest", response_model=List[str])
 async def suggest_terms(
         query: str,
-        db: Session = Depends(get_db)
+        db: Session = Depends(get_read_db),
+        redis_service: RedisService = Depends(get_redis_service)
 ):
-    terms = db.query(JobOffer.title).distinct().filter(JobOffer.title.ilike(f"%{query}%")).all()
-    return [term[0] for term in terms]
+    return await job_service.suggest(db, "titles", query, redis_service)
 
 
 @router.get("/locations/suggest", response_model=List[str])
 async def suggest_locations(
         query: str,
-        db: Session = Depends(get_db)
+        db: Session = Depends(get_read_db),
+        redis_service: RedisService = Depends(get_redis_service)
 ):
-    locations = db.query(JobOffer.location).distinct().filter(JobOffer.location.ilike(f"%{query}%")).all()
-    return [location[0] for location in locations]
+    return await job_service.suggest(db, "locations", query, redis_service)
+
+
+@router.get("/locations/resolve", response_model=PlaceResponse)
+async def resolve_location(query: str):
+    """Lugar canónico (place_id y coordenadas) de un texto de ubicación, para usar en `place`"""
+    return job_service.resolve_place(query)
 
 
 @router.post("/apply", response_model=JobApplicationResponse)
 async def apply_to_job(
         request: ApplicationRequest,
+        response: Response,
         db: Session = Depends(get_db),
-        user: dict = Depends(require_auth())
+        user: dict = Depends(require_auth()),
+        redis_service: RedisService = Depends(get_redis_service),
+        idempotency_key: Optional[str] = Header(None, max_length=128)
 ):
+    """
+    Aplica a una oferta. Es idempotente: los reintentos (mismo header
+    `Idempotency-Key` o misma oferta) devuelven la aplicación original.
+    """
     try:
         user_id = user.get("userId")
-        print(f"user_id: {user_id}")
         application_data = request.application_data
         profile_data = request.profile_data.dict()
+        logger.debug("Usuario %s aplica a la oferta %s", user_id, application_data.job_offer_id)
 
-        print(f"application_data: {application_data}")
-        print(f"profile_data: {profile_data}")
-
-        application = await job_service.create_application(db, application_data, user_id, profile_data)
+        application = await job_service.create_application(
+            db, application_data, user_id, profile_data, redis_service, idempotency_key
+        )
+        mark_read_your_writes(response)
         return application
+    except HTTPException:
+        raise
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
-        print(f"Error interno: {e}")
+        logger.exception("Error interno al aplicar a la oferta: %s", e)
         raise HTTPException(status_code=500, detail="Error interno al procesar la solicitud")
 
 
+@router.get("/applications/me", response_model=List[UserApplicationResponse])
+async def list_my_applications(
+        skip: int = Query(0, ge=0),
+        limit: int = Query(10, ge=1, le=100),
+        db: Session = Depends(get_read_db),
+        user: dict = Depends(require_auth())
+):
+    """
+    Lista las aplicaciones del usuario autenticado junto con su oferta.
+    """
+    return await job_service.get_user_applications(db, user.get("userId"), skip, limit)
+
+
 @router.get("/application/{application_id}/job-offer", response_model=Job)
 async def get_job_offer_by_application_id(
         application_id: str,
-        db: Session = Depends(get_db)
+        db: Session = Depends(get_read_db)
 ):
     """
     Recupera la oferta de trabajo asociada a un ID de aplicación.
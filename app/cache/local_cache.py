@@ -0,0 +1,95 @@
+# local_cache.py
+"""
+Caché en memoria del proceso (TTL + LRU) delante de Redis.
+
+Evita el viaje a Redis para las fichas y búsquedas más pedidas. Cada worker
+tiene la suya, así que los TTL son cortos: un cambio en una oferta tarda a lo
+sumo el TTL en verse.
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Iterable, Optional
+
+from app.core.metrics import registry
+
+# TTL y tamaño máximo de las cachés locales
+LOCAL_JOB_CACHE_TTL = float(os.getenv("LOCAL_JOB_CACHE_TTL", 30))
+LOCAL_JOB_CACHE_SIZE = int(os.getenv("LOCAL_JOB_CACHE_SIZE", 10000))
+LOCAL_SEARCH_CACHE_TTL = float(os.getenv("LOCAL_SEARCH_CACHE_TTL", 30))
+LOCAL_SEARCH_CACHE_SIZE = int(os.getenv("LOCAL_SEARCH_CACHE_SIZE", 1000))
+LOCAL_SUGGEST_CACHE_TTL = float(os.getenv("LOCAL_SUGGEST_CACHE_TTL", 60))
+
+cache_requests = registry.counter(
+    "local_cache_requests_total", "Consultas a las cachés en memoria", ("cache", "result")
+)
+cache_entries = registry.gauge("local_cache_entries", "Entradas en las cachés en memoria", ("cache",))
+
+_MISSING = object()
+
+
+class LocalCache:
+    def __init__(self, name: str, ttl: float, max_size: int):
+        self.name = name
+        self.ttl = ttl
+        self.max_size = max_size
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Devuelve el valor vigente y lo marca como usado recientemente"""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is not _MISSING:
+                expires_at, value = entry
+                if expires_at > now:
+                    self._data.move_to_end(key)
+                    cache_requests.inc(cache=self.name, result="hit")
+                    return value
+                del self._data[key]
+        cache_requests.inc(cache=self.name, result="miss")
+        return default
+
+    def get_many(self, keys: Iterable[Hashable]) -> Dict[Hashable, Any]:
+        """Valores vigentes de `keys`; las claves ausentes o vencidas no aparecen"""
+        found = {}
+        for key in keys:
+            value = self.get(key, _MISSING)
+            if value is not _MISSING:
+                found[key] = value
+        return found
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None):
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            # Desaloja las menos usadas
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+            size = len(self._data)
+        cache_entries.set(size, cache=self.name)
+
+    def set_many(self, items: Dict[Hashable, Any], ttl: Optional[float] = None):
+        for key, value in items.items():
+            self.set(key, value, ttl)
+
+    def delete(self, key: Hashable):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+        cache_entries.set(0, cache=self.name)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+# Instancias globales por tipo de dato
+job_cache = LocalCache("jobs", LOCAL_JOB_CACHE_TTL, LOCAL_JOB_CACHE_SIZE)
+search_cache = LocalCache("search", LOCAL_SEARCH_CACHE_TTL, LOCAL_SEARCH_CACHE_SIZE)
+suggest_cache = LocalCache("suggest", LOCAL_SUGGEST_CACHE_TTL, 2)
@@ -1,6 +1,7 @@
 # redis_service.py
 import json
-from typing import Optional, Dict, Any
+import os
+from typing import Optional, Dict, Any, List
 import logging
 from redis.asyncio import Redis
 
@@ -8,6 +9,23 @@ from app.core.datastore.redis_connector import get_redis_connection
 
 logger = logging.getLogger(__name__)
 
+# Tiempo de vida de las fichas de trabajo cacheadas
+JOB_CACHE_TTL = int(os.getenv("JOB_CACHE_TTL", 300))
+# Sorted set con el ranking de trabajos por número de aplicaciones
+TRENDING_KEY = "jobs:trending"
+TRENDING_SEEDED_KEY = "jobs:trending:seeded"
+# Vigencia de las claves de idempotencia y del filtro de aplicaciones por usuario
+APPLICATION_KEY_TTL = int(os.getenv("APPLICATION_KEY_TTL", 86400))
+# Sorted set con la frecuencia de cada búsqueda, para precargar las más comunes
+POPULAR_SEARCHES_KEY = "search:popular"
+POPULAR_SEARCHES_MAX = int(os.getenv("POPULAR_SEARCHES_MAX", 10000))
+# Vigencia de los resultados de búsqueda y de los términos de sugerencia cacheados
+SEARCH_CACHE_TTL = int(os.getenv("SEARCH_CACHE_TTL", 60))
+SUGGEST_CACHE_TTL = int(os.getenv("SUGGEST_CACHE_TTL", 300))
+# Listas de ofertas similares (sorted set por oferta); vencen si dejan de reconstruirse
+SIMILAR_JOBS_TTL = int(os.getenv("SIMILAR_JOBS_TTL", 172800))
+
+
 class RedisService:
     def __init__(self, redis: Redis):
         self.redis = redis
@@ -22,7 +40,7 @@ class RedisService:
                 ex=86400  # 24 horas de expiración
             )
         except Exception as e:
-            logger.error(f"Error setting user in Redis: {str(e)}")
+            logger.error("Error setting user in Redis: %s", e)
             raise e
 
     async def get_user_info(self, user_id: str) -> Optional[dict]:
@@ -32,9 +50,212 @@ class RedisService:
             data = await self.redis.get(name)
             return json.loads(data) if data else None
         except Exception as e:
-            logger.error(f"Error getting user from Redis: {str(e)}")
+            logger.error("Error getting user from Redis: %s", e)
+            return None
+
+    async def get_jobs(self, job_ids: List[str]) -> List[Optional[dict]]:
+        """Obtiene varios trabajos cacheados con un solo MGET, en el mismo orden"""
+        if not job_ids:
+            return []
+        try:
+            values = await self.redis.mget([f"job:{job_id}" for job_id in job_ids])
+            return [json.loads(value) if value else None for value in values]
+        except Exception as e:
+            logger.error("Error getting jobs from Redis: %s", e)
+            return [None] * len(job_ids)
+
+    async def set_jobs(self, jobs: Dict[str, dict]):
+        """Almacena varios trabajos en Redis usando un pipeline"""
+        if not jobs:
+            return
+        try:
+            async with self.redis.pipeline(transaction=False) as pipe:
+                for job_id, job_data in jobs.items():
+                    pipe.set(f"job:{job_id}", json.dumps(job_data), ex=JOB_CACHE_TTL)
+                await pipe.execute()
+        except Exception as e:
+            logger.error("Error setting jobs in Redis: %s", e)
+
+    async def delete_jobs(self, job_ids: List[str]):
+        """Elimina las fichas cacheadas de varios trabajos"""
+        if not job_ids:
+            return
+        try:
+            await self.redis.delete(*[f"job:{job_id}" for job_id in job_ids])
+        except Exception as e:
+            logger.error("Error deleting jobs from Redis: %s", e)
+
+    async def increment_job_popularity(self, job_id: str, amount: int = 1):
+        """Suma aplicaciones al ranking de trabajos más postulados"""
+        try:
+            await self.redis.zincrby(TRENDING_KEY, amount, job_id)
+        except Exception as e:
+            logger.error("Error incrementing job popularity in Redis: %s", e)
+
+    async def remove_job_popularity(self, job_ids: List[str]):
+        """Saca del ranking trabajos dados de baja o archivados"""
+        if not job_ids:
+            return
+        try:
+            await self.redis.zrem(TRENDING_KEY, *job_ids)
+        except Exception as e:
+            logger.error("Error removing jobs from popularity in Redis: %s", e)
+
+    async def set_job_popularity(self, scores: Dict[str, int]):
+        """Carga puntajes en el ranking (desde applications_count) y lo marca como sembrado"""
+        try:
+            async with self.redis.pipeline(transaction=True) as pipe:
+                if scores:
+                    pipe.zadd(TRENDING_KEY, scores)
+                pipe.set(TRENDING_SEEDED_KEY, 1)
+                await pipe.execute()
+        except Exception as e:
+            logger.error("Error setting job popularity in Redis: %s", e)
+
+    async def is_popularity_seeded(self) -> bool:
+        """Indica si el ranking ya fue sembrado desde la base de datos"""
+        try:
+            return bool(await self.redis.exists(TRENDING_SEEDED_KEY))
+        except Exception as e:
+            logger.error("Error checking job popularity in Redis: %s", e)
+            return False
+
+    async def get_idempotent_application(self, user_id: str, idempotency_key: str) -> Optional[str]:
+        """Obtiene el id de la aplicación creada previamente con una clave de idempotencia"""
+        try:
+            return await self.redis.get(f"idempotency:apply:{user_id}:{idempotency_key}")
+        except Exception as e:
+            logger.error("Error getting idempotency key from Redis: %s", e)
+            return None
+
+    async def set_idempotent_application(self, user_id: str, idempotency_key: str, application_id: str):
+        """Asocia una clave de idempotencia con la aplicación creada"""
+        try:
+            await self.redis.set(
+                f"idempotency:apply:{user_id}:{idempotency_key}",
+                application_id,
+                ex=APPLICATION_KEY_TTL
+            )
+        except Exception as e:
+            logger.error("Error setting idempotency key in Redis: %s", e)
+
+    async def has_applied(self, user_id: str, job_offer_id: str) -> bool:
+        """
+        Filtro rápido de aplicaciones existentes.
+        Un False no es definitivo (el set puede haber expirado): la restricción
+        única de la base es la garantía final.
+        """
+        try:
+            return bool(await self.redis.sismember(f"user:{user_id}:applied", job_offer_id))
+        except Exception as e:
+            logger.error("Error checking applications in Redis: %s", e)
+            return False
+
+    async def mark_applied(self, user_id: str, job_offer_id: str):
+        """Registra en el filtro que el usuario ya aplicó a la oferta"""
+        try:
+            name = f"user:{user_id}:applied"
+            async with self.redis.pipeline(transaction=False) as pipe:
+                pipe.sadd(name, job_offer_id)
+                pipe.expire(name, APPLICATION_KEY_TTL)
+                await pipe.execute()
+        except Exception as e:
+            logger.error("Error marking application in Redis: %s", e)
+
+    async def get_top_jobs(self, limit: int) -> List[str]:
+        """Obtiene los ids de los trabajos con más aplicaciones"""
+        try:
+            return await self.redis.zrevrange(TRENDING_KEY, 0, limit - 1)
+        except Exception as e:
+            logger.error("Error getting top jobs from Redis: %s", e)
+            return []
+
+    async def get_search_result(self, key: str, query: Optional[str] = None) -> Optional[dict]:
+        """
+        Obtiene un resultado de búsqueda cacheado. Con `query`, además suma la
+        búsqueda a la frecuencia de consultas en el mismo viaje.
+        """
+        try:
+            async with self.redis.pipeline(transaction=False) as pipe:
+                if query is not None:
+                    pipe.zincrby(POPULAR_SEARCHES_KEY, 1, query)
+                pipe.get(f"search:result:{key}")
+                data = (await pipe.execute())[-1]
+            return json.loads(data) if data else None
+        except Exception as e:
+            logger.error("Error getting search result from Redis: %s", e)
             return None
 
+    async def set_search_result(self, key: str, result: dict):
+        """Almacena un resultado de búsqueda ya serializado"""
+        try:
+            await self.redis.set(f"search:result:{key}", json.dumps(result), ex=SEARCH_CACHE_TTL)
+        except Exception as e:
+            logger.error("Error setting search result in Redis: %s", e)
+
+    async def get_popular_searches(self, limit: int) -> List[str]:
+        """
+        Obtiene las búsquedas más frecuentes y recorta el ranking a
+        POPULAR_SEARCHES_MAX para que no crezca sin límite.
+        """
+        try:
+            async with self.redis.pipeline(transaction=False) as pipe:
+                pipe.zremrangebyrank(POPULAR_SEARCHES_KEY, 0, -POPULAR_SEARCHES_MAX - 1)
+                pipe.zrevrange(POPULAR_SEARCHES_KEY, 0, limit - 1)
+                _, queries = await pipe.execute()
+            return queries
+        except Exception as e:
+            logger.error("Error getting popular searches from Redis: %s", e)
+            return []
+
+    async def get_suggest_terms(self, kind: str) -> Optional[List[str]]:
+        """Obtiene la lista de términos de sugerencia (títulos o ubicaciones)"""
+        try:
+            data = await self.redis.get(f"suggest:{kind}")
+            return json.loads(data) if data else None
+        except Exception as e:
+            logger.error("Error getting suggest terms from Redis: %s", e)
+            return None
+
+    async def set_suggest_terms(self, kind: str, terms: List[str]):
+        """Almacena la lista de términos de sugerencia"""
+        try:
+            await self.redis.set(f"suggest:{kind}", json.dumps(terms), ex=SUGGEST_CACHE_TTL)
+        except Exception as e:
+            logger.error("Error setting suggest terms in Redis: %s", e)
+
+    async def get_similar_jobs(self, job_id: str, limit: int) -> List[str]:
+        """Ids de las ofertas más similares a una oferta, de mayor a menor similitud"""
+        try:
+            return await self.redis.zrevrange(f"job:similar:{job_id}", 0, limit - 1)
+        except Exception as e:
+            logger.error("Error getting similar jobs from Redis: %s", e)
+            return []
+
+    async def set_similar_jobs(self, neighbors: Dict[str, Dict[str, float]]):
+        """Reemplaza las listas de ofertas similares (id -> {vecino: similitud}) con un pipeline"""
+        if not neighbors:
+            return
+        try:
+            async with self.redis.pipeline(transaction=False) as pipe:
+                for job_id, scores in neighbors.items():
+                    name = f"job:similar:{job_id}"
+                    pipe.delete(name)
+                    if scores:
+                        pipe.zadd(name, scores)
+                        pipe.expire(name, SIMILAR_JOBS_TTL)
+                await pipe.execute()
+        except Exception as e:
+            logger.error("Error setting similar jobs in Redis: %s", e)
+
+    async def publish(self, channel: str, message: str):
+        """Publica un mensaje en un canal de pub/sub"""
+        try:
+            await self.redis.publish(channel, message)
+        except Exception as e:
+            logger.error("Error publishing to Redis channel %s: %s", channel, e)
+
+
 async def get_redis_service() -> RedisService:
     """Factory para obtener una instancia de RedisService"""
     redis = await get_redis_connection()
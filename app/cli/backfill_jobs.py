@@ -0,0 +1,169 @@
+# cli/backfill_jobs.py
+"""
+Carga masiva de eventos de trabajos desde archivos NDJSON (opcionalmente .gz).
+
+Valida cada evento JOB_CREATED con las mismas reglas que el consumidor de Kafka,
+lo copia con COPY a una tabla temporal y lo fusiona en job_offers con un
+INSERT ... ON CONFLICT por bloque.
+
+Uso:
+    python -m app.cli.backfill_jobs dump-1.ndjson dump-2.ndjson.gz --chunk-size 50000
+"""
+import argparse
+import gzip
+import io
+import json
+import logging
+import sys
+import time
+from datetime import datetime
+from typing import Iterator, Tuple, Dict, Any, List
+
+from app.db.database import engine
+from app.services.job_ingestion import JOB_COLUMNS, UPSERT_UPDATE_COLUMNS, validate_job_batch
+
+logger = logging.getLogger(__name__)
+
+COPY_COLUMNS = JOB_COLUMNS
+STAGING_TABLE = "job_offers_staging"
+CREATE_STAGING_SQL = (
+    f"CREATE TEMP TABLE IF NOT EXISTS {STAGING_TABLE} "
+    "(LIKE public.job_offers INCLUDING DEFAULTS) ON COMMIT DELETE ROWS"
+)
+COPY_SQL = f"COPY {STAGING_TABLE} ({', '.join(COPY_COLUMNS)}) FROM STDIN"
+MERGE_SQL = (
+    f"INSERT INTO public.job_offers ({', '.join(COPY_COLUMNS)}) "
+    f"SELECT {', '.join(COPY_COLUMNS)} FROM {STAGING_TABLE} "
+    "ON CONFLICT (id) DO UPDATE SET "
+    + ", ".join(f"{column} = EXCLUDED.{column}" for column in UPSERT_UPDATE_COLUMNS)
+)
+
+
+def iter_events(paths: List[str]) -> Iterator[Tuple[str, int, Dict[str, Any]]]:
+    """Lee los archivos línea por línea; devuelve (archivo, línea, evento)"""
+    for path in paths:
+        opener = gzip.open if path.endswith(".gz") else open
+        with opener(path, "rt", encoding="utf-8") as file:
+            for line_number, line in enumerate(file, start=1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    yield path, line_number, json.loads(line)
+                except json.JSONDecodeError as e:
+                    logger.warning("%s:%d: JSON inválido: %s", path, line_number, e)
+
+
+def _copy_value(value: Any) -> str:
+    """Codifica un valor en el formato de texto de COPY"""
+    if value is None:
+        return "\\N"
+    if isinstance(value, bool):
+        return "t" if value else "f"
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, list):
+        value = "{" + ",".join(
+            '"' + str(item).replace("\\", "\\\\").replace('"', '\\"') + '"' for item in value
+        ) + "}"
+    return (
+        str(value)
+        .replace("\\", "\\\\")
+        .replace("\t", "\\t")
+        .replace("\n", "\\n")
+        .replace("\r", "\\r")
+    )
+
+
+def load_chunk(connection, rows: List[tuple]):
+    """Copia un bloque a la tabla temporal y lo fusiona en job_offers en una transacción"""
+    # Por id, para que el ON CONFLICT no toque la misma fila dos veces: gana el último
+    unique_rows = {row[0]: row for row in rows}
+    buffer = io.StringIO()
+    for row in unique_rows.values():
+        buffer.write("\t".join(_copy_value(value) for value in row))
+        buffer.write("\n")
+    buffer.seek(0)
+
+    cursor = connection.cursor()
+    try:
+        cursor.copy_expert(COPY_SQL, buffer)
+        cursor.execute(MERGE_SQL)
+        connection.commit()
+    except Exception:
+        connection.rollback()
+        raise
+    finally:
+        cursor.close()
+    return len(unique_rows)
+
+
+def backfill(paths: List[str], chunk_size: int) -> Dict[str, int]:
+    stats = {"read": 0, "loaded": 0, "skipped": 0, "invalid": 0}
+    started_at = time.perf_counter()
+    connection = engine.raw_connection()
+    try:
+        cursor = connection.cursor()
+        cursor.execute(CREATE_STAGING_SQL)
+        cursor.close()
+        connection.commit()
+
+        events: List[Dict[str, Any]] = []
+        positions: List[str] = []
+        for path, line_number, event in iter_events(paths):
+            stats["read"] += 1
+            if not isinstance(event, dict):
+                # JSON válido pero no un objeto (escalar o lista): no es un evento
+                logger.warning("%s:%d: el evento no es un objeto JSON", path, line_number)
+                stats["invalid"] += 1
+                continue
+            if event.get("type") != "JOB_CREATED":
+                stats["skipped"] += 1
+                continue
+            events.append(event)
+            positions.append(f"{path}:{line_number}")
+            if len(events) >= chunk_size:
+                _load_events(connection, events, positions, stats)
+                events, positions = [], []
+                _report_progress(stats, started_at)
+
+        if events:
+            _load_events(connection, events, positions, stats)
+        _report_progress(stats, started_at)
+    finally:
+        connection.close()
+    return stats
+
+
+def _load_events(connection, events: List[Dict[str, Any]], positions: List[str], stats: Dict[str, int]):
+    """Valida un bloque de eventos en lote y carga las filas válidas"""
+    batch = validate_job_batch(events)
+    for error in batch.errors:
+        logger.warning("%s: evento inválido: %d errores", positions[error.index], len(error.errors))
+    stats["invalid"] += len(batch.errors)
+    if batch.rows:
+        stats["loaded"] += load_chunk(connection, batch.rows)
+
+
+def _report_progress(stats: Dict[str, int], started_at: float):
+    elapsed = time.perf_counter() - started_at
+    rate = stats["loaded"] / elapsed if elapsed else 0.0
+    print(
+        f"{stats['loaded']} filas cargadas ({rate:,.0f} filas/s) | "
+        f"{stats['read']} leídas, {stats['invalid']} inválidas, {stats['skipped']} omitidas | {elapsed:.1f}s",
+        file=sys.stderr
+    )
+
+
+def main(argv: List[str] = None):
+    parser = argparse.ArgumentParser(description="Carga masiva de eventos de trabajos vía COPY")
+    parser.add_argument("paths", nargs="+", help="Archivos NDJSON de eventos (admite .gz)")
+    parser.add_argument("--chunk-size", type=int, default=50000, help="Filas por COPY + merge")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    backfill(args.paths, args.chunk_size)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+# cli/geocode_locations.py
+"""
+Rellena el lugar canónico (place_id, latitude, longitude) de las ofertas
+desde `location`, por lotes.
+
+Recorre job_offers por id (paginación por clave, sin OFFSET), resuelve cada
+lote contra el gazetteer y lo escribe en un executemany que solo toca las
+filas cuyo lugar cambió. Cada lote es su propia transacción, así que se
+puede interrumpir y volver a lanzar. Sin --all solo visita las filas aún sin
+lugar; con --all resuelve todas (tras editar el gazetteer).
+
+Uso:
+    python -m app.cli.geocode_locations
+    python -m app.cli.geocode_locations --all --batch-size 10000
+"""
+import argparse
+import logging
+import sys
+import time
+from typing import Dict, List
+
+from sqlalchemy import bindparam, or_, select, update
+
+from app.db.database import engine
+from app.model.models import JobOffer
+from app.services.location_normalizer import LOCATION_COLUMNS, location_columns
+
+logger = logging.getLogger(__name__)
+
+table = JobOffer.__table__
+UPDATE_LOCATION = (
+    update(table)
+    .where(table.c.id == bindparam("b_id"))
+    .where(or_(*[table.c[column].is_distinct_from(bindparam(f"b_{column}")) for column in LOCATION_COLUMNS]))
+    .values(**{column: bindparam(f"b_{column}") for column in LOCATION_COLUMNS})
+)
+
+
+def geocode(batch_size: int, geocode_all: bool) -> Dict[str, int]:
+    stats = {"read": 0, "updated": 0, "unresolved": 0}
+    started_at = time.perf_counter()
+    stmt = select(table.c.id, table.c.location).where(table.c.location.isnot(None))
+    if not geocode_all:
+        stmt = stmt.where(table.c.place_id.is_(None))
+    stmt = stmt.order_by(table.c.id).limit(batch_size)
+
+    last_id = None
+    while True:
+        with engine.begin() as connection:
+            page = stmt if last_id is None else stmt.where(table.c.id > last_id)
+            rows = connection.execute(page).all()
+            if not rows:
+                break
+            params: List[Dict] = []
+            for job_id, location in rows:
+                columns = location_columns(location)
+                if columns["place_id"] is None:
+                    stats["unresolved"] += 1
+                params.append({"b_id": job_id, **{f"b_{column}": value for column, value in columns.items()}})
+            stats["updated"] += connection.execute(UPDATE_LOCATION, params).rowcount
+        stats["read"] += len(rows)
+        last_id = rows[-1].id
+        _report_progress(stats, started_at)
+    return stats
+
+
+def _report_progress(stats: Dict[str, int], started_at: float):
+    elapsed = time.perf_counter() - started_at
+    print(
+        f"{stats['read']} filas leídas ({stats['read'] / elapsed if elapsed else 0:,.0f} filas/s) | "
+        f"{stats['updated']} actualizadas, {stats['unresolved']} sin lugar reconocible | {elapsed:.1f}s",
+        file=sys.stderr
+    )
+
+
+def main(argv: List[str] = None):
+    parser = argparse.ArgumentParser(description="Rellena el lugar canónico desde location")
+    parser.add_argument("--batch-size", type=int, default=5000, help="Filas por lote (y por transacción)")
+    parser.add_argument("--all", dest="geocode_all", action="store_true",
+                        help="Resuelve también las filas que ya tienen lugar")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    geocode(args.batch_size, args.geocode_all)
+
+
+if __name__ == "__main__":
+    main()
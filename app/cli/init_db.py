@@ -0,0 +1,28 @@
+# cli/init_db.py
+"""
+Crea la base de datos y las tablas y aplica SCHEMA_UPGRADES.
+
+Pensado para ejecutarse una vez por despliegue con DB_INIT_ON_STARTUP=false,
+así los workers no repiten el DDL al arrancar.
+
+Uso:
+    python -m app.cli.init_db
+"""
+import logging
+import time
+
+from app.core.logging_config import configure_logging
+from app.db.database import init_db
+
+logger = logging.getLogger(__name__)
+
+
+def main():
+    configure_logging()
+    started_at = time.perf_counter()
+    init_db()
+    logger.info("Esquema inicializado en %.3f s", time.perf_counter() - started_at)
+
+
+if __name__ == "__main__":
+    main()
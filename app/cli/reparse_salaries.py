@@ -0,0 +1,88 @@
+# cli/reparse_salaries.py
+"""
+Rellena las columnas de salario normalizado (salary_min, salary_max,
+salary_currency, salary_period) desde `salary_range`, por lotes.
+
+Recorre job_offers por id (paginación por clave, sin OFFSET), interpreta cada
+lote en Python y lo escribe en un executemany que solo toca las filas cuyo
+resultado cambió. Cada lote es su propia transacción, así que se puede
+interrumpir y volver a lanzar. Sin --all solo visita las filas aún sin
+interpretar; con --all reinterpreta todas (tras mejorar el parser).
+
+Uso:
+    python -m app.cli.reparse_salaries
+    python -m app.cli.reparse_salaries --all --batch-size 10000
+"""
+import argparse
+import logging
+import sys
+import time
+from typing import Dict, List
+
+from sqlalchemy import bindparam, or_, select, update
+
+from app.db.database import engine
+from app.model.models import JobOffer
+from app.services.salary_parser import SALARY_COLUMNS, salary_columns
+
+logger = logging.getLogger(__name__)
+
+table = JobOffer.__table__
+UPDATE_SALARY = (
+    update(table)
+    .where(table.c.id == bindparam("b_id"))
+    .where(or_(*[table.c[column].is_distinct_from(bindparam(f"b_{column}")) for column in SALARY_COLUMNS]))
+    .values(**{column: bindparam(f"b_{column}") for column in SALARY_COLUMNS})
+)
+
+
+def reparse(batch_size: int, reparse_all: bool) -> Dict[str, int]:
+    stats = {"read": 0, "updated": 0, "unparsed": 0}
+    started_at = time.perf_counter()
+    stmt = select(table.c.id, table.c.salary_range).where(table.c.salary_range.isnot(None))
+    if not reparse_all:
+        stmt = stmt.where(table.c.salary_currency.is_(None))
+    stmt = stmt.order_by(table.c.id).limit(batch_size)
+
+    last_id = None
+    while True:
+        with engine.begin() as connection:
+            page = stmt if last_id is None else stmt.where(table.c.id > last_id)
+            rows = connection.execute(page).all()
+            if not rows:
+                break
+            params: List[Dict] = []
+            for job_id, salary_range in rows:
+                columns = salary_columns(salary_range)
+                if columns["salary_currency"] is None:
+                    stats["unparsed"] += 1
+                params.append({"b_id": job_id, **{f"b_{column}": value for column, value in columns.items()}})
+            stats["updated"] += connection.execute(UPDATE_SALARY, params).rowcount
+        stats["read"] += len(rows)
+        last_id = rows[-1].id
+        _report_progress(stats, started_at)
+    return stats
+
+
+def _report_progress(stats: Dict[str, int], started_at: float):
+    elapsed = time.perf_counter() - started_at
+    print(
+        f"{stats['read']} filas leídas ({stats['read'] / elapsed if elapsed else 0:,.0f} filas/s) | "
+        f"{stats['updated']} actualizadas, {stats['unparsed']} sin salario reconocible | {elapsed:.1f}s",
+        file=sys.stderr
+    )
+
+
+def main(argv: List[str] = None):
+    parser = argparse.ArgumentParser(description="Rellena el salario normalizado desde salary_range")
+    parser.add_argument("--batch-size", type=int, default=5000, help="Filas por lote (y por transacción)")
+    parser.add_argument("--all", dest="reparse_all", action="store_true",
+                        help="Reinterpreta también las filas ya interpretadas")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    reparse(args.batch_size, args.reparse_all)
+
+
+if __name__ == "__main__":
+    main()
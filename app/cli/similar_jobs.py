@@ -0,0 +1,51 @@
+# cli/similar_jobs.py
+"""
+Calcula las listas de ofertas similares y las publica en Redis.
+
+Sin argumentos queda corriendo: construye el índice, enlaza las ofertas que
+llegan por `job-events` y lo reconstruye cada SIMILAR_JOBS_REBUILD_SECONDS.
+Con --once solo construye y publica (para un cron).
+
+Uso:
+    python -m app.cli.similar_jobs
+    python -m app.cli.similar_jobs --once
+"""
+import argparse
+import asyncio
+import logging
+import time
+
+from app.cache.redis_service import get_redis_service
+from app.core.datastore.redis_connector import redis_connector
+from app.core.logging_config import configure_logging
+from app.event.consumers.job_similarity_consumer import JobSimilarityConsumer, publish_neighbors
+from app.services.similar_jobs import load_index
+
+logger = logging.getLogger(__name__)
+
+
+async def run(once: bool):
+    await redis_connector.init_redis_pool()
+    try:
+        redis_service = await get_redis_service()
+        if not once:
+            await JobSimilarityConsumer(redis_service).start()
+            return
+        started_at = time.perf_counter()
+        index = await asyncio.to_thread(load_index)
+        await publish_neighbors(redis_service, index, index.ids)
+        logger.info("%d listas publicadas en %.2f s", index.size, time.perf_counter() - started_at)
+    finally:
+        await redis_connector.pool.disconnect()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--once", action="store_true", help="Construye y publica una vez, sin seguir los eventos")
+    args = parser.parse_args()
+    configure_logging()
+    asyncio.run(run(args.once))
+
+
+if __name__ == "__main__":
+    main()
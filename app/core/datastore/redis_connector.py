@@ -1,7 +1,31 @@
 # redis_connector.py
 from redis.asyncio import Redis, ConnectionPool
+from redis.asyncio.client import Pipeline
 import os
 
+from app.core.metrics import track
+from app.core.tracing import client_span
+
+
+class TimedPipeline(Pipeline):
+    """Pipeline que suma su ejecución al tiempo de Redis de la solicitud"""
+
+    async def execute(self, raise_on_error: bool = True):
+        with track("redis"), client_span("redis pipeline", {"db.system.name": "redis",
+                                                             "db.operation.batch.size": len(self.command_stack)}):
+            return await super().execute(raise_on_error)
+
+
+class TimedRedis(Redis):
+    """Cliente Redis que suma cada comando al tiempo de Redis de la solicitud"""
+
+    async def execute_command(self, *args, **options):
+        with track("redis"), client_span(f"redis {args[0]}", {"db.system.name": "redis"}):
+            return await super().execute_command(*args, **options)
+
+    def pipeline(self, transaction: bool = True, shard_hint=None) -> TimedPipeline:
+        return TimedPipeline(self.connection_pool, self.response_callbacks, transaction, shard_hint)
+
 
 class RedisConnector:
     def __init__(self):
@@ -23,7 +47,7 @@ class RedisConnector:
         """Obtiene una conexión Redis del pool"""
         if not self.pool:
             await self.init_redis_pool()
-        return Redis(connection_pool=self.pool)
+        return TimedRedis(connection_pool=self.pool)
 
 
 # Instancia global del conector
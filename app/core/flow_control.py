@@ -0,0 +1,98 @@
+# flow_control.py
+"""
+Control adaptativo (AIMD) del ritmo de un consumidor de Kafka que escribe en
+Postgres.
+
+Dos límites: registros por lote (`batch_size`) y lotes en escritura a la vez
+(`concurrency`). Cada lote lleno que se confirma por debajo de
+CONSUMER_LATENCY_TARGET_SECONDS suma un paso: primero al lote, hasta
+CONSUMER_BATCH_MAX, y luego a la concurrencia. Un lote lento reduce a la mitad
+la concurrencia (o el lote, si ya es 1). Un error reduce ambos a la mitad y
+activa una espera exponencial que se reinicia con el primer lote correcto.
+Los límites y la latencia se exponen en /metrics con la etiqueta `consumer`.
+"""
+import os
+
+from app.core.metrics import registry
+
+CONSUMER_BATCH_MIN = int(os.getenv("CONSUMER_BATCH_MIN", 10))
+CONSUMER_BATCH_MAX = int(os.getenv("CONSUMER_BATCH_MAX", 1000))
+# Incremento aditivo del lote tras cada lote lleno y rápido
+CONSUMER_BATCH_STEP = int(os.getenv("CONSUMER_BATCH_STEP", 50))
+CONSUMER_CONCURRENCY_MAX = int(os.getenv("CONSUMER_CONCURRENCY_MAX", 4))
+# Latencia de escritura por lote a partir de la cual se considera que la base está saturada
+CONSUMER_LATENCY_TARGET_SECONDS = float(os.getenv("CONSUMER_LATENCY_TARGET_SECONDS", 0.5))
+CONSUMER_BACKOFF_MAX_SECONDS = float(os.getenv("CONSUMER_BACKOFF_MAX_SECONDS", 30))
+BACKOFF_BASE_SECONDS = 0.5
+DECREASE_FACTOR = 0.5
+
+consumer_batch_limit = registry.gauge("consumer_batch_limit", "Registros por lote permitidos", ["consumer"])
+consumer_concurrency_limit = registry.gauge(
+    "consumer_concurrency_limit", "Lotes en escritura simultánea permitidos", ["consumer"]
+)
+consumer_inflight = registry.gauge("consumer_inflight_batches", "Lotes en escritura", ["consumer"])
+consumer_paused_partitions = registry.gauge(
+    "consumer_paused_partitions", "Particiones pausadas mientras se escribe su lote", ["consumer"]
+)
+consumer_backoff = registry.gauge("consumer_backoff_seconds", "Espera actual tras errores de escritura", ["consumer"])
+consumer_batch_seconds = registry.histogram(
+    "consumer_batch_seconds", "Duración de la escritura de cada lote", ["consumer"]
+)
+consumer_batch_errors = registry.counter("consumer_batch_errors_total", "Lotes cuya escritura falló", ["consumer"])
+
+
+class AimdController:
+    def __init__(
+            self,
+            name: str,
+            batch_min: int = CONSUMER_BATCH_MIN,
+            batch_max: int = CONSUMER_BATCH_MAX,
+            concurrency_max: int = CONSUMER_CONCURRENCY_MAX,
+            latency_target: float = CONSUMER_LATENCY_TARGET_SECONDS
+    ):
+        self.name = name
+        self.batch_min = batch_min
+        self.batch_max = max(batch_min, batch_max)
+        self.concurrency_max = max(1, concurrency_max)
+        self.latency_target = latency_target
+        self.batch_size = batch_min
+        self.concurrency = 1
+        self.backoff = 0.0
+        self._errors = 0
+        self._publish()
+
+    def on_success(self, seconds: float, records: int):
+        """Lote escrito: crece si estaba lleno y fue rápido, se reduce si fue lento"""
+        consumer_batch_seconds.observe(seconds, consumer=self.name)
+        self._errors = 0
+        self.backoff = 0.0
+        if seconds > self.latency_target:
+            if self.concurrency > 1:
+                self.concurrency = max(1, int(self.concurrency * DECREASE_FACTOR))
+            else:
+                self.batch_size = max(self.batch_min, int(self.batch_size * DECREASE_FACTOR))
+        elif records >= self.batch_size:
+            # Solo un lote lleno demuestra que hay trabajo para un límite mayor
+            if self.batch_size < self.batch_max:
+                self.batch_size = min(self.batch_max, self.batch_size + CONSUMER_BATCH_STEP)
+            elif self.concurrency < self.concurrency_max:
+                self.concurrency += 1
+        self._publish()
+
+    def on_error(self):
+        """Lote fallido: ambos límites a la mitad y espera exponencial"""
+        consumer_batch_errors.inc(consumer=self.name)
+        self._errors += 1
+        self.backoff = min(CONSUMER_BACKOFF_MAX_SECONDS, BACKOFF_BASE_SECONDS * 2 ** (self._errors - 1))
+        self.concurrency = max(1, int(self.concurrency * DECREASE_FACTOR))
+        self.batch_size = max(self.batch_min, int(self.batch_size * DECREASE_FACTOR))
+        self._publish()
+
+    def set_inflight(self, batches: int, paused_partitions: int):
+        consumer_inflight.set(batches, consumer=self.name)
+        consumer_paused_partitions.set(paused_partitions, consumer=self.name)
+
+    def _publish(self):
+        consumer_batch_limit.set(self.batch_size, consumer=self.name)
+        consumer_concurrency_limit.set(self.concurrency, consumer=self.name)
+        consumer_backoff.set(self.backoff, consumer=self.name)
@@ -0,0 +1,134 @@
+# logging_config.py
+"""
+Configuración central de logging.
+
+Los módulos siguen usando `logging.getLogger(__name__)`; aquí se instala un
+único handler cuyo formateador es el `ProcessorFormatter` de structlog, así
+todos los registros salen estructurados (consola o JSON). Los mensajes deben
+usar argumentos `%s` en lugar de f-strings: el formateo solo ocurre si el
+registro se emite.
+"""
+import logging
+import os
+import threading
+import time
+from typing import Dict, Optional
+
+import structlog
+
+# Nivel raíz y niveles por logger: "app.event=WARNING,aiokafka=ERROR"
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_LEVELS = os.getenv("LOG_LEVELS", "")
+# "console" para desarrollo, "json" para producción
+LOG_FORMAT = os.getenv("LOG_FORMAT", "console").lower()
+# Máximo de mensajes INFO por segundo en cada logger muestreado de los caminos calientes
+LOG_HOT_PATH_RATE = float(os.getenv("LOG_HOT_PATH_RATE", 5))
+
+_configured = False
+
+
+def parse_log_levels(spec: str) -> Dict[str, str]:
+    """Convierte "app.event=WARNING,aiokafka=ERROR" en {"app.event": "WARNING", ...}"""
+    levels = {}
+    for item in spec.split(","):
+        name, _, level = item.partition("=")
+        if name.strip() and level.strip():
+            levels[name.strip()] = level.strip().upper()
+    return levels
+
+
+def configure_logging(force: bool = False):
+    """Instala el handler estructurado en el logger raíz (idempotente)"""
+    global _configured
+    if _configured and not force:
+        return
+
+    renderer = (
+        structlog.processors.JSONRenderer(ensure_ascii=False)
+        if LOG_FORMAT == "json"
+        else structlog.dev.ConsoleRenderer(colors=False)
+    )
+    formatter = structlog.stdlib.ProcessorFormatter(
+        processors=[
+            structlog.stdlib.ProcessorFormatter.remove_processors_meta,
+            renderer,
+        ],
+        foreign_pre_chain=[
+            structlog.stdlib.add_log_level,
+            structlog.stdlib.add_logger_name,
+            structlog.processors.TimeStamper(fmt="iso", utc=True),
+            structlog.processors.format_exc_info,
+        ],
+    )
+    handler = logging.StreamHandler()
+    handler.setFormatter(formatter)
+
+    root = logging.getLogger()
+    root.handlers = [handler]
+    root.setLevel(LOG_LEVEL)
+    for name, level in parse_log_levels(LOG_LEVELS).items():
+        logging.getLogger(name).setLevel(level)
+
+    _configured = True
+
+
+class SampledLogger:
+    """
+    Logger para caminos calientes: los mensajes INFO se limitan con un token
+    bucket de `rate` mensajes por segundo y los descartados se informan en el
+    siguiente mensaje emitido. DEBUG se comprueba antes de formatear nada;
+    WARNING y ERROR nunca se muestrean.
+    """
+
+    def __init__(self, logger: logging.Logger, rate: float = LOG_HOT_PATH_RATE):
+        self.logger = logger
+        self.rate = rate
+        self._tokens = rate
+        self._updated_at = time.monotonic()
+        self._dropped = 0
+        self._lock = threading.Lock()
+
+    def _acquire(self) -> Optional[int]:
+        """Devuelve los descartados acumulados si hay cupo, o None si se descarta"""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.rate, self._tokens + (now - self._updated_at) * self.rate)
+            self._updated_at = now
+            if self._tokens < 1:
+                self._dropped += 1
+                return None
+            self._tokens -= 1
+            dropped, self._dropped = self._dropped, 0
+            return dropped
+
+    def isEnabledFor(self, level: int) -> bool:
+        return self.logger.isEnabledFor(level)
+
+    def debug(self, msg: str, *args, **kwargs):
+        if self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.debug(msg, *args, stacklevel=2, **kwargs)
+
+    def info(self, msg: str, *args, **kwargs):
+        if not self.logger.isEnabledFor(logging.INFO):
+            return
+        dropped = self._acquire()
+        if dropped is None:
+            return
+        if dropped:
+            msg = f"{msg} (+%d mensajes similares omitidos)"
+            args = (*args, dropped)
+        self.logger.info(msg, *args, stacklevel=2, **kwargs)
+
+    def warning(self, msg: str, *args, **kwargs):
+        self.logger.warning(msg, *args, stacklevel=2, **kwargs)
+
+    def error(self, msg: str, *args, **kwargs):
+        self.logger.error(msg, *args, stacklevel=2, **kwargs)
+
+    def exception(self, msg: str, *args, **kwargs):
+        self.logger.exception(msg, *args, stacklevel=2, **kwargs)
+
+
+def get_sampled_logger(name: str, rate: float = LOG_HOT_PATH_RATE) -> SampledLogger:
+    """Logger con INFO limitado por tasa para caminos calientes"""
+    return SampledLogger(logging.getLogger(name), rate)
@@ -0,0 +1,147 @@
+# readiness.py
+"""
+Estado de arranque del worker para el probe /ready.
+
+Cada dependencia (base de datos, Redis, productor de Kafka, consumidores,
+caché) se registra como un componente que pasa de "pending" a "ready" o
+"failed". /health sigue siendo el probe de vida; /ready solo responde 200
+cuando todos los componentes requeridos están listos.
+"""
+import asyncio
+import logging
+import time
+from typing import Any, Dict, Optional
+
+from aiokafka import ConsumerRebalanceListener
+
+from app.core.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+PENDING = "pending"
+READY = "ready"
+FAILED = "failed"
+
+startup_seconds = registry.gauge(
+    "app_startup_seconds", "Duración de las fases de arranque del worker", ("phase",)
+)
+
+
+class ReadinessState:
+    def __init__(self):
+        self._components: Dict[str, Dict[str, Any]] = {}
+        self._events: Dict[str, asyncio.Event] = {}
+        self.started_at = time.monotonic()
+        self.ready_at: Optional[float] = None
+        self.timings: Dict[str, float] = {}
+
+    def register(self, name: str, required: bool = True):
+        """Declara un componente pendiente; los no requeridos se informan pero no bloquean /ready"""
+        self._components[name] = {"status": PENDING, "required": required, "detail": None, "seconds": None}
+        self._events.setdefault(name, asyncio.Event())
+
+    def mark_ready(self, name: str, detail: Optional[str] = None):
+        component = self._components.setdefault(name, {"required": True})
+        if component.get("status") != READY:
+            component["seconds"] = round(time.monotonic() - self.started_at, 3)
+            logger.info("Componente %s listo en %.3f s", name, component["seconds"])
+        component.update(status=READY, detail=detail)
+        self._events.setdefault(name, asyncio.Event()).set()
+        if self.ready_at is None and self.is_ready():
+            self.ready_at = time.monotonic()
+            self.record_timing("ready", self.ready_at - self.started_at)
+            logger.info("Worker listo en %.3f s", self.ready_at - self.started_at)
+
+    def record_timing(self, phase: str, seconds: float):
+        """Guarda la duración de una fase de arranque (import, hook de startup, listo)"""
+        self.timings[phase] = round(seconds, 3)
+        startup_seconds.set(seconds, phase=phase)
+
+    def mark_failed(self, name: str, error: BaseException):
+        component = self._components.setdefault(name, {"required": True})
+        component.update(status=FAILED, detail=f"{type(error).__name__}: {error}")
+
+    def is_component_ready(self, name: str) -> bool:
+        return self._components.get(name, {}).get("status") == READY
+
+    def is_ready(self) -> bool:
+        return all(
+            component["status"] == READY
+            for component in self._components.values() if component.get("required", True)
+        )
+
+    async def wait(self, name: str):
+        """Espera a que un componente esté listo (p. ej. la base antes de consumir)"""
+        await self._events.setdefault(name, asyncio.Event()).wait()
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "status": "ready" if self.is_ready() else "starting",
+            "components": {name: dict(component) for name, component in self._components.items()},
+            "timings": dict(self.timings),
+        }
+
+
+class GroupJoinListener(ConsumerRebalanceListener):
+    """
+    Marca listo a un consumidor tras su primera asignación del grupo. La
+    asignación puede venir vacía (más workers que particiones): lo relevante
+    es que el consumidor se unió al grupo.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+
+    async def on_partitions_revoked(self, revoked):
+        pass
+
+    async def on_partitions_assigned(self, assigned):
+        readiness.mark_ready(self.name, f"{len(assigned)} particiones")
+
+
+async def initialize(name: str, init, retry_delay: float = 1.0, max_delay: float = 30.0):
+    """
+    Ejecuta `init()` (corutina) hasta que funcione, con espera exponencial,
+    y marca el componente. No propaga el error: el worker sigue vivo y /ready
+    informa el fallo mientras reintenta.
+    """
+    delay = retry_delay
+    while True:
+        try:
+            await init()
+            readiness.mark_ready(name)
+            return
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            readiness.mark_failed(name, e)
+            logger.error("Error inicializando %s, reintento en %.0f s: %s", name, delay, e)
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, max_delay)
+
+
+async def supervise(name: str, run, retry_delay: float = 1.0, max_delay: float = 30.0):
+    """
+    Mantiene vivo un bucle de larga duración (un consumidor creado por `run()`):
+    si termina o falla, marca el componente como caído y lo reinicia con
+    espera exponencial, que vuelve al mínimo si el componente llegó a estar listo.
+    """
+    delay = retry_delay
+    while True:
+        try:
+            await run()
+            error: BaseException = RuntimeError("el bucle terminó")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            error = e
+        if readiness.is_component_ready(name):
+            delay = retry_delay
+        readiness.mark_failed(name, error)
+        logger.error("%s se detuvo, reinicio en %.0f s: %s", name, delay, error)
+        await asyncio.sleep(delay)
+        delay = min(delay * 2, max_delay)
+
+
+# Instancia global del estado de arranque
+readiness = ReadinessState()
@@ -0,0 +1,178 @@
+# tracing.py
+"""
+Trazas distribuidas con OpenTelemetry.
+
+- FastAPI crea el span HTTP de cada solicitud (con el contexto W3C
+  `traceparent` entrante) y los spans de dependencias, endpoint y
+  serialización; aquí solo se registra el TracerProvider global.
+- SQLAlchemy, Redis y Kafka abren spans hijos únicamente si ya hay un span
+  grabando, así las tareas de fondo sin traza no generan trazas sueltas.
+- El contexto viaja en las cabeceras de los mensajes de Kafka y los
+  consumidores lo continúan.
+- Los spans se exportan en lote (JSON por línea) a TRACE_EXPORT_PATH, que
+  hace de colector local.
+"""
+import logging
+import os
+import sys
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Optional, Tuple
+
+from opentelemetry import context as otel_context, propagate, trace
+from opentelemetry.trace import Link, SpanKind, Status, StatusCode
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+TRACING_ENABLED = os.getenv("TRACING_ENABLED", "false").lower() == "true"
+# Fracción de trazas nuevas que se graban; los hijos respetan la decisión del padre
+TRACE_SAMPLE_RATIO = float(os.getenv("TRACE_SAMPLE_RATIO", 0.1))
+# Archivo JSONL de spans; "-" escribe en stdout
+TRACE_EXPORT_PATH = os.getenv("TRACE_EXPORT_PATH", "traces.jsonl")
+TRACE_SERVICE_NAME = os.getenv("TRACE_SERVICE_NAME", "jobs-service")
+# Longitud máxima de la sentencia SQL guardada en el span
+TRACE_MAX_STATEMENT_LENGTH = 1000
+
+tracer = trace.get_tracer("app")
+
+if TYPE_CHECKING:
+    from opentelemetry.sdk.trace import TracerProvider
+
+_provider: Optional["TracerProvider"] = None
+
+
+def configure_tracing() -> Optional["TracerProvider"]:
+    """Registra el TracerProvider global con muestreo y exportación a archivo (idempotente)"""
+    global _provider
+    if not TRACING_ENABLED or _provider is not None:
+        return _provider
+    # El SDK solo se importa con las trazas habilitadas; sin él, la API de OpenTelemetry no graba nada
+    from opentelemetry.sdk.resources import Resource
+    from opentelemetry.sdk.trace import TracerProvider
+    from opentelemetry.sdk.trace.export import BatchSpanProcessor, ConsoleSpanExporter
+    from opentelemetry.sdk.trace.sampling import ParentBased, TraceIdRatioBased
+
+    out = sys.stdout if TRACE_EXPORT_PATH == "-" else open(TRACE_EXPORT_PATH, "a", encoding="utf-8")
+    exporter = ConsoleSpanExporter(
+        out=out,
+        formatter=lambda span: span.to_json(indent=None) + os.linesep,
+    )
+    _provider = TracerProvider(
+        resource=Resource.create({"service.name": TRACE_SERVICE_NAME}),
+        sampler=ParentBased(TraceIdRatioBased(TRACE_SAMPLE_RATIO)),
+    )
+    _provider.add_span_processor(BatchSpanProcessor(exporter))
+    trace.set_tracer_provider(_provider)
+    instrument_sqlalchemy()
+    logger.info("Trazas habilitadas (muestreo %.2f, exportando a %s)", TRACE_SAMPLE_RATIO, TRACE_EXPORT_PATH)
+    return _provider
+
+
+def shutdown_tracing():
+    """Vacía los spans pendientes del procesador por lotes"""
+    if _provider is not None:
+        _provider.shutdown()
+
+
+def _is_recording() -> bool:
+    return trace.get_current_span().is_recording()
+
+
+@contextmanager
+def client_span(name: str, attributes: Optional[Dict[str, Any]] = None, kind: SpanKind = SpanKind.CLIENT):
+    """Span hijo de la traza en curso; sin traza grabando no crea nada"""
+    if not _is_recording():
+        yield None
+        return
+    with tracer.start_as_current_span(name, kind=kind, attributes=attributes) as span:
+        yield span
+
+
+def inject_headers() -> List[Tuple[str, bytes]]:
+    """Cabeceras de Kafka con el contexto de la traza en curso (traceparent/tracestate)"""
+    carrier: Dict[str, str] = {}
+    propagate.inject(carrier)
+    return [(key, value.encode("utf-8")) for key, value in carrier.items()]
+
+
+def extract_context(headers: Optional[Iterable[Tuple[str, bytes]]]) -> otel_context.Context:
+    """Contexto de traza a partir de las cabeceras de un mensaje de Kafka"""
+    carrier = {key: value.decode("utf-8", "replace") for key, value in headers or () if value is not None}
+    return propagate.extract(carrier)
+
+
+@contextmanager
+def consumer_span(topic: str, messages: List[Any]):
+    """
+    Span de procesamiento de mensajes de Kafka. Continúa la traza del primer
+    mensaje muestreado (o del primero, si ninguno lo está) y enlaza el resto,
+    de modo que una solicitud grabada se sigue hasta el consumidor aunque su
+    evento llegue dentro de un lote.
+    """
+    contexts = [extract_context(getattr(message, "headers", None)) for message in messages]
+    span_contexts = [trace.get_current_span(ctx).get_span_context() for ctx in contexts]
+    parent_index = next(
+        (index for index, span_context in enumerate(span_contexts) if span_context.trace_flags.sampled), 0
+    )
+    links = [
+        Link(span_context) for index, span_context in enumerate(span_contexts)
+        if index != parent_index and span_context.is_valid
+    ]
+    attributes = {"messaging.system": "kafka", "messaging.destination.name": topic,
+                  "messaging.batch.message_count": len(messages)}
+    with tracer.start_as_current_span(f"process {topic}", context=contexts[parent_index] if contexts else None,
+                                      kind=SpanKind.CONSUMER, links=links, attributes=attributes) as span:
+        yield span
+
+
+def record_error(span, error: BaseException):
+    """Marca el span como fallido con la excepción"""
+    if span is not None and span.is_recording():
+        span.record_exception(error)
+        span.set_status(Status(StatusCode.ERROR, str(error)))
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if not _is_recording():
+        return
+    span = tracer.start_span(
+        f"db {statement.split(None, 1)[0].upper() if statement else 'query'}",
+        kind=SpanKind.CLIENT,
+        attributes={
+            "db.system.name": conn.engine.dialect.name,
+            "db.query.text": statement[:TRACE_MAX_STATEMENT_LENGTH],
+            "server.address": str(conn.engine.url.host or ""),
+            "db.operation.batch": bool(executemany),
+        },
+    )
+    conn.info.setdefault("trace_spans", []).append(span)
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    spans = conn.info.get("trace_spans")
+    if spans:
+        spans.pop().end()
+
+
+def _handle_error(exception_context):
+    connection = exception_context.connection
+    spans = connection.info.get("trace_spans") if connection is not None else None
+    if spans:
+        span = spans.pop()
+        record_error(span, exception_context.original_exception)
+        span.end()
+
+
+_sqlalchemy_instrumented = False
+
+
+def instrument_sqlalchemy():
+    """Un span por sentencia en todos los engines (primario, asíncrono y réplicas)"""
+    global _sqlalchemy_instrumented
+    if _sqlalchemy_instrumented:
+        return
+    event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(Engine, "handle_error", _handle_error)
+    _sqlalchemy_instrumented = True
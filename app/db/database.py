@@ -1,11 +1,19 @@
 # app/db/database.py
-from sqlalchemy import create_engine
+import asyncio
+import logging
+import time
+from typing import List, Optional
+
+from fastapi import Request, Response
+from sqlalchemy import create_engine, text
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
 from sqlalchemy.orm import sessionmaker, Session
 import os
 from dotenv import load_dotenv
 from psycopg2 import connect, sql
 
+logger = logging.getLogger(__name__)
+
 # Determinar el entorno actual
 environment = os.getenv("ENVIRONMENT", "development")
 # Cargar el archivo .env adecuado
@@ -21,10 +29,27 @@ POSTGRES_DB = os.getenv("DB_NAME")
 POSTGRES_USER = os.getenv("DB_USER")
 POSTGRES_PASSWORD = os.getenv("DB_PASSWORD")
 
+# Registrar cada sentencia SQL (solo para depuración: muy costoso en la ingesta)
+DB_ECHO = os.getenv("DB_ECHO", "false").lower() == "true"
+
 # Parámetros del pool
 DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 5))
 DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", 10))
 DB_POOL_TIMEOUT = int(os.getenv("DB_POOL_TIMEOUT", 30))
+# Conexiones que cada worker abre al arrancar para no pagar el handshake en las primeras solicitudes
+DB_POOL_WARM_SIZE = int(os.getenv("DB_POOL_WARM_SIZE", 2))
+# Crear tablas y aplicar SCHEMA_UPGRADES al arrancar cada worker; con "false" se
+# hace una sola vez en el despliegue con `python -m app.cli.init_db`
+DB_INIT_ON_STARTUP = os.getenv("DB_INIT_ON_STARTUP", "true").lower() == "true"
+
+# Réplicas de lectura opcionales, separadas por comas: "replica1:5432,replica2"
+DB_REPLICA_HOSTS = [host.strip() for host in os.getenv("DB_REPLICA_HOSTS", "").split(",") if host.strip()]
+# Retraso máximo tolerado antes de desviar las lecturas al primario
+DB_REPLICA_MAX_LAG_SECONDS = float(os.getenv("DB_REPLICA_MAX_LAG_SECONDS", 5))
+DB_REPLICA_LAG_CHECK_INTERVAL = float(os.getenv("DB_REPLICA_LAG_CHECK_INTERVAL", 5))
+# Ventana en la que un usuario que acaba de escribir lee desde el primario
+READ_YOUR_WRITES_SECONDS = int(os.getenv("READ_YOUR_WRITES_SECONDS", 10))
+READ_PRIMARY_COOKIE = "read_primary_until"
 
 
 def create_database_if_not_exists():
@@ -46,9 +71,9 @@ def create_database_if_not_exists():
         cursor.execute(sql.SQL("CREATE DATABASE {}").format(
             sql.Identifier(POSTGRES_DB)
         ))
-        print(f"Base de datos '{POSTGRES_DB}' creada con éxito.")
+        logger.info("Base de datos '%s' creada con éxito.", POSTGRES_DB)
     else:
-        print(f"La base de datos '{POSTGRES_DB}' ya existe.")
+        logger.info("La base de datos '%s' ya existe.", POSTGRES_DB)
 
     cursor.close()
     conn.close()
@@ -70,7 +95,7 @@ engine = create_engine(
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 # Crear el motor asíncrono
-async_engine = create_async_engine(SQLALCHEMY_DATABASE_URL_ASYNC, echo=True)
+async_engine = create_async_engine(SQLALCHEMY_DATABASE_URL_ASYNC, echo=DB_ECHO)
 async_session = async_sessionmaker(
     async_engine,
     expire_on_commit=False,
@@ -82,7 +107,45 @@ def init_db():
     """Inicializa la base de datos creando todas las tablas"""
     create_database_if_not_exists()
     from app.db.base import Base
+    from app.db.migrations import upgrade_schema
     Base.metadata.create_all(bind=engine)
+    upgrade_schema(engine)
+
+
+def warm_pool(size: int = DB_POOL_WARM_SIZE):
+    """Abre `size` conexiones del pool síncrono y las devuelve al pool"""
+    connections = []
+    try:
+        for _ in range(min(size, DB_POOL_SIZE)):
+            connection = engine.connect()
+            connection.exec_driver_sql("SELECT 1")
+            connections.append(connection)
+    finally:
+        for connection in connections:
+            connection.close()
+
+
+async def warm_async_pool(size: int = DB_POOL_WARM_SIZE):
+    """Abre `size` conexiones del motor asíncrono y las devuelve al pool"""
+    connections = []
+    try:
+        for _ in range(size):
+            connection = await async_engine.connect()
+            await connection.exec_driver_sql("SELECT 1")
+            connections.append(connection)
+    finally:
+        for connection in connections:
+            await connection.close()
+
+
+async def prepare_database():
+    """
+    Esquema (si DB_INIT_ON_STARTUP) y pools calientes para el arranque del worker.
+    Las llamadas bloqueantes de psycopg2 corren en hilos para no frenar el loop.
+    """
+    if DB_INIT_ON_STARTUP:
+        await asyncio.to_thread(init_db)
+    await asyncio.gather(asyncio.to_thread(warm_pool), warm_async_pool())
 
 
 class Database:
@@ -115,3 +178,113 @@ def get_db() -> Session:
         db.close()
 
 
+class ReadReplica:
+    """Engine de una réplica con su retraso de replicación cacheado"""
+
+    # 0 si la réplica ya aplicó todo lo recibido; si no, antigüedad de la última transacción aplicada
+    LAG_QUERY = text(
+        "SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+        "ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()) END"
+    )
+
+    def __init__(self, url: str):
+        self.engine = create_engine(
+            url,
+            pool_size=DB_POOL_SIZE,
+            max_overflow=DB_MAX_OVERFLOW,
+            pool_timeout=DB_POOL_TIMEOUT,
+            pool_pre_ping=True
+        )
+        self.SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=self.engine)
+        self.lag: float = 0.0
+        self._checked_at: float = 0.0
+
+    def is_fresh(self) -> bool:
+        """Indica si el retraso está dentro del límite; se consulta como máximo cada intervalo"""
+        now = time.monotonic()
+        if now - self._checked_at >= DB_REPLICA_LAG_CHECK_INTERVAL:
+            self._checked_at = now
+            try:
+                with self.engine.connect() as conn:
+                    self.lag = float(conn.execute(self.LAG_QUERY).scalar() or 0)
+            except Exception as e:
+                logger.error("Error consultando el retraso de la réplica %s: %s", self.engine.url.host, e)
+                self.lag = float("inf")
+        return self.lag <= DB_REPLICA_MAX_LAG_SECONDS
+
+
+class ReplicaRouter:
+    """Reparte las lecturas entre réplicas al día y cae al primario si no hay ninguna"""
+
+    def __init__(self, hosts: List[str]):
+        self.replicas = [ReadReplica(_replica_url(host)) for host in hosts]
+        self._next = 0
+
+    def get_sessionmaker(self) -> sessionmaker:
+        for _ in range(len(self.replicas)):
+            replica = self.replicas[self._next % len(self.replicas)]
+            self._next += 1
+            if replica.is_fresh():
+                return replica.SessionLocal
+        return SessionLocal
+
+
+def _replica_url(host: str) -> str:
+    hostname, _, port = host.partition(":")
+    return (
+        f"postgresql://{POSTGRES_USER}:{POSTGRES_PASSWORD}@{hostname}:{port or POSTGRES_PORT}/{POSTGRES_DB}"
+    )
+
+
+# Instancia global del enrutador de réplicas
+replica_router = ReplicaRouter(DB_REPLICA_HOSTS)
+
+
+def mark_read_your_writes(response: Response):
+    """
+    Fija por unos segundos las lecturas del cliente al primario,
+    para que vea sus propias escrituras aunque las réplicas vayan atrasadas.
+    """
+    response.set_cookie(
+        READ_PRIMARY_COOKIE,
+        str(int(time.time()) + READ_YOUR_WRITES_SECONDS),
+        max_age=READ_YOUR_WRITES_SECONDS,
+        httponly=True
+    )
+
+
+def _reads_pinned_to_primary(request: Request) -> bool:
+    try:
+        return float(request.cookies.get(READ_PRIMARY_COOKIE, 0)) > time.time()
+    except ValueError:
+        return False
+
+
+def get_read_session_factory(request: Optional[Request] = None) -> sessionmaker:
+    """Elige la fábrica de sesiones para una lectura: réplica al día o primario"""
+    if request is not None and _reads_pinned_to_primary(request):
+        return SessionLocal
+    return replica_router.get_sessionmaker()
+
+
+def get_read_sessionmaker(request: Request) -> sessionmaker:
+    """
+    get_read_session_factory para FastAPI Depends. Es síncrona a propósito:
+    FastAPI la ejecuta en el threadpool, así la consulta del retraso de una
+    réplica (o su timeout de conexión) no bloquea el event loop.
+    """
+    return get_read_session_factory(request)
+
+
+def get_read_db(request: Request) -> Session:
+    """
+    Sesión de solo lectura para FastAPI Depends.
+    Usa una réplica si hay alguna configurada y al día; si no, el primario.
+    """
+    db = get_read_session_factory(request)()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
@@ -0,0 +1,57 @@
+# app/db/migrations.py
+import logging
+
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+# Sentencias DDL idempotentes para bases ya existentes.
+# `Base.metadata.create_all` solo crea tablas nuevas: no agrega columnas
+# ni índices a tablas que ya existen, así que se declaran aquí.
+SCHEMA_UPGRADES = [
+    "ALTER TABLE public.job_offers ADD COLUMN IF NOT EXISTS source VARCHAR",
+    "CREATE INDEX IF NOT EXISTS ix_job_offers_updated_at_id ON public.job_offers (updated_at, id)",
+    "CREATE INDEX IF NOT EXISTS ix_job_applications_id_user_created_at "
+    "ON public.job_applications (id_user, created_at)",
+    "CREATE INDEX IF NOT EXISTS ix_job_offers_applications_count ON public.job_offers (applications_count)",
+    # Las filas existentes quedan como vistas en el momento de la migración
+    "ALTER TABLE public.job_offers ADD COLUMN IF NOT EXISTS last_seen_at TIMESTAMP "
+    "DEFAULT (now() AT TIME ZONE 'utc')",
+    "CREATE INDEX IF NOT EXISTS ix_job_offers_active_last_seen_at "
+    "ON public.job_offers (last_seen_at) WHERE active",
+    "CREATE INDEX IF NOT EXISTS ix_job_offers_inactive_updated_at "
+    "ON public.job_offers (updated_at) WHERE NOT active",
+    # Falla (y se registra) si ya existen aplicaciones duplicadas; hay que depurarlas antes
+    "CREATE UNIQUE INDEX IF NOT EXISTS uq_job_applications_job_offer_user "
+    "ON public.job_applications (job_offer_id, id_user)",
+    # Salario normalizado; las filas existentes se rellenan con `python -m app.cli.reparse_salaries`
+    *[
+        f"ALTER TABLE public.{table} ADD COLUMN IF NOT EXISTS {column} {column_type}"
+        for table in ("job_offers", "job_offers_archive")
+        for column, column_type in (("salary_min", "INTEGER"), ("salary_max", "INTEGER"),
+                                    ("salary_currency", "VARCHAR(3)"), ("salary_period", "VARCHAR"))
+    ],
+    "CREATE INDEX IF NOT EXISTS ix_job_offers_salary_lower "
+    "ON public.job_offers ((coalesce(salary_min, salary_max)))",
+    "CREATE INDEX IF NOT EXISTS ix_job_offers_salary_upper "
+    "ON public.job_offers ((coalesce(salary_max, salary_min)))",
+    # Lugar canónico; las filas existentes se rellenan con `python -m app.cli.geocode_locations`
+    *[
+        f"ALTER TABLE public.{table} ADD COLUMN IF NOT EXISTS {column} {column_type}"
+        for table in ("job_offers", "job_offers_archive")
+        for column, column_type in (("place_id", "VARCHAR"), ("latitude", "DOUBLE PRECISION"),
+                                    ("longitude", "DOUBLE PRECISION"))
+    ],
+    "CREATE INDEX IF NOT EXISTS ix_job_offers_place_id ON public.job_offers (place_id)",
+]
+
+
+def upgrade_schema(engine: Engine):
+    """Aplica las sentencias de SCHEMA_UPGRADES, cada una en su propia transacción"""
+    for statement in SCHEMA_UPGRADES:
+        try:
+            with engine.begin() as conn:
+                conn.execute(text(statement))
+        except Exception as e:
+            logger.error("Error aplicando migración '%s': %s", statement, e)
@@ -6,19 +6,25 @@ import aiokafka
 import redis
 
 from app.cache.redis_service import RedisService
+from app.core.logging_config import get_sampled_logger
+from app.core.readiness import GroupJoinListener
+from app.core.tracing import consumer_span
 
 logger = logging.getLogger(__name__)
+# Por mensaje: INFO limitado por tasa
+message_logger = get_sampled_logger(__name__)
 
 
 class AuthEventConsumer:
     def __init__(self, redis_service: RedisService):
         self.consumer = aiokafka.AIOKafkaConsumer(
-            'auth-events',
             bootstrap_servers='localhost:9092',
             group_id='jobs-auth-group',
             value_deserializer=lambda x: json.loads(x.decode('utf-8')),
             auto_offset_reset='earliest'
         )
+        # El listener marca al consumidor como listo para /ready al unirse al grupo
+        self.consumer.subscribe(['auth-events'], listener=GroupJoinListener("auth_consumer"))
         self.redis_service = redis_service
 
     async def process_auth_event(self, event: Dict[str, Any]):
@@ -50,10 +56,10 @@ class AuthEventConsumer:
                     user_data['userId'],
                     user_data
                 )
-                logger.info(f"Usuario actualizado en Redis para evento {event_type}")
+                message_logger.info("Usuario actualizado en Redis para evento %s", event_type)
 
         except Exception as e:
-            logger.error(f"Error procesando evento: {str(e)}")
+            logger.error("Error procesando evento: %s", e)
 
     async def start(self):
         """Inicia el consumo de eventos"""
@@ -63,10 +69,12 @@ class AuthEventConsumer:
             logger.info("Consumidor iniciado y esperando mensajes...")
 
             async for message in self.consumer:
-                logger.info(f"Mensaje recibido: {message.value}")
-                await self.process_auth_event(message.value)
+                message_logger.info("Mensaje recibido de tipo %s", message.value.get('type'))
+                message_logger.debug("Contenido del mensaje: %s", message.value)
+                with consumer_span("auth-events", [message]):
+                    await self.process_auth_event(message.value)
 
         except Exception as e:
-            logger.error(f"Error en el consumidor: {str(e)}")
+            logger.error("Error en el consumidor: %s", e)
         finally:
             await self.consumer.stop()
\ No newline at end of file
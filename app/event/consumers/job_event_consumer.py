@@ -2,171 +2,385 @@
 import asyncio
 import json
 import logging
+import time
 import uuid
 from datetime import datetime
-from typing import Dict, Any
+from operator import itemgetter
+from typing import Dict, Any, List, Optional, Set, Tuple
 import aiokafka
+from aiokafka.structs import TopicPartition
+from sqlalchemy import update, bindparam, or_
 
+from app.cache.redis_service import RedisService
 from app.core.exceptions.kafka_exception import KafkaError
+from app.core.flow_control import CONSUMER_BATCH_MAX, AimdController
+from app.core.logging_config import get_sampled_logger
+from app.core.readiness import GroupJoinListener
+from app.core.tracing import consumer_span
 from app.db.database import async_session
-from app.model.schemas import JobCreate
-from app.services.job_service import save_job_to_db
+from app.model.models import JobOffer
+from app.services.job_ingestion import JOB_COLUMNS, event_job_id, normalize_description, validate_job_batch
+from app.services.job_service import invalidate_jobs, kafka_producer, save_jobs_to_db
+from app.services.job_stream import JOB_STREAM_CHANNEL, JOB_STREAM_ENABLED, stream_payload
+from app.services.location_normalizer import location_columns
+from app.services.salary_parser import salary_columns
+from app.services.search_percolator import percolator
 
 logger = logging.getLogger(__name__)
+# Por lote: INFO limitado por tasa
+batch_logger = get_sampled_logger(__name__)
+
+# Tópico de las alertas de búsquedas guardadas
+ALERTS_TOPIC = "job-alerts"
+
+# Campos de una oferta que un evento JOB_UPDATED puede modificar
+UPDATABLE_FIELDS = (
+    "title", "company", "description", "requirements", "job_type",
+    "level", "salary_range", "location", "is_remote",
+)
+
+
+class _DrainOnRevoke(GroupJoinListener):
+    """Antes de ceder particiones, termina los lotes en curso y confirma sus offsets"""
+
+    def __init__(self, name: str, owner: "JobEventConsumer"):
+        super().__init__(name)
+        self.owner = owner
+
+    async def on_partitions_revoked(self, revoked):
+        await self.owner.drain()
 
 
 class JobEventConsumer:
-    def __init__(self):
+    """
+    Consume `job-events` por lotes con tamaño y concurrencia adaptativos
+    (ver app/core/flow_control.py). Las particiones de un lote quedan en pausa
+    hasta que se escribe y se confirma, así cada partición conserva su orden
+    mientras lotes de particiones distintas se escriben en paralelo; con el
+    máximo de lotes en curso no se piden más (contrapresión).
+    `job-events` se produce sin clave, así que los eventos de una oferta
+    pueden llegar por particiones distintas: un lote que comparte ofertas con
+    otro en curso espera a que ese termine antes de escribir.
+    """
+
+    def __init__(self, redis_service: Optional[RedisService] = None):
+        # Para difundir las ofertas nuevas a los suscriptores de /jobs/stream
+        self.redis_service = redis_service
         self.consumer = aiokafka.AIOKafkaConsumer(
-            'job-events',
             bootstrap_servers='localhost:9092',
             group_id='jobs-processor-group',
             value_deserializer=lambda x: json.loads(x.decode('utf-8')),
             auto_offset_reset='earliest',
             enable_auto_commit=False,
-            max_poll_records=10
+            max_poll_records=CONSUMER_BATCH_MAX
         )
+        self.flow = AimdController("job_consumer")
+        # Lote en escritura -> offsets que confirma al terminar
+        self._inflight: Dict[asyncio.Task, Dict[TopicPartition, int]] = {}
+        # Lote en escritura -> ofertas que toca
+        self._inflight_jobs: Dict[asyncio.Task, Set[str]] = {}
+        # El listener marca al consumidor como listo para /ready al unirse al grupo
+        self.consumer.subscribe(['job-events'], listener=_DrainOnRevoke("job_consumer", self))
 
     async def start(self):
-        """Inicia el consumo de eventos"""
+        """Inicia el consumo de eventos por lotes"""
         logger.info("Iniciando consumidor de eventos de trabajos...")
         try:
             await self.consumer.start()
             logger.info("Consumidor iniciado y esperando mensajes...")
 
-            while True:  # Loop continuo
-                try:
-                    async for message in self.consumer:
-                        try:
-                            logger.info(f"Mensaje recibido: {message.value}")
-                            await self.process_job_event(message.value)
-                            # Solo hacemos commit si el procesamiento fue exitoso
-                            await self.consumer.commit()
-                        except Exception as e:
-                            logger.error(f"Error procesando mensaje individual: {str(e)}")
-                            # Continuamos con el siguiente mensaje en caso de error
-                            continue
-
-                except Exception as e:
-                    logger.error(f"Error en el consumo de mensajes: {str(e)}")
-                    # Esperar un poco antes de reintentar
-                    await asyncio.sleep(5)
-                    continue
+            while True:
+                await self._poll()
 
         except Exception as e:
-            logger.error(f"Error fatal en el consumidor: {str(e)}")
-            raise
+            logger.error("Error en el consumidor: %s", e)
+            raise KafkaError(f"Error en el consumidor de eventos de trabajo: {str(e)}")
         finally:
+            # Sin confirmar: los lotes interrumpidos se vuelven a leer al reiniciar
+            for task in self._inflight:
+                task.cancel()
+            self._inflight.clear()
+            self._inflight_jobs.clear()
             await self.consumer.stop()
 
+    async def _poll(self):
+        """Lanza un lote más si los límites lo permiten y confirma los terminados"""
+        assigned = self.consumer.assignment()
+        saturated = len(self._inflight) >= self.flow.concurrency
+        if self._inflight and (saturated or not assigned - self.consumer.paused()):
+            await asyncio.wait(self._inflight, return_when=asyncio.FIRST_COMPLETED)
+            await self._commit_done()
+            return
+
+        # Con lotes en curso el sondeo es corto para confirmarlos a tiempo
+        batches = await self.consumer.getmany(
+            timeout_ms=100 if self._inflight else 1000, max_records=self.flow.batch_size
+        )
+        await self._commit_done()
+        if not batches:
+            return
+        self.consumer.pause(*batches)
+        job_ids = {event_job_id(message.value.get('data') or {})
+                   for records in batches.values() for message in records} - {None}
+        overlapping = [task for task, ids in self._inflight_jobs.items() if not ids.isdisjoint(job_ids)]
+        task = asyncio.create_task(self._process_batch(batches, overlapping))
+        self._inflight[task] = {tp: records[-1].offset + 1 for tp, records in batches.items()}
+        self._inflight_jobs[task] = job_ids
+        self.flow.set_inflight(len(self._inflight), len(self.consumer.paused()))
+
+    async def _process_batch(self, batches: Dict[TopicPartition, list], after: List[asyncio.Task]):
+        if after:
+            # Misma oferta en un lote anterior aún en curso: se escribe después, en el orden de lectura
+            await asyncio.wait(after)
+        messages = [message for records in batches.values() for message in records]
+        events = [message.value for message in messages]
+        batch_logger.info("Lote recibido con %d eventos", len(events))
+        # Continúa la traza de los productores (cabeceras traceparent)
+        with consumer_span("job-events", messages):
+            started_at = time.perf_counter()
+            try:
+                await self.process_job_events(events)
+                self.flow.on_success(time.perf_counter() - started_at, len(events))
+            except Exception as e:
+                self.flow.on_error()
+                logger.error("Error procesando el lote, se reintenta evento por evento en %.1f s: %s",
+                             self.flow.backoff, e)
+                # Sus particiones siguen en pausa: la espera frena la lectura de esas particiones
+                await asyncio.sleep(self.flow.backoff)
+                await self._process_individually(events)
+
+    async def _commit_done(self):
+        """Confirma los offsets de los lotes terminados y reanuda sus particiones"""
+        done = [task for task in self._inflight if task.done()]
+        if not done:
+            return
+        offsets: Dict[TopicPartition, int] = {}
+        for task in done:
+            batch_offsets = self._inflight.pop(task)
+            self._inflight_jobs.pop(task, None)
+            # Un fallo inesperado detiene el consumidor sin confirmar el lote
+            task.result()
+            offsets.update(batch_offsets)
+        # Solo hacemos commit cuando el lote fue procesado
+        assigned = self.consumer.assignment()
+        offsets = {tp: offset for tp, offset in offsets.items() if tp in assigned}
+        if offsets:
+            await self.consumer.commit(offsets)
+            self.consumer.resume(*offsets)
+        self.flow.set_inflight(len(self._inflight), len(self.consumer.paused()))
+
+    async def drain(self):
+        """Espera los lotes en curso y confirma sus offsets"""
+        if self._inflight:
+            await asyncio.wait(self._inflight)
+            await self._commit_done()
+
+    async def _process_individually(self, events: List[Dict[str, Any]]):
+        """Procesa los eventos de un lote fallido uno por uno, omitiendo los que fallen"""
+        for event in events:
+            try:
+                await self.process_job_events([event])
+            except Exception as e:
+                logger.error("Error procesando mensaje individual: %s", e)
+                # Continuamos con el siguiente mensaje en caso de error
+                continue
+
     async def process_job_event(self, event: Dict[str, Any]):
         """
-        Procesa eventos relacionados con trabajos.
+        Procesa un evento relacionado con trabajos.
+        """
+        await self.process_job_events([event])
+
+    async def process_job_events(self, events: List[Dict[str, Any]]):
+        """
+        Procesa un lote de eventos de trabajos.
+        Los eventos de una misma oferta se combinan antes de escribir, de modo
+        que cada oferta recibe como máximo una creación, una actualización
+        parcial y una baja por lote, aplicadas en ese orden.
         """
         try:
-            event_type = event.get('type')
-            job_data = event.get('data')
-            metadata = event.get('metadata', {})
-
-            if event_type == 'JOB_CREATED':
-                await self._handle_job_created(job_data, metadata)
-            elif event_type == 'JOB_UPDATED':
-                await self._handle_job_updated(job_data, metadata)
-            elif event_type == 'JOB_DELETED':
-                await self._handle_job_deleted(job_data, metadata)
-            else:
-                logger.warning(f"Tipo de evento no reconocido: {event_type}")
-
-            logger.info(f"Evento {event_type} procesado exitosamente")
-            await self.consumer.commit()
+            creates, updates, deletes = coalesce_job_events(events)
+
+            if creates:
+                await self._handle_jobs_created(list(creates.values()))
+            if updates:
+                await self._handle_job_updated(updates)
+            if deletes:
+                await self._handle_job_deleted(deletes)
+
+            batch_logger.info(
+                "Lote procesado: %d creados, %d actualizados, %d eliminados",
+                len(creates), len(updates), len(deletes)
+            )
         except Exception as e:
-            logger.error(f"Error procesando evento de trabajo: {str(e)}")
+            logger.error("Error procesando evento de trabajo: %s", e)
             raise KafkaError(f"Error procesando evento de trabajo: {str(e)}")
 
-    async def _handle_job_created(self, job_data: Dict[str, Any], metadata: Dict[str, Any]):
-        """Maneja la creación de nuevos trabajos."""
+    async def _handle_jobs_created(self, jobs: List[Tuple[Dict[str, Any], Dict[str, Any]]]):
+        """
+        Maneja la creación de nuevos trabajos: valida el lote completo de una vez
+        y lo guarda con un único upsert. Los eventos inválidos se registran y se omiten.
+        """
         try:
-            job_data = process_job_data(job_data)
+            batch = validate_job_batch([{"data": job_data, "metadata": metadata} for job_data, metadata in jobs])
+            for error in batch.errors:
+                logger.error("Evento JOB_CREATED inválido en la posición %d: %s", error.index, error.errors)
 
-            async with async_session() as session:
-                async with session.begin():  # Usar transaction context
-                    job = JobCreate(
-                        id=job_data['id'],
-                        title=job_data.get('title'),
-                        description=job_data.get('description'),
-                        requirements=job_data.get('requirements', []),
-                        location=job_data.get('location'),
-                        salary_range=job_data.get('salary_range'),
-                        company=job_data.get('company'),
-                        job_type=job_data.get('job_type', 'NOT_SPECIFIED'),
-                        level=job_data.get('level', 'NOT_SPECIFIED'),
-                        is_remote=job_data.get('is_remote', False),
-                        source_url=job_data.get('source_url'),
-                        source=metadata.get('source'),
-                        processed_at=metadata.get('processed_at'),
-                        raw_job_id=job_data.get('raw_job_id')
-                    )
-
-                    await save_job_to_db(job, session)
-                    logger.info(f"Trabajo {job.title} de {job.company} guardado exitosamente.")
+            if batch.rows:
+                async with async_session() as session:
+                    async with session.begin():  # Usar transaction context
+                        inserted = await save_jobs_to_db(batch.rows, session)
+                batch_logger.info("%d trabajos guardados exitosamente.", len(batch.rows))
+                # Las existentes cambiaron las columnas del upsert: sus fichas cacheadas quedan viejas
+                await invalidate_jobs({row[0] for row in batch.rows} - inserted, self.redis_service)
+                if inserted:
+                    new_jobs = [job for job in (dict(zip(JOB_COLUMNS, row)) for row in batch.rows)
+                                if job["id"] in inserted]
+                    if JOB_STREAM_ENABLED and self.redis_service:
+                        await self.redis_service.publish(JOB_STREAM_CHANNEL, stream_payload(new_jobs))
+                    await self._notify_saved_searches(new_jobs)
 
         except Exception as e:
-            logger.error(f"Error procesando nuevo trabajo: {str(e)}")
+            logger.error("Error procesando nuevos trabajos: %s", e)
             raise
 
-    async def _handle_job_updated(self, job_data: Dict[str, Any], metadata: Dict[str, Any]):
+    async def _notify_saved_searches(self, jobs: List[Dict[str, Any]]):
         """
-        Maneja actualizaciones de trabajos existentes.
+        Cruza las ofertas nuevas (no las re-vistas por el scraper) con las
+        búsquedas guardadas y publica un evento por búsqueda con todas sus
+        coincidencias del lote. Las alertas son de mejor esfuerzo: un fallo se
+        registra sin reintentar el lote, que ya está guardado.
         """
         try:
-            # Implementar lógica de actualización
-            logger.info(f"Actualizando trabajo ID: {job_data.get('source_job_id')}")
-            # TODO: Implementar lógica específica
-            pass
+            await percolator.refresh()
+            matches = percolator.match_batch(jobs)
+            if not matches:
+                return
+            timestamp = datetime.utcnow().isoformat()
+            events = [
+                {
+                    "type": "SAVED_SEARCH_MATCHED",
+                    "data": {"saved_search_id": query.id, "user_id": query.user_id, "job_ids": job_ids},
+                    "metadata": {"source": "ms-job", "timestamp": timestamp},
+                }
+                for query, job_ids in matches.values()
+            ]
+            await kafka_producer.send_events(ALERTS_TOPIC, events, key_field="user_id")
+            batch_logger.info("%d alertas de búsquedas guardadas para %d ofertas nuevas", len(events), len(jobs))
         except Exception as e:
-            logger.error(f"Error actualizando trabajo: {str(e)}")
-            raise
+            logger.error("Error enviando alertas de búsquedas guardadas: %s", e)
 
-    async def _handle_job_deleted(self, job_data: Dict[str, Any], metadata: Dict[str, Any]):
+    async def _handle_job_updated(self, updates: Dict[str, Dict[str, Any]]):
         """
-        Maneja la eliminación de trabajos.
+        Aplica actualizaciones parciales: solo los campos recibidos y solo en las
+        filas donde algún valor cambió (IS DISTINCT FROM), para no reescribir
+        filas idénticas. Las ofertas con el mismo conjunto de campos se envían
+        en un único executemany.
         """
         try:
-            # Implementar lógica de eliminación
-            logger.info(f"Eliminando trabajo ID: {job_data.get('source_job_id')}")
-            # TODO: Implementar lógica específica
-            pass
+            groups: Dict[Tuple[str, ...], List[Dict[str, Any]]] = {}
+            for job_id, changes in updates.items():
+                fields = tuple(sorted(changes))
+                params = {f"b_{field}": value for field, value in changes.items()}
+                params["b_id"] = job_id
+                groups.setdefault(fields, []).append(params)
+            for params in groups.values():
+                # Orden de id fijo: dos transacciones nunca se bloquean filas en orden cruzado
+                params.sort(key=itemgetter("b_id"))
+
+            now = datetime.utcnow()
+            table = JobOffer.__table__
+            async with async_session() as session:
+                async with session.begin():
+                    for fields, params in groups.items():
+                        values = {field: bindparam(f"b_{field}") for field in fields}
+                        stmt = (
+                            update(table)
+                            .where(table.c.id == bindparam("b_id"))
+                            .where(or_(*[table.c[field].is_distinct_from(bindparam(f"b_{field}")) for field in fields]))
+                            .values(**values, updated_at=now, last_seen_at=now)
+                        )
+                        await session.execute(stmt, params)
+            await invalidate_jobs(updates, self.redis_service)
+            batch_logger.info("Actualizaciones aplicadas a %d trabajos", len(updates))
         except Exception as e:
-            logger.error(f"Error eliminando trabajo: {str(e)}")
+            logger.error("Error actualizando trabajo: %s", e)
             raise
 
-    async def start(self):
-        """Inicia el consumo de eventos"""
-        logger.info("Iniciando consumidor de eventos de trabajos...")
+    async def _handle_job_deleted(self, job_ids: Set[str]):
+        """
+        Da de baja lógica (active = false) a las ofertas eliminadas en una sola sentencia.
+        """
         try:
-            await self.consumer.start()
-            logger.info("Consumidor iniciado y esperando mensajes...")
-
-            async for message in self.consumer:
-                logger.info(f"Mensaje recibido: {message.value}")
-                await self.process_job_event(message.value)
-                #await self.consumer.commit()
+            async with async_session() as session:
+                async with session.begin():
+                    await session.execute(
+                        update(JobOffer)
+                        .where(JobOffer.id.in_(job_ids), JobOffer.active == True)
+                        .values(active=False, updated_at=datetime.utcnow())
+                        .execution_options(synchronize_session=False)
+                    )
+            await invalidate_jobs(job_ids, self.redis_service)
+            if self.redis_service:
+                await self.redis_service.remove_job_popularity(list(job_ids))
+            batch_logger.info("Trabajos desactivados: %d", len(job_ids))
         except Exception as e:
-            logger.error(f"Error en el consumidor: {str(e)}")
-            raise KafkaError(f"Error en el consumidor de eventos de trabajo: {str(e)}")
-        finally:
-            await self.consumer.stop()
+            logger.error("Error eliminando trabajo: %s", e)
+            raise
+
+
+def coalesce_job_events(
+        events: List[Dict[str, Any]]
+) -> Tuple[Dict[str, Tuple[Dict[str, Any], Dict[str, Any]]], Dict[str, Dict[str, Any]], Set[str]]:
+    """
+    Combina, en orden, los eventos de un lote por oferta.
+    Devuelve (creaciones, actualizaciones parciales, bajas), que se aplican en
+    ese orden. Una actualización posterior a una creación se mantiene aparte:
+    si la oferta ya existía, el upsert solo cambia UPSERT_UPDATE_COLUMNS y la
+    actualización parcial aplica el resto. Una creación posterior a una baja
+    la anula.
+    """
+    creates: Dict[str, Tuple[Dict[str, Any], Dict[str, Any]]] = {}
+    updates: Dict[str, Dict[str, Any]] = {}
+    deletes: Set[str] = set()
+
+    for event in events:
+        event_type = event.get('type')
+        job_data = event.get('data') or {}
+        job_id = event_job_id(job_data)
+
+        if event_type == 'JOB_CREATED':
+            key = job_id or str(uuid.uuid4())
+            # La fila se crea con la misma clave con la que se combinan los eventos
+            creates[key] = ({**job_data, 'id': key}, event.get('metadata', {}))
+            updates.pop(key, None)
+            deletes.discard(key)
+        elif event_type == 'JOB_UPDATED':
+            if not job_id:
+                logger.warning("Evento JOB_UPDATED sin id de trabajo")
+                continue
+            changes = extract_job_changes(job_data)
+            if not changes:
+                continue
+            updates.setdefault(job_id, {}).update(changes)
+        elif event_type == 'JOB_DELETED':
+            if not job_id:
+                logger.warning("Evento JOB_DELETED sin id de trabajo")
+                continue
+            deletes.add(job_id)
+        else:
+            logger.warning("Tipo de evento no reconocido: %s", event_type)
 
+    return creates, updates, deletes
 
-def process_job_data(job_data: dict) -> dict:
-    job_data['id'] = job_data.get('source_job_id', str(uuid.uuid4()))
-    job_data['creator_id'] = "default_creator"  # Asigna un valor por defecto
-    job_data['created_at'] = datetime.utcnow()  # Fecha de creación
-    job_data['updated_at'] = datetime.utcnow()  # Fecha de última actualización
-    job_data['active'] = True  # Valor por defecto para 'active'
-    # Asigna un valor predeterminado si la descripción está vacía o no tiene suficientes caracteres
-    job_data['description'] = job_data.get('description', "").strip()
-    if len(job_data['description']) < 20:
-        job_data['description'] = "Descripción no disponible. Por favor, contáctenos para más información."
 
-    return job_data
+def extract_job_changes(job_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Toma solo los campos actualizables presentes en el evento"""
+    changes = {field: job_data[field] for field in UPDATABLE_FIELDS if field in job_data}
+    if 'description' in changes:
+        changes['description'] = normalize_description(changes['description'])
+    if 'salary_range' in changes:
+        changes.update(salary_columns(changes['salary_range']))
+    if 'location' in changes:
+        changes.update(location_columns(changes['location']))
+    return changes
@@ -0,0 +1,153 @@
+# job_projection_consumer.py
+import asyncio
+import json
+import logging
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+import aiokafka
+from aiokafka.structs import TopicPartition
+
+from app.core.logging_config import get_sampled_logger
+from app.core.readiness import readiness
+from app.event.consumers.job_event_consumer import coalesce_job_events
+from app.services.job_ingestion import JOB_COLUMNS, UPSERT_UPDATE_COLUMNS, validate_job_batch
+from app.services.job_read_model import (
+    READ_MODEL_COLUMNS, READ_MODEL_REFRESH_SECONDS, READ_MODEL_REPLAY_SECONDS, READ_MODEL_REWEIGHT_PENDING,
+    JobReadModel, get_read_model, load_snapshot, publish, read_model_jobs,
+)
+
+logger = logging.getLogger(__name__)
+batch_logger = get_sampled_logger(__name__)
+
+TOPIC = "job-events"
+
+
+class JobProjectionConsumer:
+    """
+    Mantiene el modelo de lectura del worker con `job-events`.
+    Sin group_id: cada worker recibe todos los eventos y no confirma offsets.
+    El snapshot lee la base que JobEventConsumer escribe con retraso, así que
+    un evento ya producido puede no estar en él todavía. Por eso se vuelven a
+    aplicar sobre cada snapshot los eventos de los últimos
+    READ_MODEL_REPLAY_SECONDS: al arrancar, leyendo el tópico desde ese
+    momento; al reconstruir, desde los lotes recientes que se guardan en
+    memoria. Aplicarlos dos veces, en orden, es inocuo.
+    """
+
+    def __init__(self):
+        self.consumer = aiokafka.AIOKafkaConsumer(
+            bootstrap_servers='localhost:9092',
+            group_id=None,
+            value_deserializer=lambda x: json.loads(x.decode('utf-8')),
+            auto_offset_reset='latest',
+            enable_auto_commit=False,
+            max_poll_records=500
+        )
+        # Eventos recibidos desde poco antes de la reconstrucción, para aplicarlos también al nuevo modelo
+        self._replay: Optional[List[Dict[str, Any]]] = None
+        # Lotes de los últimos READ_MODEL_REPLAY_SECONDS (instante de llegada, eventos)
+        self._recent: Deque[Tuple[float, List[Dict[str, Any]]]] = deque()
+        self._refresh_task: Optional[asyncio.Task] = None
+
+    async def start(self):
+        """Construye el modelo inicial y aplica los eventos por lotes"""
+        logger.info("Iniciando proyección del modelo de lectura...")
+        try:
+            await self.consumer.start()
+            await self._assign_partitions()
+            await self.refresh()
+            readiness.mark_ready("read_model", f"{get_read_model().active_count} ofertas")
+
+            next_refresh = time.monotonic() + READ_MODEL_REFRESH_SECONDS
+            while True:
+                batches = await self.consumer.getmany(timeout_ms=1000)
+                events = [message.value for records in batches.values() for message in records]
+                if events:
+                    model = get_read_model()
+                    apply_job_events(model, events)
+                    # Pesos TF-IDF al día sin esperar la reconstrucción completa
+                    if model.skills.pending_count >= READ_MODEL_REWEIGHT_PENDING:
+                        model.skills.reweight()
+                    if self._replay is not None:
+                        self._replay.extend(events)
+                    self._remember(events)
+                    read_model_jobs.set(model.active_count)
+                    batch_logger.info("Modelo de lectura: %d eventos aplicados", len(events))
+
+                if time.monotonic() >= next_refresh and (self._refresh_task is None or self._refresh_task.done()):
+                    self._refresh_task = asyncio.create_task(self.refresh())
+                    next_refresh = time.monotonic() + READ_MODEL_REFRESH_SECONDS
+        finally:
+            if self._refresh_task is not None:
+                self._refresh_task.cancel()
+            await self.consumer.stop()
+
+    async def _assign_partitions(self):
+        """
+        Asigna todas las particiones desde READ_MODEL_REPLAY_SECONDS atrás: lo
+        leído tras el snapshot inicial incluye lo que aún no estaba en la base
+        """
+        await self.consumer.topics()
+        partitions = [TopicPartition(TOPIC, partition)
+                      for partition in sorted(self.consumer.partitions_for_topic(TOPIC) or ())]
+        self.consumer.assign(partitions)
+        since_ms = int((time.time() - READ_MODEL_REPLAY_SECONDS) * 1000)
+        offsets = await self.consumer.offsets_for_times({partition: since_ms for partition in partitions})
+        for partition in partitions:
+            found = offsets.get(partition)
+            if found is None:
+                await self.consumer.seek_to_end(partition)
+            else:
+                self.consumer.seek(partition, found.offset)
+            await self.consumer.position(partition)
+
+    def _remember(self, events: List[Dict[str, Any]]):
+        """Guarda el lote y descarta los de más de READ_MODEL_REPLAY_SECONDS"""
+        now = time.monotonic()
+        self._recent.append((now, events))
+        while self._recent and self._recent[0][0] < now - READ_MODEL_REPLAY_SECONDS:
+            self._recent.popleft()
+
+    async def refresh(self):
+        """Reconstruye el modelo desde la base sin dejar de aplicar eventos al actual"""
+        started_at = time.perf_counter()
+        # Desde antes del snapshot: lo aplicado al modelo actual quizá aún no esté en la base
+        self._replay = [event for _, events in self._recent for event in events]
+        try:
+            model = await asyncio.to_thread(load_snapshot)
+            apply_job_events(model, self._replay)
+            publish(model)
+        except Exception as e:
+            logger.error("Error reconstruyendo el modelo de lectura: %s", e)
+            if get_read_model() is None:
+                raise
+        finally:
+            self._replay = None
+        logger.info("Snapshot del modelo de lectura en %.2f s", time.perf_counter() - started_at)
+
+
+def apply_job_events(model: JobReadModel, events: List[Dict[str, Any]]):
+    """
+    Aplica un lote de eventos con la misma semántica que JobEventConsumer:
+    JOB_CREATED de una oferta existente solo cambia las columnas del upsert.
+    """
+    if not events:
+        return
+    creates, updates, deletes = coalesce_job_events(events)
+
+    if creates:
+        batch = validate_job_batch([{"data": job_data, "metadata": metadata}
+                                    for job_data, metadata in creates.values()])
+        for row in batch.rows:
+            job = dict(zip(JOB_COLUMNS, row))
+            if model.contains(job["id"]):
+                model.update(job["id"], {column: job[column] for column in UPSERT_UPDATE_COLUMNS
+                                         if column in READ_MODEL_COLUMNS}, active=True)
+            else:
+                model.upsert(job)
+    for job_id, changes in updates.items():
+        model.update(job_id, changes)
+    for job_id in deletes:
+        model.deactivate(job_id)
@@ -0,0 +1,158 @@
+# job_similarity_consumer.py
+import asyncio
+import json
+import logging
+import time
+from typing import Any, Dict, Iterable, List, Optional
+
+import aiokafka
+
+from app.cache.redis_service import RedisService
+from app.core.logging_config import get_sampled_logger
+from app.event.consumers.job_event_consumer import coalesce_job_events
+from app.services.similar_jobs import (
+    SIMILAR_JOBS_REBUILD_SECONDS, TEXT_COLUMNS, SimilarJobIndex, job_terms, load_index, load_jobs,
+)
+
+logger = logging.getLogger(__name__)
+batch_logger = get_sampled_logger(__name__)
+
+# Ofertas por pipeline al publicar las listas en Redis
+PUBLISH_BATCH = 1000
+
+
+class JobSimilarityConsumer:
+    """
+    Mantiene las listas de ofertas similares en Redis.
+    Construye el índice desde la base, publica todas las listas y luego
+    enlaza las ofertas nuevas o con texto modificado a medida que llegan por
+    `job-events`. Cada SIMILAR_JOBS_REBUILD_SECONDS reconstruye el índice
+    completo (recoge las bajas del barrido y recalcula el idf).
+    Un solo proceso por despliegue: el índice vive en su memoria.
+    """
+
+    def __init__(self, redis_service: RedisService):
+        self.redis_service = redis_service
+        self.consumer = aiokafka.AIOKafkaConsumer(
+            'job-events',
+            bootstrap_servers='localhost:9092',
+            group_id='job-similarity-group',
+            value_deserializer=lambda x: json.loads(x.decode('utf-8')),
+            auto_offset_reset='latest',
+            enable_auto_commit=False,
+            max_poll_records=500
+        )
+        self.index: Optional[SimilarJobIndex] = None
+        # Eventos recibidos mientras se reconstruye el índice, para aplicarlos también al nuevo
+        self._replay: Optional[List[Dict[str, Any]]] = None
+        self._rebuild_task: Optional[asyncio.Task] = None
+        # Serializa la aplicación de lotes con el reemplazo del índice
+        self._lock = asyncio.Lock()
+
+    async def start(self):
+        """Construye el índice y enlaza las ofertas de cada lote de eventos"""
+        logger.info("Iniciando índice de ofertas similares...")
+        try:
+            await self.consumer.start()
+            await self.rebuild()
+
+            next_rebuild = time.monotonic() + SIMILAR_JOBS_REBUILD_SECONDS
+            while True:
+                batches = await self.consumer.getmany(timeout_ms=1000)
+                events = [message.value for records in batches.values() for message in records]
+                if events:
+                    # Antes de aplicar: si la reconstrucción termina entretanto, también llegan al índice nuevo
+                    if self._replay is not None:
+                        self._replay.extend(events)
+                    async with self._lock:
+                        await self.apply_events(self.index, events)
+                    await self.consumer.commit()
+
+                if time.monotonic() >= next_rebuild and (self._rebuild_task is None or self._rebuild_task.done()):
+                    self._rebuild_task = asyncio.create_task(self.rebuild())
+                    next_rebuild = time.monotonic() + SIMILAR_JOBS_REBUILD_SECONDS
+        finally:
+            if self._rebuild_task is not None:
+                self._rebuild_task.cancel()
+            await self.consumer.stop()
+
+    async def rebuild(self):
+        """Reconstruye el índice en un hilo y publica todas sus listas"""
+        started_at = time.perf_counter()
+        self._replay = []
+        try:
+            index = await asyncio.to_thread(load_index)
+            await publish_neighbors(self.redis_service, index, index.ids)
+            # Lo recibido durante la construcción se enlaza sobre el índice nuevo; con el lote
+            # en curso terminado y sin otro hasta el reemplazo
+            async with self._lock:
+                await self.apply_events(index, self._replay)
+                self.index = index
+                self._replay = None
+        except Exception as e:
+            logger.error("Error reconstruyendo el índice de ofertas similares: %s", e)
+            if self.index is None:
+                raise
+        finally:
+            self._replay = None
+        logger.info("Ofertas similares reconstruidas en %.2f s", time.perf_counter() - started_at)
+
+    async def apply_events(self, index: SimilarJobIndex, events: List[Dict[str, Any]]):
+        """
+        Enlaza las ofertas creadas o con texto modificado y retira las bajas.
+        Las actualizaciones son parciales: el texto completo se lee de la base
+        y se le superponen los cambios del evento.
+        """
+        if not events:
+            return
+        creates, updates, deletes = coalesce_job_events(events)
+        jobs: Dict[str, Dict[str, Any]] = {
+            job_id: {**{column: job_data.get(column) for column in TEXT_COLUMNS}, "id": job_id}
+            for job_id, (job_data, _) in creates.items()
+        }
+        changed_text = []
+        for job_id, changes in updates.items():
+            text = {column: changes[column] for column in TEXT_COLUMNS if column in changes}
+            if not text:
+                continue
+            if job_id in jobs:
+                # Creada en el mismo lote: el cambio se superpone a la creación
+                jobs[job_id].update(text)
+            else:
+                changed_text.append(job_id)
+        if changed_text:
+            stored = await asyncio.to_thread(load_jobs, changed_text)
+            for job_id in changed_text:
+                job = stored.get(job_id)
+                if job is not None:
+                    job.update({column: updates[job_id][column] for column in TEXT_COLUMNS
+                                if column in updates[job_id]})
+                    jobs[job_id] = job
+
+        changed = set()
+        if jobs:
+            changed.update(await asyncio.to_thread(self._link, index, jobs))
+        if deletes:
+            changed.update(index.remove(deletes))
+            await self.redis_service.set_similar_jobs({job_id: {} for job_id in deletes})
+        await publish_neighbors(self.redis_service, index, changed - deletes)
+        batch_logger.info("Ofertas similares: %d enlazadas, %d retiradas, %d listas actualizadas",
+                          len(jobs), len(deletes), len(changed))
+
+    @staticmethod
+    def _link(index: SimilarJobIndex, jobs: Dict[str, Dict[str, Any]]) -> List[str]:
+        job_ids = list(jobs)
+        rows = index.add(job_ids, [job_terms(job["title"], job["description"], job["requirements"])
+                                   for job in jobs.values()])
+        return index.link(rows)
+
+
+async def publish_neighbors(redis_service: RedisService, index: SimilarJobIndex, job_ids: Iterable[str]):
+    """Escribe en Redis las listas de `job_ids` por pipelines de PUBLISH_BATCH ofertas"""
+    batch: Dict[str, Dict[str, float]] = {}
+    for job_id in job_ids:
+        batch[job_id] = index.neighbors(job_id)
+        if len(batch) >= PUBLISH_BATCH:
+            await redis_service.set_similar_jobs(batch)
+            batch = {}
+    await redis_service.set_similar_jobs(batch)
@@ -1,22 +1,27 @@
+import asyncio
 import json
 import logging
 from contextlib import asynccontextmanager
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
 
 from aiokafka import AIOKafkaProducer
+from opentelemetry.trace import SpanKind
+
+from app.core.logging_config import get_sampled_logger
+from app.core.metrics import track
+from app.core.tracing import client_span, inject_headers
 
 logger = logging.getLogger(__name__)
+# Por evento enviado: INFO limitado por tasa
+send_logger = get_sampled_logger(__name__)
 
 KAFKA_BOOTSTRAP_SERVERS = 'localhost:9092'
 
 
 class KafkaProducer:
     def __init__(self):
-        self._producer = AIOKafkaProducer(
-            bootstrap_servers=KAFKA_BOOTSTRAP_SERVERS,
-            value_serializer=self._serialize_value,
-            request_timeout_ms=10000
-        )
+        # Se crea en start(): AIOKafkaProducer necesita un loop en ejecución
+        self._producer: Optional[AIOKafkaProducer] = None
         self._started = False
 
     def _serialize_value(self, value: Dict[str, Any]) -> bytes:
@@ -41,17 +46,25 @@ class KafkaProducer:
 
             return json.dumps(value).encode('utf-8')
         except Exception as e:
-            logger.error(f"Error serializing event: {str(e)}")
+            logger.error("Error serializing event: %s", e)
             raise
 
     async def start(self):
         if not self._started:
             try:
+                if self._producer is None:
+                    self._producer = AIOKafkaProducer(
+                        bootstrap_servers=KAFKA_BOOTSTRAP_SERVERS,
+                        value_serializer=self._serialize_value,
+                        request_timeout_ms=10000
+                    )
                 await self._producer.start()
                 self._started = True
                 logger.info("Kafka producer started successfully")
             except Exception as e:
-                logger.error(f"Error starting Kafka producer: {str(e)}")
+                logger.error("Error starting Kafka producer: %s", e)
+                # Un AIOKafkaProducer que falló al iniciar no se reutiliza
+                self._producer = None
                 raise
 
     async def stop(self):
@@ -60,7 +73,7 @@ class KafkaProducer:
                 await self._producer.stop()
                 logger.info("Kafka producer stopped successfully")
             except Exception as e:
-                logger.error(f"Error stopping Kafka producer: {str(e)}")
+                logger.error("Error stopping Kafka producer: %s", e)
             finally:
                 self._started = False
 
@@ -75,25 +88,57 @@ class KafkaProducer:
             try:
                 await self.start()
             except Exception as e:
-                logger.error(f"Failed to start producer: {str(e)}")
+                logger.error("Failed to start producer: %s", e)
                 return None
 
-        try:
-            # Registrar el evento que se intenta enviar
-            logger.debug(f"Attempting to send event to topic {topic}: {event}")
-            #print(f"Attempting to send event to topic {topic}: {event}")
-            # Intentar enviar el mensaje
-            await self._producer.send_and_wait(topic, event)
-            #print(f"Event sent to Kafka: {event['type']}")
-            logger.info(f"Successfully sent event type '{event.get('type')}' to topic {topic}")
-            logger.debug(f"Event details: {event}")
+        attributes = {"messaging.system": "kafka", "messaging.destination.name": topic,
+                      "messaging.operation.type": "send"}
+        with client_span(f"send {topic}", attributes, kind=SpanKind.PRODUCER):
+            try:
+                # Registrar el evento que se intenta enviar (el contenido solo en DEBUG)
+                send_logger.debug("Attempting to send event to topic %s: %s", topic, event)
+                # Intentar enviar el mensaje; el contexto de la traza viaja en las cabeceras
+                with track("kafka"):
+                    await self._producer.send_and_wait(topic, event, headers=inject_headers())
+                send_logger.info("Successfully sent event type '%s' to topic %s", event.get('type'), topic)
 
-            return event
+                return event
 
-        except Exception as e:
-            logger.error(f"Failed to send event to topic {topic}: {str(e)}")
-            logger.error(f"Event that failed: {event}")
-            raise
+            except Exception as e:
+                logger.error("Failed to send event type '%s' to topic %s: %s", event.get('type'), topic, e)
+                logger.debug("Event that failed: %s", event)
+                raise
+
+    async def send_events(self, topic: str, events: List[Dict[str, Any]], key_field: Optional[str] = None):
+        """
+        Envía un lote de eventos sin esperar la confirmación de cada uno: el
+        productor los agrupa por partición y se espera a todas al final.
+        Con `key_field`, la clave del mensaje es ese campo de `data` (mismo
+        valor, misma partición y orden).
+        """
+        if not events:
+            return
+        if not self._started:
+            await self.start()
+
+        attributes = {"messaging.system": "kafka", "messaging.destination.name": topic,
+                      "messaging.operation.type": "send", "messaging.batch.message_count": len(events)}
+        with client_span(f"send {topic}", attributes, kind=SpanKind.PRODUCER):
+            try:
+                headers = inject_headers()
+                with track("kafka"):
+                    deliveries = [
+                        await self._producer.send(
+                            topic, event, headers=headers,
+                            key=str(event["data"][key_field]).encode("utf-8") if key_field else None
+                        )
+                        for event in events
+                    ]
+                    await asyncio.gather(*deliveries)
+                send_logger.info("Successfully sent %d events to topic %s", len(events), topic)
+            except Exception as e:
+                logger.error("Failed to send %d events to topic %s: %s", len(events), topic, e)
+                raise
 
     async def __aenter__(self):
         await self.start()
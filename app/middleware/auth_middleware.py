@@ -6,8 +6,7 @@ import jwt
 import os
 import logging
 
-# Configuración de logging
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
 
 
 class TokenCache:
@@ -32,9 +31,8 @@ class TokenCache:
         Returns:
             Optional[dict]: Información del token/sesión del usuario o None si no existe
         """
-        logging.info(f"Token para el usuario {user_id}")
+        logger.debug("Token para el usuario %s", user_id)
         session_info = self.get_user_session(user_id)
-        logging.info(f"session_info: {session_info}")
         if session_info:
             return {
                 "userId": user_id,
@@ -64,8 +62,7 @@ class TokenCache:
         """
         Recupera la información de sesión del usuario desde la caché
         """
-        logging.info(f"Obteniendo sesión de usuario {user_id} desde la caché")
-        logging.info(f"Cache: {self._cache}")
+        logger.debug("Obteniendo sesión de usuario %s desde la caché", user_id)
         return self._cache.get(user_id)
 
     def invalidate_session(self, user_id: str):
@@ -110,13 +107,13 @@ class EventBasedAuthHandler:
     def handle_auth_event(self, event: dict):
         event_type = event.get('type')
         user_id = event.get('userId')
-        logging.info(f"Manejando evento de autenticación: {event_type} para usuario {user_id}")
+        logger.info("Manejando evento de autenticación: %s para usuario %s", event_type, user_id)
 
         if event_type == 'USERS_LIST_UPDATED':
             # Actualizar la lista completa de usuarios
             users = event.get('users', [])
             self.token_cache.update_users_list(users)
-            logging.info(f"Lista de usuarios actualizada con {len(users)} usuarios")
+            logger.info("Lista de usuarios actualizada con %d usuarios", len(users))
 
         # Mapear tipos de eventos
         elif event_type in ['LOGIN', 'REGISTER']:
@@ -127,7 +124,7 @@ class EventBasedAuthHandler:
                 'courseIds': event.get('courseIds', []),
                 'email': event.get('email')
             })
-            logging.info(f"Sesión almacenada para usuario {user_id}")
+            logger.info("Sesión almacenada para usuario %s", user_id)
         elif event_type == 'ROLE_UPDATE':
             session_info = self.token_cache.get_user_session(user_id)
             if session_info:
@@ -135,7 +132,7 @@ class EventBasedAuthHandler:
                     'roles': event.get('roles', session_info.get('roles', [])),
                 })
                 self.token_cache.add_user_session(user_id, session_info)
-                logging.info(f"Roles actualizados para usuario {user_id}")
+                logger.info("Roles actualizados para usuario %s", user_id)
 
 
 class JWTBearerHandler(HTTPBearer):
@@ -1,7 +1,7 @@
 # models.py
 from datetime import datetime
 from typing import List
-from sqlalchemy import Column, String, DateTime, Boolean, Integer, ForeignKey
+from sqlalchemy import Column, String, DateTime, Boolean, Integer, Float, ForeignKey, Index, UniqueConstraint, Table, text
 from sqlalchemy.dialects.postgresql import ARRAY
 from sqlalchemy.orm import relationship
 from uuid import uuid4
@@ -11,7 +11,19 @@ from app.db.base import Base
 
 class JobOffer(Base):
     __tablename__ = "job_offers"
-    __table_args__ = {"schema": "public"}
+    __table_args__ = (
+        Index("ix_job_offers_updated_at_id", "updated_at", "id"),
+        Index("ix_job_offers_applications_count", "applications_count"),
+        # Índices parciales para el barrido de ofertas vencidas y el archivado
+        Index("ix_job_offers_active_last_seen_at", "last_seen_at", postgresql_where=text("active")),
+        Index("ix_job_offers_inactive_updated_at", "updated_at", postgresql_where=text("NOT active")),
+        # Cotas del rango salarial tal como las compara search_jobs (una cota abierta toma la otra)
+        Index("ix_job_offers_salary_lower", text("coalesce(salary_min, salary_max)")),
+        Index("ix_job_offers_salary_upper", text("coalesce(salary_max, salary_min)")),
+        # Búsqueda por lugar y por radio (ambas se resuelven a una lista de place_id)
+        Index("ix_job_offers_place_id", "place_id"),
+        {"schema": "public"},
+    )
 
     id: str = Column(String, primary_key=True, default=lambda: str(uuid4()))
     title: str = Column(String, nullable=False)
@@ -21,20 +33,49 @@ class JobOffer(Base):
     job_type: str = Column(String, nullable=False)
     level: str = Column(String, nullable=False)
     salary_range: str = Column(String, nullable=True)
+    # Derivados de salary_range (ver app/services/salary_parser.py): importes mensuales
+    salary_min: int = Column(Integer, nullable=True)
+    salary_max: int = Column(Integer, nullable=True)
+    salary_currency: str = Column(String(3), nullable=True)
+    salary_period: str = Column(String, nullable=True)  # Periodo en que venía expresado
     location: str = Column(String, nullable=False)
+    # Derivados de location (ver app/services/location_normalizer.py)
+    place_id: str = Column(String, nullable=True)  # Lugar canónico del gazetteer
+    latitude: float = Column(Float, nullable=True)
+    longitude: float = Column(Float, nullable=True)
     is_remote: bool = Column(Boolean, default=False)
     active: bool = Column(Boolean, default=True)
     created_at: datetime = Column(DateTime, default=datetime.utcnow)
     updated_at: datetime = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     applications_count: int = Column(Integer, default=0)
+    source: str = Column(String, nullable=True)  # Plataforma de origen del scraping
+    last_seen_at: datetime = Column(DateTime, default=datetime.utcnow)  # Última vez que el scraper la vio
 
     # Relaciones
     applications = relationship("JobApplication", back_populates="job_offer")
 
 
+# Ofertas inactivas movidas fuera de la tabla caliente tras el periodo de retención.
+# Replica las columnas de job_offers (sin índices ni defaults) más la fecha de archivado.
+job_offers_archive = Table(
+    "job_offers_archive",
+    Base.metadata,
+    *[
+        Column(column.name, column.type, primary_key=column.primary_key, nullable=column.nullable)
+        for column in JobOffer.__table__.columns
+    ],
+    Column("archived_at", DateTime, default=datetime.utcnow),
+    schema="public",
+)
+
+
 class JobApplication(Base):
     __tablename__ = "job_applications"
-    __table_args__ = {"schema": "public"}
+    __table_args__ = (
+        Index("ix_job_applications_id_user_created_at", "id_user", "created_at"),
+        UniqueConstraint("job_offer_id", "id_user", name="uq_job_applications_job_offer_user"),
+        {"schema": "public"},
+    )
 
     id: str = Column(String, primary_key=True, default=lambda: str(uuid4()))
     job_offer_id: str = Column(String, ForeignKey("public.job_offers.id"), nullable=False)
@@ -46,3 +87,27 @@ class JobApplication(Base):
 
     # Relación con JobOffer
     job_offer = relationship("JobOffer", back_populates="applications")
+
+
+class SavedSearch(Base):
+    """Búsqueda guardada por un usuario; las ofertas nuevas que la cumplen generan una alerta"""
+    __tablename__ = "saved_searches"
+    __table_args__ = (
+        Index("ix_saved_searches_id_user", "id_user"),
+        # Recarga incremental del percolador
+        Index("ix_saved_searches_updated_at", "updated_at"),
+        {"schema": "public"},
+    )
+
+    id: str = Column(String, primary_key=True, default=lambda: str(uuid4()))
+    id_user: str = Column(String, nullable=False)  # ID del usuario
+    name: str = Column(String, nullable=True)
+    # Mismos criterios que /jobs/search/val
+    q: str = Column(String, nullable=True)
+    location: str = Column(String, nullable=True)
+    is_remote: bool = Column(Boolean, nullable=True)
+    job_type: str = Column(String, nullable=True)
+    level: str = Column(String, nullable=True)
+    active: bool = Column(Boolean, default=True)
+    created_at: datetime = Column(DateTime, default=datetime.utcnow)
+    updated_at: datetime = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -1,8 +1,8 @@
 # model/schemas.py
 import uuid
 
-from pydantic import BaseModel, Field, EmailStr
-from typing import Optional, List
+from pydantic import BaseModel, Field, EmailStr, model_validator
+from typing import Optional, List, Dict
 from datetime import datetime
 
 
@@ -36,7 +36,16 @@ class JobCreate(BaseModel):
     job_type: str = "NOT_SPECIFIED"
     level: str = "NOT_SPECIFIED"
     salary_range: Optional[str] = None
+    # Derivados de salary_range: importes mensuales
+    salary_min: Optional[int] = None
+    salary_max: Optional[int] = None
+    salary_currency: Optional[str] = None
+    salary_period: Optional[str] = None
     location: str
+    # Derivados de location: lugar canónico del gazetteer y sus coordenadas
+    place_id: Optional[str] = None
+    latitude: Optional[float] = None
+    longitude: Optional[float] = None
     is_remote: bool = False
     active: bool = True
     created_at: datetime = datetime.utcnow()  # Fecha de creación
@@ -53,6 +62,8 @@ class SearchResponse(BaseModel):
     total: int  # Total de trabajos encontrados
     page: int  # Página actual
     totalPages: int  # Total de páginas disponibles
+    # Conteos por valor de job_type, level, is_remote, location y company (solo con facets=true)
+    facets: Optional[Dict[str, Dict[str, int]]] = None
 
 
 class JobUpdate(BaseModel):
@@ -65,17 +76,87 @@ class JobUpdate(BaseModel):
 
 
 class Job(JobBase):
+    id: Optional[str] = None
     title: str = Field(..., min_length=5, max_length=100)
     description: Optional[str] = Field(None, min_length=0)  # Permite un valor vacío como predeterminado
     requirements: list[str]
     location: str
     salary_range: Optional[str] = None
+    salary_min: Optional[int] = None
+    salary_max: Optional[int] = None
+    salary_currency: Optional[str] = None
+    salary_period: Optional[str] = None
+    place_id: Optional[str] = None
+    latitude: Optional[float] = None
+    longitude: Optional[float] = None
     is_active: bool = True
 
     class Config:
         from_attributes = True
 
 
+# Máximo de ids que se resuelven en una sola consulta de lote
+JOB_BATCH_MAX_IDS = 200
+
+
+class JobBatchRequest(BaseModel):
+    ids: List[str] = Field(..., min_length=1, max_length=JOB_BATCH_MAX_IDS)
+
+
+# Skills por solicitud de recomendación
+RECOMMEND_MAX_SKILLS = 50
+
+
+class RecommendRequest(BaseModel):
+    skills: List[str] = Field(..., min_length=1, max_length=RECOMMEND_MAX_SKILLS)
+    limit: int = Field(10, ge=1, le=100)
+    location: Optional[str] = None
+    is_remote: Optional[bool] = None
+
+
+class JobRecommendation(BaseModel):
+    job: Job
+    score: float  # Similitud coseno TF-IDF entre las skills y los requisitos (0 a 1)
+    matched_skills: List[str]
+
+
+class PlaceResponse(BaseModel):
+    place_id: str
+    name: str
+    country: str
+    kind: str  # country, city o district
+    latitude: float
+    longitude: float
+
+
+# Búsquedas guardadas por usuario
+SAVED_SEARCH_MAX_PER_USER = 50
+
+
+class SavedSearchCreate(BaseModel):
+    name: Optional[str] = Field(None, max_length=100)
+    q: Optional[str] = Field(None, max_length=100)
+    location: Optional[str] = Field(None, max_length=100)
+    is_remote: Optional[bool] = None
+    job_type: Optional[str] = None
+    level: Optional[str] = None
+
+    @model_validator(mode="after")
+    def require_criteria(self):
+        # Sin criterios la búsqueda coincidiría con todas las ofertas nuevas
+        if not any([self.q, self.location, self.job_type, self.level, self.is_remote is not None]):
+            raise ValueError("La búsqueda guardada necesita al menos un criterio")
+        return self
+
+
+class SavedSearch(SavedSearchCreate):
+    id: str
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
 class ProfileData(BaseModel):
     first_name: str
     last_name: str
@@ -107,3 +188,7 @@ class JobApplicationResponse(BaseModel):
     applicant_email: EmailStr
     status: str
     created_at: datetime
+
+
+class UserApplicationResponse(JobApplicationResponse):
+    job_offer: Optional[Job] = None
@@ -0,0 +1,200 @@
+# services/job_ingestion.py
+import uuid
+from datetime import datetime
+from operator import itemgetter
+from typing import Dict, Any, Optional, List, NamedTuple
+
+from pydantic import BeforeValidator, TypeAdapter, ValidationError
+from typing_extensions import Annotated, TypedDict
+
+from app.model.schemas import JobCreate
+from app.services.location_normalizer import location_columns
+from app.services.salary_parser import salary_columns
+
+DEFAULT_DESCRIPTION = "Descripción no disponible. Por favor, contáctenos para más información."
+
+# Orden de las columnas de job_offers en las filas validadas por lote
+JOB_COLUMNS = (
+    "id", "title", "company", "description", "requirements", "job_type", "level", "salary_range",
+    "salary_min", "salary_max", "salary_currency", "salary_period", "location", "place_id", "latitude",
+    "longitude", "is_remote", "active", "source", "created_at", "updated_at", "last_seen_at",
+    "applications_count",
+)
+# Columnas que se sobrescriben cuando la oferta ya existe (upsert)
+UPSERT_UPDATE_COLUMNS = ("title", "description", "updated_at", "active", "last_seen_at")
+
+
+def normalize_description(description: Optional[str]) -> str:
+    # Asigna un valor predeterminado si la descripción está vacía o no tiene suficientes caracteres
+    description = (description or "").strip()
+    if len(description) < 20:
+        return DEFAULT_DESCRIPTION
+    return description
+
+
+def event_job_id(job_data: Dict[str, Any]) -> Optional[str]:
+    """Id de la oferta de un evento: el del scraper o, si no viene, `id`"""
+    return job_data.get('source_job_id') or job_data.get('id')
+
+
+def process_job_data(job_data: dict) -> dict:
+    job_data['id'] = event_job_id(job_data) or str(uuid.uuid4())
+    job_data['creator_id'] = "default_creator"  # Asigna un valor por defecto
+    job_data['created_at'] = datetime.utcnow()  # Fecha de creación
+    job_data['updated_at'] = datetime.utcnow()  # Fecha de última actualización
+    job_data['active'] = True  # Valor por defecto para 'active'
+    job_data['description'] = normalize_description(job_data.get('description'))
+    job_data.update(salary_columns(job_data.get('salary_range')))
+    job_data.update(location_columns(job_data.get('location')))
+
+    return job_data
+
+
+def build_job_create(job_data: Dict[str, Any], metadata: Dict[str, Any]) -> JobCreate:
+    """Normaliza los datos de un evento JOB_CREATED y los valida como JobCreate"""
+    job_data = process_job_data(job_data)
+    return JobCreate(
+        id=job_data['id'],
+        title=job_data.get('title'),
+        description=job_data.get('description'),
+        requirements=job_data.get('requirements', []),
+        location=job_data.get('location'),
+        place_id=job_data['place_id'],
+        latitude=job_data['latitude'],
+        longitude=job_data['longitude'],
+        salary_range=job_data.get('salary_range'),
+        salary_min=job_data['salary_min'],
+        salary_max=job_data['salary_max'],
+        salary_currency=job_data['salary_currency'],
+        salary_period=job_data['salary_period'],
+        company=job_data.get('company'),
+        job_type=job_data.get('job_type', 'NOT_SPECIFIED'),
+        level=job_data.get('level', 'NOT_SPECIFIED'),
+        is_remote=job_data.get('is_remote', False),
+        source_url=job_data.get('source_url'),
+        source=metadata.get('source'),
+        processed_at=metadata.get('processed_at'),
+        raw_job_id=job_data.get('raw_job_id')
+    )
+
+
+class JobRow(TypedDict):
+    """Fila de job_offers tal como se inserta; se valida sin construir modelos"""
+    id: str
+    title: str
+    company: str
+    description: str
+    requirements: List[str]
+    job_type: str
+    level: str
+    salary_range: Optional[str]
+    salary_min: Optional[int]
+    salary_max: Optional[int]
+    salary_currency: Optional[str]
+    salary_period: Optional[str]
+    location: str
+    place_id: Optional[str]
+    latitude: Optional[float]
+    longitude: Optional[float]
+    is_remote: bool
+    active: bool
+    source: Optional[str]
+    created_at: datetime
+    updated_at: datetime
+    last_seen_at: datetime
+    applications_count: int
+
+
+class JobRecordError(NamedTuple):
+    index: int  # Posición del evento en el lote
+    errors: List[Dict[str, Any]]
+
+
+class JobBatch(NamedTuple):
+    rows: List[tuple]  # Tuplas en el orden de JOB_COLUMNS
+    errors: List[JobRecordError]
+
+
+def _event_to_row(event: Any) -> Any:
+    """
+    Aplica las reglas de process_job_data a un evento {"data", "metadata"}
+    y produce directamente el dict de columnas que valida JobRow.
+    """
+    if not isinstance(event, dict):
+        return event
+    try:
+        return _event_columns(event)
+    except Exception as e:
+        # Como ValueError pydantic lo reporta en el índice del evento en vez de abortar el lote
+        raise ValueError(f"evento no procesable: {e!r}") from e
+
+
+def _event_columns(event: Dict[str, Any]) -> Dict[str, Any]:
+    data = event.get("data") or {}
+    metadata = event.get("metadata") or {}
+    now = datetime.utcnow()
+    return {
+        "id": event_job_id(data) or str(uuid.uuid4()),
+        "title": data.get("title"),
+        "company": data.get("company"),
+        "description": normalize_description(data.get("description")),
+        "requirements": data.get("requirements", []),
+        "job_type": data.get("job_type", "NOT_SPECIFIED"),
+        "level": data.get("level", "NOT_SPECIFIED"),
+        "salary_range": data.get("salary_range"),
+        **salary_columns(data.get("salary_range")),
+        "location": data.get("location"),
+        **location_columns(data.get("location")),
+        "is_remote": data.get("is_remote", False),
+        "active": True,
+        "source": metadata.get("source"),
+        "created_at": now,
+        "updated_at": now,
+        "last_seen_at": now,
+        "applications_count": 0,
+    }
+
+
+# Validador compilado una sola vez para listas completas de eventos
+_job_batch_adapter = TypeAdapter(List[Annotated[JobRow, BeforeValidator(_event_to_row)]])
+_row_values = itemgetter(*JOB_COLUMNS)
+
+
+def validate_job_batch(events: List[Dict[str, Any]]) -> JobBatch:
+    """
+    Valida un lote de eventos JOB_CREATED en una sola llamada al validador.
+    Si hay errores se reportan por evento y los válidos se vuelven a validar
+    juntos, así el caso común (todo válido) recorre el lote una sola vez.
+
+    >>> job = {"title": "Backend developer", "company": "Acme", "location": "Lima"}
+    >>> batch = validate_job_batch([
+    ...     {"data": {**job, "salary_range": "S/ 3000"}},
+    ...     {"data": {**job, "salary_range": 3000}},
+    ...     {"data": {**job, "salary_range": ["S/ 3000"]}},
+    ... ])
+    >>> len(batch.rows), [error.index for error in batch.errors]
+    (1, [1, 2])
+
+    Un evento que ni siquiera se puede convertir en columnas se reporta igual:
+
+    >>> batch = validate_job_batch([
+    ...     {"data": job},
+    ...     {"data": {**job, "description": 42}},
+    ...     {"data": ["no", "es", "un", "dict"]},
+    ...     {"data": job},
+    ... ])
+    >>> len(batch.rows), [(error.index, error.errors[0]["type"]) for error in batch.errors]
+    (2, [(1, 'value_error'), (2, 'value_error')])
+    """
+    try:
+        rows = _job_batch_adapter.validate_python(events)
+        return JobBatch([_row_values(row) for row in rows], [])
+    except ValidationError as e:
+        by_index: Dict[int, List[Dict[str, Any]]] = {}
+        for error in e.errors(include_url=False):
+            by_index.setdefault(error["loc"][0], []).append(error)
+
+    errors = [JobRecordError(index, by_index[index]) for index in sorted(by_index)]
+    valid_events = [event for index, event in enumerate(events) if index not in by_index]
+    rows = _job_batch_adapter.validate_python(valid_events)
+    return JobBatch([_row_values(row) for row in rows], errors)
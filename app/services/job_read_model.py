@@ -0,0 +1,371 @@
+# services/job_read_model.py
+"""
+Modelo de lectura en memoria del catálogo activo, por columnas.
+
+Cada worker guarda las ofertas activas en arreglos de NumPy: ids como
+cadenas internadas, título/ubicación/tipo/nivel codificados contra
+diccionarios, `is_remote`/`active` como máscaras booleanas y fechas en
+datetime64. Una búsqueda combina máscaras vectorizadas en lugar de ir a
+Postgres, y las facetas salen de un bincount sobre la misma máscara; solo
+la página resultante se lee por clave primaria. Los requisitos alimentan un
+índice invertido de skills para las recomendaciones.
+
+Se construye desde un snapshot de la base y se mantiene al día con
+`job-events` (ver JobProjectionConsumer).
+"""
+import logging
+import os
+import sys
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import select
+
+from app.core.metrics import registry
+from app.db.database import SessionLocal
+from app.model.models import JobOffer
+from app.services.skill_index import SkillIndex
+
+logger = logging.getLogger(__name__)
+
+# Cada cuánto se reconstruye desde la base (recoge bajas del barrido, que no emiten eventos)
+READ_MODEL_REFRESH_SECONDS = int(os.getenv("READ_MODEL_REFRESH_SECONDS", 900))
+READ_MODEL_SNAPSHOT_BATCH = int(os.getenv("READ_MODEL_SNAPSHOT_BATCH", 5000))
+# Eventos anteriores al snapshot que se vuelven a aplicar sobre él: cubre los que
+# JobEventConsumer aún no había escrito en la base (debe superar su retraso)
+READ_MODEL_REPLAY_SECONDS = int(os.getenv("READ_MODEL_REPLAY_SECONDS", 120))
+# Postings agregados por la ingesta antes de recalcular en lote los pesos TF-IDF
+READ_MODEL_REWEIGHT_PENDING = int(os.getenv("READ_MODEL_REWEIGHT_PENDING", 50000))
+
+# Columnas de job_offers que guarda el modelo
+READ_MODEL_COLUMNS = (
+    "id", "title", "company", "location", "job_type", "level", "is_remote", "requirements",
+    "salary_min", "salary_max", "salary_currency", "place_id", "created_at", "updated_at",
+)
+# Términos nuevos que se buscan uno a uno antes de reindexar el diccionario
+VOCABULARY_REINDEX_PENDING = 256
+# Subcadenas cuyo resultado sobre el diccionario indexado se recuerda (búsquedas repetidas)
+VOCABULARY_MATCH_CACHE_SIZE = 256
+
+read_model_jobs = registry.gauge("read_model_jobs", "Ofertas activas en el modelo de lectura")
+read_model_memory = registry.gauge("read_model_memory_bytes", "Memoria aproximada del modelo de lectura")
+read_model_bytes_per_job = registry.gauge("read_model_bytes_per_job", "Memoria aproximada por oferta activa")
+
+
+class _Vocabulary:
+    """Cadenas internadas con código entero y búsqueda de subcadenas vectorizada"""
+
+    def __init__(self):
+        self.values: List[str] = []
+        self._codes: Dict[str, int] = {}
+        # Minúsculas en UTF-8 de ancho fijo (np.strings.find sobre bytes es varias
+        # veces más rápido que sobre StringDType) y los términos aún no indexados
+        self._lowered = np.empty(0, dtype="S1")
+        self._pending: List[str] = []
+        self._match_cache: Dict[str, np.ndarray] = {}
+
+    def encode(self, value: Optional[str]) -> int:
+        value = value or ""
+        code = self._codes.get(value)
+        if code is None:
+            code = len(self.values)
+            value = sys.intern(value)
+            self.values.append(value)
+            self._codes[value] = code
+            self._pending.append(value.lower())
+        return code
+
+    def code(self, value: str) -> Optional[int]:
+        return self._codes.get(value)
+
+    def matching(self, needle: str) -> np.ndarray:
+        """Tabla booleana por código: True si el valor contiene `needle` (en minúsculas)"""
+        if len(self._pending) > VOCABULARY_REINDEX_PENDING:
+            self._reindex()
+        indexed_matches = self._match_cache.get(needle)
+        if indexed_matches is None:
+            # UTF-8 se autosincroniza: subcadena en bytes equivale a subcadena en texto
+            indexed_matches = np.strings.find(self._lowered, needle.encode("utf-8")) >= 0
+            if len(self._match_cache) >= VOCABULARY_MATCH_CACHE_SIZE:
+                self._match_cache.pop(next(iter(self._match_cache)))
+            self._match_cache[needle] = indexed_matches
+        matches = np.zeros(len(self.values), dtype=bool)
+        indexed = len(self._lowered)
+        matches[:indexed] = indexed_matches
+        for offset, value in enumerate(self._pending):
+            if needle in value:
+                matches[indexed + offset] = True
+        return matches
+
+    def _reindex(self):
+        encoded = np.array([value.encode("utf-8") for value in self._pending], dtype=bytes)
+        self._lowered = np.concatenate([self._lowered, encoded])
+        self._pending = []
+        self._match_cache.clear()
+
+    def memory_bytes(self) -> int:
+        strings = sum(sys.getsizeof(value) for value in self.values)
+        return strings + self._lowered.nbytes + sys.getsizeof(self.values) + sys.getsizeof(self._codes)
+
+
+class JobReadModel:
+    """Ofertas activas en arreglos por columna; una fila por oferta vista desde el snapshot"""
+
+    _ARRAYS = {
+        "ids": object, "title": np.int32, "company": np.int32, "location": np.int32,
+        "job_type": np.int16, "level": np.int16, "is_remote": bool, "active": bool, "created_at": "datetime64[us]", "updated_at": "datetime64[us]",
+        # Cotas del rango salarial mensual como las compara search_jobs; NaN sin salario
+        "salary_lower": np.float32, "salary_upper": np.float32, "salary_currency": np.int16,
+        "place": np.int32,
+    }
+
+    def __init__(self, capacity: int = 1024):
+        self.size = 0
+        self.active_count = 0
+        self._index: Dict[str, int] = {}
+        for name, dtype in self._ARRAYS.items():
+            setattr(self, name, np.zeros(capacity, dtype=dtype) if dtype is not object
+                    else np.empty(capacity, dtype=object))
+        self.titles = _Vocabulary()
+        self.companies = _Vocabulary()
+        self.locations = _Vocabulary()
+        self.job_types = _Vocabulary()
+        self.levels = _Vocabulary()
+        self.currencies = _Vocabulary()
+        self.places = _Vocabulary()
+        self.skills = SkillIndex()
+
+    def _grow(self):
+        capacity = len(self.ids) * 2
+        for name in self._ARRAYS:
+            current = getattr(self, name)
+            grown = np.empty(capacity, dtype=current.dtype) if current.dtype == object \
+                else np.zeros(capacity, dtype=current.dtype)
+            grown[:self.size] = current[:self.size]
+            setattr(self, name, grown)
+
+    def upsert(self, job: Dict[str, Any]):
+        """Agrega o reemplaza una oferta activa (dict con READ_MODEL_COLUMNS)"""
+        row = self._index.get(job["id"])
+        if row is None:
+            if self.size == len(self.ids):
+                self._grow()
+            row = self.size
+            self.size += 1
+            job_id = sys.intern(job["id"])
+            self.ids[row] = job_id
+            self._index[job_id] = row
+            self.created_at[row] = job.get("created_at") or datetime.utcnow()
+        self.title[row] = self.titles.encode(job["title"])
+        self.company[row] = self.companies.encode(job.get("company"))
+        self.location[row] = self.locations.encode(job.get("location"))
+        self.job_type[row] = self.job_types.encode(job.get("job_type"))
+        self.level[row] = self.levels.encode(job.get("level"))
+        self.is_remote[row] = bool(job.get("is_remote"))
+        self._set_salary(row, job)
+        self.place[row] = self.places.encode(job.get("place_id"))
+        self.updated_at[row] = job.get("updated_at") or datetime.utcnow()
+        if "requirements" in job:
+            self.skills.set(row, job["requirements"])
+        self._set_active(row, True)
+
+    def update(self, job_id: str, changes: Dict[str, Any], active: Optional[bool] = None):
+        """Cambios parciales sobre una oferta conocida; las desconocidas se ignoran como en la base"""
+        row = self._index.get(job_id)
+        if row is None:
+            return
+        for field, vocabulary in (("title", self.titles), ("company", self.companies), ("location", self.locations),
+                                  ("job_type", self.job_types), ("level", self.levels)):
+            if field in changes:
+                getattr(self, field)[row] = vocabulary.encode(changes[field])
+        if "is_remote" in changes:
+            self.is_remote[row] = bool(changes["is_remote"])
+        if "salary_currency" in changes:
+            self._set_salary(row, changes)
+        if "place_id" in changes:
+            self.place[row] = self.places.encode(changes["place_id"])
+        if "requirements" in changes:
+            self.skills.set(row, changes["requirements"])
+        self.updated_at[row] = changes.get("updated_at") or datetime.utcnow()
+        if active is not None:
+            self._set_active(row, active)
+
+    def _set_salary(self, row: int, job: Dict[str, Any]):
+        low, high = job.get("salary_min"), job.get("salary_max")
+        low, high = (low if low is not None else high), (high if high is not None else low)
+        self.salary_lower[row] = np.nan if low is None else low
+        self.salary_upper[row] = np.nan if high is None else high
+        self.salary_currency[row] = self.currencies.encode(job.get("salary_currency"))
+
+    def deactivate(self, job_id: str):
+        row = self._index.get(job_id)
+        if row is not None:
+            self._set_active(row, False)
+
+    def contains(self, job_id: str) -> bool:
+        return job_id in self._index
+
+    def _set_active(self, row: int, active: bool):
+        if self.active[row] != active:
+            self.active_count += 1 if active else -1
+            self.active[row] = active
+
+    def search(
+            self,
+            q: Optional[str] = None,
+            location: Optional[str] = None,
+            is_remote: Optional[bool] = None,
+            job_type: Optional[str] = None,
+            level: Optional[str] = None,
+            offset: int = 0,
+            limit: int = 10,
+            facet_limit: Optional[int] = None,
+            salary_min: Optional[int] = None,
+            salary_max: Optional[int] = None,
+            salary_currency: Optional[str] = None,
+            place_ids: Optional[Iterable[str]] = None
+    ) -> Tuple[int, List[str], Optional[Dict[str, Dict[str, int]]]]:
+        """
+        Total, ids de la página y, con `facet_limit`, las facetas de los
+        filtros de search_jobs, sobre ofertas activas. q y location se
+        comparan como ILIKE '%valor%'.
+        """
+        size = self.size
+        mask = self.active[:size].copy()
+        if q:
+            mask &= self.titles.matching(q.lower())[self.title[:size]]
+        if location:
+            mask &= self.locations.matching(location.lower())[self.location[:size]]
+        if is_remote is not None:
+            mask &= self.is_remote[:size] == is_remote
+        # NaN no cumple ninguna comparación: las ofertas sin salario quedan fuera
+        if salary_min is not None:
+            mask &= self.salary_upper[:size] >= salary_min
+        if salary_max is not None:
+            mask &= self.salary_lower[:size] <= salary_max
+        if place_ids is not None:
+            codes = [code for code in map(self.places.code, place_ids) if code is not None]
+            mask &= np.isin(self.place[:size], codes)
+        for vocabulary, column, value in ((self.job_types, self.job_type, job_type),
+                                          (self.levels, self.level, level),
+                                          (self.currencies, self.salary_currency, salary_currency)):
+            if value is not None:
+                code = vocabulary.code(value)
+                if code is None:
+                    mask[:] = False
+                    break
+                mask &= column[:size] == code
+        rows = np.flatnonzero(mask)
+        facets = self.facet_counts(mask, facet_limit) if facet_limit else None
+        return int(rows.size), self.ids[rows[offset:offset + limit]].tolist(), facets
+
+    def facet_counts(self, mask: np.ndarray, limit: int) -> Dict[str, Dict[str, int]]:
+        """Conteos por valor de las filas de `mask`, de mayor a menor, hasta `limit` por faceta"""
+        size = self.size
+        facets: Dict[str, Dict[str, int]] = {}
+        for name, vocabulary, column in (("job_type", self.job_types, self.job_type),
+                                         ("level", self.levels, self.level),
+                                         ("location", self.locations, self.location),
+                                         ("company", self.companies, self.company)):
+            counts = np.bincount(column[:size][mask], minlength=len(vocabulary.values))
+            # Valores vacíos (NULL en la base) no son una faceta
+            empty = vocabulary.code("")
+            if empty is not None:
+                counts[empty] = 0
+            top = np.flatnonzero(counts)
+            if top.size > limit:
+                top = top[np.argpartition(-counts[top], limit - 1)[:limit]]
+            top = top[np.argsort(-counts[top], kind="stable")]
+            facets[name] = {vocabulary.values[code]: int(counts[code]) for code in top}
+        remote = int(np.count_nonzero(self.is_remote[:size] & mask))
+        total = int(np.count_nonzero(mask))
+        facets["is_remote"] = {
+            key: count for key, count in sorted((("true", remote), ("false", total - remote)),
+                                                key=lambda item: -item[1]) if count
+        }
+        return facets
+
+    def recommend(
+            self,
+            skills: List[str],
+            k: int = 10,
+            location: Optional[str] = None,
+            is_remote: Optional[bool] = None
+    ) -> List[Tuple[str, float, List[str]]]:
+        """Las `k` ofertas activas más afines a `skills`: (id, similitud, skills coincidentes)"""
+        size = self.size
+        allowed = self.active[:size].copy()
+        if location:
+            allowed &= self.locations.matching(location.lower())[self.location[:size]]
+        if is_remote is not None:
+            allowed &= self.is_remote[:size] == is_remote
+        return [(self.ids[row], score, matched) for row, score, matched in self.skills.score(skills, allowed, k)]
+
+    def memory_bytes(self) -> int:
+        """Memoria aproximada: arreglos, ids, índice y diccionarios"""
+        arrays = sum(getattr(self, name).nbytes for name in self._ARRAYS)
+        ids = sum(sys.getsizeof(job_id) for job_id in self.ids[:self.size])
+        vocabularies = sum(vocabulary.memory_bytes()
+                           for vocabulary in (self.titles, self.companies, self.locations,
+                                              self.job_types, self.levels, self.currencies, self.places))
+        return arrays + ids + sys.getsizeof(self._index) + vocabularies + self.skills.memory_bytes()
+
+    def stats(self) -> Dict[str, Any]:
+        memory = self.memory_bytes()
+        return {
+            "jobs": self.active_count,
+            "rows": self.size,
+            "memory_bytes": memory,
+            "bytes_per_job": round(memory / self.active_count, 1) if self.active_count else None,
+            "distinct_titles": len(self.titles.values),
+            "distinct_locations": len(self.locations.values),
+            "distinct_skills": len(self.skills.token_names),
+        }
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[Dict[str, Any]], capacity: int = 1024) -> "JobReadModel":
+        model = cls(capacity)
+        for row in rows:
+            model.upsert(row)
+        model.skills.reweight()
+        return model
+
+
+def load_snapshot(session_factory=SessionLocal) -> "JobReadModel":
+    """
+    Construye el modelo con las ofertas activas, leídas con un cursor del
+    servidor por bloques. Es bloqueante: se ejecuta en un hilo.
+    """
+    columns = [JobOffer.__table__.c[name] for name in READ_MODEL_COLUMNS]
+    stmt = select(*columns).where(JobOffer.active == True).order_by(JobOffer.updated_at, JobOffer.id)
+    model = JobReadModel()
+    db = session_factory()
+    try:
+        result = db.execute(stmt.execution_options(yield_per=READ_MODEL_SNAPSHOT_BATCH))
+        for partition in result.partitions():
+            for row in partition:
+                model.upsert(dict(zip(READ_MODEL_COLUMNS, row)))
+    finally:
+        db.close()
+    model.skills.reweight()
+    return model
+
+
+_current: Optional[JobReadModel] = None
+
+
+def get_read_model() -> Optional[JobReadModel]:
+    """Modelo publicado del worker, o None si está desactivado o aún no se construyó"""
+    return _current
+
+
+def publish(model: JobReadModel):
+    """Reemplaza el modelo del worker y actualiza las métricas de tamaño"""
+    global _current
+    _current = model
+    stats = model.stats()
+    read_model_jobs.set(stats["jobs"])
+    read_model_memory.set(stats["memory_bytes"])
+    read_model_bytes_per_job.set(stats["bytes_per_job"] or 0)
+    logger.info("Modelo de lectura publicado: %s", stats)
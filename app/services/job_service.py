@@ -1,16 +1,33 @@
 # services/job_service.py
-from typing import List, Optional, Dict, Any
+import asyncio
+import csv
+import hashlib
+import io
+import json
+import os
+import time
+from operator import itemgetter
+from typing import List, Optional, Dict, Any, Iterable, Iterator, Set, Tuple
 from fastapi import HTTPException
-from sqlalchemy import select
+from pydantic import ValidationError
+from sqlalchemy import select, func, literal_column, tuple_
 from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, Query, joinedload
 from datetime import datetime
 
+from app.cache.local_cache import job_cache, search_cache, suggest_cache
+from app.cache.redis_service import RedisService
+from app.core.tracing import client_span
+from app.db.database import SessionLocal
 from app.event.producers.producer import KafkaProducer
-from app.model.models import JobOffer, JobApplication
-from app.model.schemas import Job, JobUpdate, JobCreate, JobApplicationCreate
+from app.model.models import JobOffer, JobApplication, SavedSearch
+from app.model.schemas import Job, JobUpdate, JobCreate, JobApplicationCreate, JobApplicationResponse, SearchResponse, \
+    RecommendRequest, SavedSearchCreate, SAVED_SEARCH_MAX_PER_USER
+from app.services.job_ingestion import JOB_COLUMNS, UPSERT_UPDATE_COLUMNS
+from app.services.location_normalizer import find_place, location_columns, place_filter
+from app.services.salary_parser import SALARY_DEFAULT_CURRENCY, salary_columns
 import logging
 
 logger = logging.getLogger(__name__)
@@ -18,6 +35,33 @@ logger = logging.getLogger(__name__)
 # Instancia global de KafkaProducer (puedes ajustarlo según tus necesidades)
 kafka_producer = KafkaProducer()
 
+# Búsqueda desde el modelo de lectura en memoria (requiere Kafka para mantenerse al día).
+# Sin él no se importa app.services.job_read_model (ni NumPy)
+READ_MODEL_ENABLED = os.getenv("READ_MODEL_ENABLED", "false").lower() == "true"
+# Filas que el cursor del servidor entrega por cada viaje durante la exportación
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", 1000))
+# Trabajos que se cargan desde la base cuando el ranking de Redis está vacío
+TRENDING_SEED_SIZE = int(os.getenv("TRENDING_SEED_SIZE", 1000))
+# Precarga de cachés al arrancar el worker: trabajos en tendencia, trabajos
+# vistos más recientemente por el scraper, búsquedas más comunes y tiempo máximo
+CACHE_WARM_TRENDING = int(os.getenv("CACHE_WARM_TRENDING", 100))
+CACHE_WARM_RECENT_JOBS = int(os.getenv("CACHE_WARM_RECENT_JOBS", 1000))
+CACHE_WARM_SEARCHES = int(os.getenv("CACHE_WARM_SEARCHES", 50))
+CACHE_WARM_BUDGET_SECONDS = float(os.getenv("CACHE_WARM_BUDGET_SECONDS", 10))
+# Máximo de términos distintos que se sugieren desde memoria; con más, se consulta la base
+SUGGEST_MAX_TERMS = int(os.getenv("SUGGEST_MAX_TERMS", 50000))
+SUGGEST_COLUMNS = {"titles": JobOffer.title, "locations": JobOffer.location}
+# Facetas de la búsqueda y valores que se devuelven por faceta (los más frecuentes)
+FACET_FIELDS = ("job_type", "level", "is_remote", "location", "company")
+FACET_LIMIT = int(os.getenv("FACET_LIMIT", 20))
+# Filas por INSERT multi-valor (asyncpg admite hasta 32767 parámetros por sentencia)
+UPSERT_CHUNK_SIZE = 32767 // len(JOB_COLUMNS)
+EXPORT_COLUMNS = [
+    "id", "title", "company", "description", "requirements", "job_type", "level",
+    "salary_range", "salary_min", "salary_max", "salary_currency", "salary_period",
+    "location", "place_id", "latitude", "longitude", "is_remote", "active", "source", "created_at", "updated_at",
+]
+
 
 async def create_job(db: Session, job_data: JobCreate) -> Job:
     job = JobOffer(
@@ -28,7 +72,9 @@ async def create_job(db: Session, job_data: JobCreate) -> Job:
         job_type=job_data.job_type.value,
         level=job_data.level.value,
         salary_range=job_data.salary_range,
+        **salary_columns(job_data.salary_range),
         location=job_data.location,
+        **location_columns(job_data.location),
         is_remote=job_data.is_remote
     )
 
@@ -52,17 +98,168 @@ async def get_job_by_id(db: Session, job_id: str) -> Optional[JobOffer]:
     return db.query(JobOffer).filter(JobOffer.id == job_id).first()
 
 
+async def get_jobs_by_ids(
+        db: Session,
+        job_ids: List[str],
+        redis_service: Optional[RedisService] = None
+) -> List[Optional[dict]]:
+    """
+    Resuelve varios trabajos en un solo viaje: primero desde la caché en
+    memoria, luego desde Redis y el resto con una única consulta `IN`.
+    Conserva el orden de `job_ids` y devuelve None para los ids que no existen.
+    """
+    unique_ids = list(dict.fromkeys(job_ids))
+    found: Dict[str, dict] = job_cache.get_many(unique_ids)
+
+    if redis_service and len(found) < len(unique_ids):
+        remote_ids = [job_id for job_id in unique_ids if job_id not in found]
+        cached = await redis_service.get_jobs(remote_ids)
+        remote = {job_id: job for job_id, job in zip(remote_ids, cached) if job}
+        job_cache.set_many(remote)
+        found.update(remote)
+
+    missing = [job_id for job_id in unique_ids if job_id not in found]
+    if missing:
+        fetched = _load_jobs(db, missing)
+        found.update(fetched)
+        job_cache.set_many(fetched)
+        if redis_service:
+            await redis_service.set_jobs(fetched)
+
+    return [found.get(job_id) for job_id in job_ids]
+
+
+def _load_jobs(db: Session, job_ids: List[str]) -> Dict[str, dict]:
+    """Fichas serializadas de los trabajos existentes entre `job_ids`"""
+    rows = db.query(JobOffer).filter(JobOffer.id.in_(job_ids)).all()
+    return _serialize_jobs(rows)
+
+
+def _serialize_jobs(rows: Iterable[JobOffer]) -> Dict[str, dict]:
+    """
+    Fichas (esquema Job) validadas fila por fila: la ingesta no aplica los
+    límites del esquema (p. ej. largo del título), así que una fila que no
+    los cumple se registra y se omite en lugar de hacer fallar todo el lote.
+    """
+    jobs = {}
+    for row in rows:
+        try:
+            jobs[row.id] = Job.model_validate(row).model_dump(mode="json")
+        except ValidationError as e:
+            logger.warning("Trabajo %s no cumple el esquema Job: %s", row.id, e.errors(include_url=False))
+    return jobs
+
+
+async def invalidate_jobs(job_ids: Iterable[str], redis_service: Optional[RedisService] = None):
+    """
+    Descarta las fichas cacheadas de trabajos modificados (Redis y memoria)
+    y las búsquedas en memoria, que podrían incluirlos.
+    """
+    job_ids = list(job_ids)
+    if not job_ids:
+        return
+    for job_id in job_ids:
+        job_cache.delete(job_id)
+    search_cache.clear()
+    if redis_service:
+        await redis_service.delete_jobs(job_ids)
+
+
+async def get_job_cached(db: Session, job_id: str, redis_service: RedisService) -> Optional[dict]:
+    """Recupera un trabajo por ID pasando por las cachés en memoria y de Redis"""
+    return (await get_jobs_by_ids(db, [job_id], redis_service))[0]
+
+
 async def get_job_offer_by_application_id(db: Session, application_id: str) -> Optional[JobOffer]:
     """
     Recupera una oferta de trabajo usando el ID de una aplicación.
+    La aplicación y su oferta se resuelven con una sola consulta (JOIN).
     """
-    application = db.query(JobApplication).filter(JobApplication.id == application_id).first()
-    if not application:
+    row = (
+        db.query(JobApplication.id, JobOffer)
+        .outerjoin(JobOffer, JobOffer.id == JobApplication.job_offer_id)
+        .filter(JobApplication.id == application_id)
+        .first()
+    )
+    if not row:
         raise HTTPException(status_code=404, detail="Application not found")
 
-    job_offer = db.query(JobOffer).filter(JobOffer.id == application.job_offer_id).first()
+    return row[1]
+
 
-    return job_offer
+async def get_user_applications(
+        db: Session,
+        user_id: str,
+        skip: int = 0,
+        limit: int = 10
+) -> List[dict]:
+    """
+    Lista las aplicaciones de un usuario, más recientes primero, con su oferta
+    cargada en la misma consulta. Usa el índice (id_user, created_at).
+    Las ofertas se serializan con _serialize_jobs: una que no cumple el
+    esquema Job queda en None en vez de hacer fallar todo el listado.
+    """
+    applications = (
+        db.query(JobApplication)
+        .options(joinedload(JobApplication.job_offer))
+        .filter(JobApplication.id_user == user_id)
+        .order_by(JobApplication.created_at.desc())
+        .offset(skip)
+        .limit(limit)
+        .all()
+    )
+    offers = _serialize_jobs([a.job_offer for a in applications if a.job_offer is not None])
+    return [
+        {**JobApplicationResponse.model_validate(a, from_attributes=True).model_dump(),
+         "job_offer": offers.get(a.job_offer_id)}
+        for a in applications
+    ]
+
+
+async def create_saved_search(db: Session, user_id: str, data: SavedSearchCreate) -> SavedSearch:
+    """Guarda una búsqueda para recibir alertas de ofertas nuevas que la cumplan"""
+    # Serializa las altas del usuario hasta el commit: dos solicitudes simultáneas no
+    # pueden contar las mismas búsquedas y superar juntas el máximo
+    db.execute(select(func.pg_advisory_xact_lock(func.hashtext(f"saved_searches:{user_id}"))))
+    active_count = (
+        db.query(func.count(SavedSearch.id))
+        .filter(SavedSearch.id_user == user_id, SavedSearch.active == True)
+        .scalar()
+    )
+    if active_count >= SAVED_SEARCH_MAX_PER_USER:
+        raise HTTPException(status_code=400,
+                            detail=f"Máximo de {SAVED_SEARCH_MAX_PER_USER} búsquedas guardadas por usuario")
+    saved_search = SavedSearch(id_user=user_id, **data.model_dump())
+    db.add(saved_search)
+    db.commit()
+    db.refresh(saved_search)
+    return saved_search
+
+
+async def get_saved_searches(db: Session, user_id: str) -> List[SavedSearch]:
+    """Búsquedas guardadas activas de un usuario, más recientes primero"""
+    return (
+        db.query(SavedSearch)
+        .filter(SavedSearch.id_user == user_id, SavedSearch.active == True)
+        .order_by(SavedSearch.created_at.desc())
+        .all()
+    )
+
+
+async def delete_saved_search(db: Session, user_id: str, saved_search_id: str):
+    """
+    Baja lógica: el percolador recarga las búsquedas por updated_at y así
+    también se entera de las desactivadas.
+    """
+    saved_search = (
+        db.query(SavedSearch)
+        .filter(SavedSearch.id == saved_search_id, SavedSearch.id_user == user_id, SavedSearch.active == True)
+        .first()
+    )
+    if not saved_search:
+        raise HTTPException(status_code=404, detail="Saved search not found")
+    saved_search.active = False
+    db.commit()
 
 
 async def get_jobs(
@@ -83,27 +280,392 @@ def search_jobs(
         location: Optional[str] = None,
         offset: int = 0,
         limit: int = 10,
-        page: int = 1
+        page: int = 1,
+        is_remote: Optional[bool] = None,
+        job_type: Optional[str] = None,
+        level: Optional[str] = None,
+        facets: bool = False,
+        salary_min: Optional[int] = None,
+        salary_max: Optional[int] = None,
+        salary_currency: Optional[str] = None,
+        place: Optional[str] = None,
+        radius_km: Optional[float] = None
 ) -> Dict[str, Any]:
-    print(f"q: {q}")
-    jobs_query = db.query(JobOffer)
-    print(f"jobs_query: {jobs_query}")
+    # Solo ofertas vigentes, igual que el modelo de lectura
+    jobs_query = db.query(JobOffer).filter(JobOffer.active == True)
     if q:
         jobs_query = jobs_query.filter(JobOffer.title.ilike(f"%{q}%"))
     if location:
         jobs_query = jobs_query.filter(JobOffer.location.ilike(f"%{location}%"))
+    if is_remote is not None:
+        jobs_query = jobs_query.filter(JobOffer.is_remote == is_remote)
+    if job_type:
+        jobs_query = jobs_query.filter(JobOffer.job_type == job_type)
+    if level:
+        jobs_query = jobs_query.filter(JobOffer.level == level)
+    # Rangos que se solapan con [salary_min, salary_max]. Una cota abierta de la
+    # oferta ("Desde 3000") toma el valor de la otra; las expresiones coinciden
+    # con los índices ix_job_offers_salary_lower/upper
+    if salary_min is not None:
+        jobs_query = jobs_query.filter(func.coalesce(JobOffer.salary_max, JobOffer.salary_min) >= salary_min)
+    if salary_max is not None:
+        jobs_query = jobs_query.filter(func.coalesce(JobOffer.salary_min, JobOffer.salary_max) <= salary_max)
+    if salary_currency:
+        jobs_query = jobs_query.filter(JobOffer.salary_currency == salary_currency)
+    if place:
+        jobs_query = jobs_query.filter(JobOffer.place_id.in_(_place_ids(place, radius_km)))
 
-    total_jobs = jobs_query.count()
+    facet_counts = None
+    if facets:
+        # El conjunto vacío de GROUPING SETS es el total: reemplaza al COUNT
+        total_jobs, facet_counts = _facet_counts(db, jobs_query)
+    else:
+        total_jobs = jobs_query.count()
     jobs = jobs_query.offset(offset).limit(limit).all()
-    print(f"jobs: {jobs}")
     return {
         "jobs": jobs,
         "total": total_jobs,
         "page": page,
-        "totalPages": (total_jobs + limit - 1) // limit
+        "totalPages": (total_jobs + limit - 1) // limit,
+        "facets": facet_counts
+    }
+
+
+def _place_ids(place: str, radius_km: Optional[float]) -> Tuple[str, ...]:
+    """place_id del filtro de lugar (o radio); 400 si el lugar no está en el gazetteer"""
+    place_ids = place_filter(place, radius_km)
+    if place_ids is None:
+        raise HTTPException(status_code=400, detail=f"Lugar desconocido: {place}")
+    return place_ids
+
+
+def resolve_place(query: str) -> Dict[str, Any]:
+    """Lugar canónico de un place_id o de un texto de ubicación"""
+    found = find_place(query)
+    if found is None:
+        raise HTTPException(status_code=404, detail="Place not found")
+    return {"place_id": found.id, "name": found.name, "country": found.country, "kind": found.kind,
+            "latitude": found.latitude, "longitude": found.longitude}
+
+
+def _facet_counts(db: Session, jobs_query: Query) -> Tuple[int, Dict[str, Dict[str, int]]]:
+    """
+    Total y conteos por faceta de la búsqueda filtrada en una sola consulta:
+    GROUPING SETS con un conjunto por faceta más el total, y row_number()
+    para quedarse con los FACET_LIMIT valores más frecuentes de cada una.
+    """
+    columns = [JobOffer.__table__.c[field] for field in FACET_FIELDS]
+    grouped = (
+        jobs_query
+        .with_entities(*columns, func.grouping(*columns).label("facet_set"), func.count().label("total"))
+        .group_by(func.grouping_sets(*[tuple_(column) for column in columns], tuple_()))
+        .subquery()
+    )
+    ranked = select(
+        grouped,
+        func.row_number().over(partition_by=grouped.c.facet_set, order_by=grouped.c.total.desc()).label("facet_rank")
+    ).subquery()
+    rows = db.execute(select(ranked).where(ranked.c.facet_rank <= FACET_LIMIT).order_by(ranked.c.facet_rank)).all()
+
+    # GROUPING() marca con 1 las columnas agregadas; la primera es el bit más alto
+    all_columns = (1 << len(FACET_FIELDS)) - 1
+    facet_sets = {all_columns ^ (1 << (len(FACET_FIELDS) - 1 - index)): field
+                  for index, field in enumerate(FACET_FIELDS)}
+    total_jobs = 0
+    facet_counts: Dict[str, Dict[str, int]] = {field: {} for field in FACET_FIELDS}
+    for row in rows:
+        if row.facet_set == all_columns:
+            total_jobs = row.total
+            continue
+        field = facet_sets[row.facet_set]
+        value = getattr(row, field)
+        if value is None:
+            continue
+        key = ("true" if value else "false") if field == "is_remote" else value
+        facet_counts[field][key] = row.total
+    return total_jobs, facet_counts
+
+
+def _read_model():
+    """Modelo de lectura publicado, o None si está desactivado o aún no se construyó"""
+    if not READ_MODEL_ENABLED:
+        return None
+    from app.services.job_read_model import get_read_model
+    return get_read_model()
+
+
+def search_jobs_in_read_model(
+        db: Session,
+        q: Optional[str] = None,
+        location: Optional[str] = None,
+        offset: int = 0,
+        limit: int = 10,
+        page: int = 1,
+        is_remote: Optional[bool] = None,
+        job_type: Optional[str] = None,
+        level: Optional[str] = None,
+        facets: bool = False,
+        salary_min: Optional[int] = None,
+        salary_max: Optional[int] = None,
+        salary_currency: Optional[str] = None,
+        place: Optional[str] = None,
+        radius_km: Optional[float] = None
+) -> Optional[Dict[str, Any]]:
+    """
+    search_jobs resuelto en el modelo de lectura en memoria (solo ofertas
+    activas): filtros, conteo y facetas sin ir a la base, y la página por
+    clave primaria. None si el modelo no está disponible.
+    """
+    model = _read_model()
+    if model is None:
+        return None
+    total_jobs, job_ids, facet_counts = model.search(
+        q, location, is_remote, job_type, level, offset, limit, FACET_LIMIT if facets else None,
+        salary_min, salary_max, salary_currency, _place_ids(place, radius_km) if place else None
+    )
+    rows = {row.id: row for row in db.query(JobOffer).filter(JobOffer.id.in_(job_ids))} if job_ids else {}
+    return {
+        "jobs": [rows[job_id] for job_id in job_ids if job_id in rows],
+        "total": total_jobs,
+        "page": page,
+        "totalPages": (total_jobs + limit - 1) // limit,
+        "facets": facet_counts
     }
 
 
+async def recommend_jobs(
+        db: Session,
+        redis_service: RedisService,
+        request: RecommendRequest
+) -> List[Dict[str, Any]]:
+    """
+    Ofertas activas más afines a una lista de skills, con el índice invertido
+    de requisitos del modelo de lectura. Las fichas salen de las cachés.
+    """
+    model = _read_model()
+    if model is None:
+        raise HTTPException(status_code=503, detail="Recomendaciones no disponibles: modelo de lectura sin cargar")
+    ranked = model.recommend(request.skills, request.limit, request.location, request.is_remote)
+    jobs = await get_jobs_by_ids(db, [job_id for job_id, _, _ in ranked], redis_service)
+    return [
+        {"job": job, "score": score, "matched_skills": matched}
+        for job, (_, score, matched) in zip(jobs, ranked) if job
+    ]
+
+
+async def get_similar_jobs(
+        db: Session,
+        redis_service: RedisService,
+        job_id: str,
+        limit: int
+) -> List[dict]:
+    """
+    Ofertas similares a una oferta, desde su lista precalculada en Redis
+    (ver app/cli/similar_jobs.py). Las fichas salen de las cachés.
+    """
+    similar_ids = await redis_service.get_similar_jobs(job_id, limit)
+    if not similar_ids:
+        # Sin lista: la oferta no existe o aún no se enlazó
+        if not await get_job_cached(db, job_id, redis_service):
+            raise HTTPException(status_code=404, detail="Job not found")
+        return []
+    return [job for job in await get_jobs_by_ids(db, similar_ids, redis_service) if job]
+
+
+def _search_params(
+        q: Optional[str],
+        location: Optional[str],
+        page: int,
+        limit: int,
+        is_remote: Optional[bool] = None,
+        job_type: Optional[str] = None,
+        level: Optional[str] = None,
+        facets: bool = False,
+        salary_min: Optional[int] = None,
+        salary_max: Optional[int] = None,
+        salary_currency: Optional[str] = None,
+        place: Optional[str] = None,
+        radius_km: Optional[float] = None
+) -> str:
+    """
+    Forma canónica de una búsqueda. El filtro es ILIKE, así que las mayúsculas
+    no cambian el resultado y se normalizan para compartir la entrada de caché.
+    """
+    return json.dumps({
+        "q": q.lower() if q else None,
+        "location": location.lower() if location else None,
+        "page": page,
+        "limit": limit,
+        "is_remote": is_remote,
+        "job_type": job_type,
+        "level": level,
+        "facets": facets,
+        "salary_min": salary_min,
+        "salary_max": salary_max,
+        "salary_currency": salary_currency,
+        "place": place,
+        "radius_km": radius_km,
+    }, sort_keys=True)
+
+
+async def search_jobs_cached(
+        db: Session,
+        redis_service: RedisService,
+        q: Optional[str] = None,
+        location: Optional[str] = None,
+        page: int = 1,
+        limit: int = 10,
+        is_remote: Optional[bool] = None,
+        job_type: Optional[str] = None,
+        level: Optional[str] = None,
+        facets: bool = False,
+        salary_min: Optional[int] = None,
+        salary_max: Optional[int] = None,
+        salary_currency: Optional[str] = None,
+        place: Optional[str] = None,
+        radius_km: Optional[float] = None,
+        record: bool = True
+) -> Dict[str, Any]:
+    """
+    search_jobs con caché en memoria y en Redis del resultado ya serializado.
+    Cada búsqueda que llega a Redis suma a la frecuencia de consultas que usa
+    la precarga (`record=False` para no contar las de la propia precarga).
+    Con el modelo de lectura activo, los fallos de caché se resuelven en memoria.
+    """
+    if (salary_min is not None or salary_max is not None) and not salary_currency:
+        # Los importes solo se comparan dentro de una moneda
+        salary_currency = SALARY_DEFAULT_CURRENCY
+    params = _search_params(q, location, page, limit, is_remote, job_type, level, facets,
+                            salary_min, salary_max, salary_currency, place, radius_km)
+    key = hashlib.sha1(params.encode("utf-8")).hexdigest()
+
+    result = search_cache.get(key)
+    if result is not None:
+        return result
+
+    result = await redis_service.get_search_result(key, params if record else None)
+    if result is None:
+        offset = (page - 1) * limit
+        filters = {"is_remote": is_remote, "job_type": job_type, "level": level, "facets": facets,
+                   "salary_min": salary_min, "salary_max": salary_max, "salary_currency": salary_currency,
+                   "place": place, "radius_km": radius_km}
+        found = search_jobs_in_read_model(db, q, location, offset, limit, page, **filters)
+        if found is None:
+            found = search_jobs(db, q, location, offset, limit, page, **filters)
+        result = SearchResponse.model_validate(found, from_attributes=True).model_dump(mode="json")
+        await redis_service.set_search_result(key, result)
+    search_cache.set(key, result)
+    return result
+
+
+async def get_suggest_terms(
+        db: Session,
+        redis_service: Optional[RedisService],
+        kind: str
+) -> Optional[List[str]]:
+    """
+    Lista completa de títulos o ubicaciones distintos para sugerir desde
+    memoria. Devuelve None si hay más de SUGGEST_MAX_TERMS (se consulta la base).
+    """
+    entry = suggest_cache.get(kind)
+    if entry is not None:
+        return entry or None
+
+    terms = await redis_service.get_suggest_terms(kind) if redis_service else None
+    if terms is None:
+        terms = _load_suggest_terms(db, kind)
+        if redis_service:
+            await redis_service.set_suggest_terms(kind, terms)
+    # Lista vacía = demasiados términos: también se cachea para no recalcularla
+    suggest_cache.set(kind, terms)
+    return terms or None
+
+
+def _load_suggest_terms(db: Session, kind: str) -> List[str]:
+    """Términos distintos ordenados; lista vacía si hay más de SUGGEST_MAX_TERMS"""
+    column = SUGGEST_COLUMNS[kind]
+    rows = db.query(column).distinct().filter(column.isnot(None)).limit(SUGGEST_MAX_TERMS + 1).all()
+    return sorted(row[0] for row in rows) if len(rows) <= SUGGEST_MAX_TERMS else []
+
+
+async def suggest(
+        db: Session,
+        kind: str,
+        query: str,
+        redis_service: Optional[RedisService] = None
+) -> List[str]:
+    """Términos que contienen `query` sin distinguir mayúsculas (como ILIKE '%query%')"""
+    terms = await get_suggest_terms(db, redis_service, kind)
+    if terms is None:
+        column = SUGGEST_COLUMNS[kind]
+        rows = db.query(column).distinct().filter(column.ilike(f"%{query}%")).all()
+        return [row[0] for row in rows]
+    needle = query.lower()
+    return [term for term in terms if needle in term.lower()]
+
+
+def export_jobs(
+        fmt: str = "ndjson",
+        active: Optional[bool] = None,
+        since: Optional[datetime] = None,
+        source: Optional[str] = None,
+        session_factory=SessionLocal
+) -> Iterator[str]:
+    """
+    Genera el catálogo de trabajos en NDJSON o CSV por bloques.
+    Usa un cursor del lado del servidor (`yield_per`), por lo que la memoria
+    es constante sin importar el tamaño del catálogo. El orden por
+    (updated_at, id) permite sincronizaciones incrementales con `since`.
+    """
+    columns = [JobOffer.__table__.c[name] for name in EXPORT_COLUMNS]
+    stmt = select(*columns).order_by(JobOffer.updated_at, JobOffer.id)
+    if active is not None:
+        stmt = stmt.where(JobOffer.active == active)
+    if since is not None:
+        stmt = stmt.where(JobOffer.updated_at >= since)
+    if source:
+        stmt = stmt.where(JobOffer.source == source)
+
+    db = session_factory()
+    try:
+        result = db.execute(stmt.execution_options(yield_per=EXPORT_BATCH_SIZE))
+        if fmt == "csv":
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            writer.writerow(EXPORT_COLUMNS)
+            for partition in result.partitions():
+                for row in partition:
+                    writer.writerow(_csv_value(value) for value in row)
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+            # Solo encabezado si no hubo filas
+            if buffer.tell():
+                yield buffer.getvalue()
+        else:
+            for partition in result.partitions():
+                yield "".join(
+                    json.dumps(dict(zip(EXPORT_COLUMNS, row)), default=_json_default) + "\n"
+                    for row in partition
+                )
+    finally:
+        db.close()
+
+
+def _json_default(value: Any):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+
+def _csv_value(value: Any):
+    if isinstance(value, list):
+        return json.dumps(value)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
 async def update_job(
         db: Session,
         job_id: str,
@@ -112,6 +674,10 @@ async def update_job(
     job = await get_job(db, job_id)
 
     update_data = job_data.dict(exclude_unset=True)
+    if "salary_range" in update_data:
+        update_data.update(salary_columns(update_data["salary_range"]))
+    if "location" in update_data:
+        update_data.update(location_columns(update_data["location"]))
     for field, value in update_data.items():
         setattr(job, field, value)
 
@@ -121,26 +687,236 @@ async def update_job(
     return job
 
 
+async def get_trending_jobs(
+        db: Session,
+        redis_service: RedisService,
+        limit: int = 10
+) -> List[dict]:
+    """
+    Lista los trabajos con más aplicaciones desde el ranking de Redis.
+    El ranking se siembra una sola vez desde `applications_count` (indexado)
+    y luego se mantiene con ZINCRBY, así nunca se agregan aplicaciones en
+    tiempo de consulta. Las bajas y archivados salen del ranking (ZREM) y
+    solo se devuelven ofertas activas.
+    """
+    if await redis_service.is_popularity_seeded():
+        job_ids = await redis_service.get_top_jobs(limit)
+    else:
+        scores = _load_popularity(db, max(limit, TRENDING_SEED_SIZE))
+        await redis_service.set_job_popularity(scores)
+        job_ids = list(scores)[:limit]
+
+    jobs = [job for job in await get_jobs_by_ids(db, job_ids, redis_service) if job]
+    # Las fichas cacheadas no guardan `active`: se confirma por clave primaria
+    active_ids = _active_ids(db, [job["id"] for job in jobs]) if jobs else set()
+    inactive = [job_id for job_id in job_ids if job_id not in active_ids]
+    if inactive:
+        # Bajas que el ranking aún conserva (p. ej. anteriores a su limpieza)
+        await redis_service.remove_job_popularity(inactive)
+    return [job for job in jobs if job["id"] in active_ids]
+
+
+def _load_popularity(db: Session, limit: int) -> Dict[str, int]:
+    """Trabajos activos con aplicaciones, de más a menos postulados"""
+    rows = (
+        db.query(JobOffer.id, JobOffer.applications_count)
+        .filter(JobOffer.active == True, JobOffer.applications_count > 0)
+        .order_by(JobOffer.applications_count.desc())
+        .limit(limit)
+        .all()
+    )
+    return {row.id: row.applications_count for row in rows}
+
+
+def _active_ids(db: Session, job_ids: List[str]) -> Set[str]:
+    return {row.id for row in db.query(JobOffer.id).filter(JobOffer.id.in_(job_ids), JobOffer.active == True)}
+
+
+async def _in_thread(load, *args):
+    """Ejecuta una carga síncrona en un hilo, con su propia sesión"""
+    def run():
+        db = SessionLocal()
+        try:
+            return load(db, *args)
+        finally:
+            db.close()
+    return await asyncio.to_thread(run)
+
+
+def _load_recent_jobs(db: Session) -> Dict[str, dict]:
+    """Fichas de los trabajos activos vistos más recientemente (índice parcial de last_seen_at)"""
+    rows = (
+        db.query(JobOffer)
+        .filter(JobOffer.active == True)
+        .order_by(JobOffer.last_seen_at.desc())
+        .limit(CACHE_WARM_RECENT_JOBS)
+        .all()
+    )
+    return _serialize_jobs(rows)
+
+
+async def _warm_jobs(redis_service: RedisService, jobs: Dict[str, dict]) -> int:
+    job_cache.set_many(jobs)
+    await redis_service.set_jobs(jobs)
+    return len(jobs)
+
+
+async def _warm_recent_jobs(redis_service: RedisService) -> int:
+    return await _warm_jobs(redis_service, await _in_thread(_load_recent_jobs))
+
+
+async def _warm_trending(redis_service: RedisService) -> int:
+    if not await redis_service.is_popularity_seeded():
+        await redis_service.set_job_popularity(
+            await _in_thread(_load_popularity, max(CACHE_WARM_TRENDING, TRENDING_SEED_SIZE))
+        )
+    job_ids = await redis_service.get_top_jobs(CACHE_WARM_TRENDING)
+    return await _warm_jobs(redis_service, await _in_thread(_load_jobs, job_ids) if job_ids else {})
+
+
+async def _warm_suggest(redis_service: RedisService) -> int:
+    terms = 0
+    for kind in SUGGEST_COLUMNS:
+        entry = await redis_service.get_suggest_terms(kind)
+        if entry is None:
+            entry = await _in_thread(_load_suggest_terms, kind)
+            await redis_service.set_suggest_terms(kind, entry)
+        suggest_cache.set(kind, entry)
+        terms += len(entry)
+    return terms
+
+
+def _search_result(db: Session, params: Dict[str, Any]) -> Dict[str, Any]:
+    """Resultado serializado de una búsqueda canónica (ver _search_params) contra la base"""
+    offset = (params["page"] - 1) * params["limit"]
+    found = search_jobs(db, offset=offset, **params)
+    return SearchResponse.model_validate(found, from_attributes=True).model_dump(mode="json")
+
+
+async def _warm_searches(redis_service: RedisService) -> int:
+    # Con el modelo de lectura las búsquedas se resuelven en memoria: no hace falta precargarlas
+    if READ_MODEL_ENABLED:
+        return 0
+    warmed = 0
+    for params in await redis_service.get_popular_searches(CACHE_WARM_SEARCHES):
+        key = hashlib.sha1(params.encode("utf-8")).hexdigest()
+        result = await redis_service.get_search_result(key)
+        if result is None:
+            result = await _in_thread(_search_result, json.loads(params))
+            await redis_service.set_search_result(key, result)
+        search_cache.set(key, result)
+        warmed += 1
+    return warmed
+
+
+async def warm_cache(redis_service: RedisService, budget: float = CACHE_WARM_BUDGET_SECONDS) -> Dict[str, int]:
+    """
+    Precarga las cachés en memoria y de Redis antes de recibir tráfico:
+    trabajos recientes y en tendencia, datos de sugerencias y resultados de
+    las búsquedas más comunes. Las consultas corren en hilos, sin bloquear el
+    event loop; la etapa que agota los `budget` segundos se corta y las
+    siguientes se omiten: quedan para las primeras solicitudes.
+    """
+    deadline = time.monotonic() + budget
+    stages = [
+        ("recent_jobs", _warm_recent_jobs),
+        ("trending", _warm_trending),
+        ("suggest", _warm_suggest),
+        ("searches", _warm_searches),
+    ]
+    warmed: Dict[str, int] = {}
+    for name, stage in stages:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            logger.warning("Precarga de caché sin tiempo: se omite %s", name)
+            continue
+        try:
+            warmed[name] = await asyncio.wait_for(stage(redis_service), remaining)
+        except asyncio.TimeoutError:
+            logger.warning("Precarga de caché sin tiempo: se corta %s", name)
+    logger.info("Caché precargada en %.2f s: %s", budget - (deadline - time.monotonic()), warmed)
+    return warmed
+
+
 async def create_application(db: Session,
                              application_data: JobApplicationCreate,
                              user_id: str,
-                             profile_data: dict):
+                             profile_data: dict,
+                             redis_service: Optional[RedisService] = None,
+                             idempotency_key: Optional[str] = None):
+    """
+    Crea una aplicación una sola vez por (oferta, usuario).
+    Los reintentos (misma clave de idempotencia o aplicación ya existente)
+    devuelven la aplicación original sin escribir ni publicar eventos.
+    """
+    job_offer_id = application_data.job_offer_id
+
+    # Reintento con la misma clave de idempotencia
+    if redis_service and idempotency_key:
+        application_id = await redis_service.get_idempotent_application(user_id, idempotency_key)
+        if application_id:
+            existing = db.query(JobApplication).filter(JobApplication.id == application_id).first()
+            if existing and existing.job_offer_id != job_offer_id:
+                # La clave ya se usó para otra oferta: no se devuelve una aplicación ajena a la solicitud
+                raise HTTPException(status_code=409,
+                                    detail="Idempotency-Key ya usada para aplicar a otra oferta")
+            if existing:
+                return existing
+
+    # Filtro rápido: solo se consulta la base si el usuario probablemente ya aplicó
+    if redis_service and await redis_service.has_applied(user_id, job_offer_id):
+        existing = _get_user_application(db, job_offer_id, user_id)
+        if existing:
+            await _remember_application(redis_service, existing, idempotency_key)
+            return existing
+
     # Verificar si la oferta existe
-    job_offer = db.query(JobOffer).filter_by(id=application_data.job_offer_id).first()
+    job_offer = db.query(JobOffer).filter_by(id=job_offer_id).first()
     if not job_offer:
         raise ValueError("La oferta de trabajo no existe")
 
     # Crear la aplicación
     application = JobApplication(
-        job_offer_id=application_data.job_offer_id,
+        job_offer_id=job_offer_id,
         id_user=user_id,
         applicant_name=application_data.applicant_name,
         applicant_email=application_data.applicant_email
     )
     db.add(application)
-    db.commit()
+    try:
+        db.flush()
+    except IntegrityError:
+        # La restricción única detectó una aplicación previa (p. ej. doble clic concurrente)
+        db.rollback()
+        existing = _get_user_application(db, job_offer_id, user_id)
+        if not existing:
+            raise
+        await _remember_application(redis_service, existing, idempotency_key)
+        return existing
+
+    # Contador atómico en la misma transacción que la aplicación
+    db.query(JobOffer).filter(JobOffer.id == job_offer_id).update(
+        {JobOffer.applications_count: func.coalesce(JobOffer.applications_count, 0) + 1},
+        synchronize_session=False
+    )
+    # Datos de la oferta para el evento, leídos antes de que el commit los expire
+    job_offer_data = {
+        "title": job_offer.title,
+        "company": job_offer.company,
+        "description": job_offer.description,
+        "requirements": job_offer.requirements,
+        "location": job_offer.location,
+        "is_remote": job_offer.is_remote
+    }
+    # El COMMIT no pasa por los eventos de cursor: span propio para verlo en la traza
+    with client_span("db COMMIT", {"db.system.name": "postgresql"}):
+        db.commit()
     db.refresh(application)
 
+    if redis_service:
+        await _remember_application(redis_service, application, idempotency_key)
+        await redis_service.increment_job_popularity(application.job_offer_id)
+
     # Preparar evento
     event = {
         "type": "job-application-created",
@@ -151,14 +927,7 @@ async def create_application(db: Session,
             "applicant_name": application_data.applicant_name,
             "applicant_email": application_data.applicant_email,
             "profile": profile_data,  # Incluir los datos del perfil
-            "job_offer": {
-                "title": job_offer.title,
-                "company": job_offer.company,
-                "description": job_offer.description,
-                "requirements": job_offer.requirements,
-                "location": job_offer.location,
-                "is_remote": job_offer.is_remote
-            }
+            "job_offer": job_offer_data
         },
         "metadata": {
             "source": "ms-job",
@@ -169,13 +938,33 @@ async def create_application(db: Session,
     # Publicar evento en Kafka
     try:
         await kafka_producer.send_event("job-events", event)
-        logger.info(f"Evento enviado al tópico 'job-events': {event}")
+        logger.info("Evento %s enviado al tópico 'job-events' (aplicación %s)", event["type"], application.id)
     except Exception as e:
-        logger.error(f"Error al enviar evento a Kafka: {e}")
+        logger.error("Error al enviar evento a Kafka: %s", e)
 
     return application
 
 
+def _get_user_application(db: Session, job_offer_id: str, user_id: str) -> Optional[JobApplication]:
+    return db.query(JobApplication).filter(
+        JobApplication.job_offer_id == job_offer_id,
+        JobApplication.id_user == user_id
+    ).first()
+
+
+async def _remember_application(
+        redis_service: Optional[RedisService],
+        application: JobApplication,
+        idempotency_key: Optional[str]
+):
+    """Actualiza el filtro de aplicaciones y la clave de idempotencia en Redis"""
+    if not redis_service:
+        return
+    await redis_service.mark_applied(application.id_user, application.job_offer_id)
+    if idempotency_key:
+        await redis_service.set_idempotent_application(application.id_user, idempotency_key, application.id)
+
+
 async def save_job_to_db(job: JobCreate, session):
     try:
         # Crear el insert statement con ON CONFLICT DO NOTHING
@@ -188,11 +977,20 @@ async def save_job_to_db(job: JobCreate, session):
             job_type=job.job_type,
             level=job.level,
             salary_range=job.salary_range,
+            salary_min=job.salary_min,
+            salary_max=job.salary_max,
+            salary_currency=job.salary_currency,
+            salary_period=job.salary_period,
             location=job.location,
+            place_id=job.place_id,
+            latitude=job.latitude,
+            longitude=job.longitude,
             is_remote=job.is_remote,
+            source=job.source,
             active=True,
             created_at=datetime.utcnow(),
             updated_at=datetime.utcnow(),
+            last_seen_at=datetime.utcnow(),
         )
 
         # Agregar la cláusula DO NOTHING
@@ -202,6 +1000,9 @@ async def save_job_to_db(job: JobCreate, session):
                 'title': job.title,
                 'description': job.description,
                 'updated_at': datetime.utcnow(),
+                # El scraper la volvió a ver: sigue vigente
+                'active': True,
+                'last_seen_at': datetime.utcnow(),
             }
         )
 
@@ -209,9 +1010,32 @@ async def save_job_to_db(job: JobCreate, session):
         await session.execute(do_update_stmt)
         await session.commit()
 
-        logger.info(f"Trabajo guardado/actualizado exitosamente: {job.id}")
+        logger.info("Trabajo guardado/actualizado exitosamente: %s", job.id)
 
     except Exception as e:
-        logger.error(f"Error al guardar el trabajo: {str(e)}")
+        logger.error("Error al guardar el trabajo: %s", e)
         await session.rollback()
         raise
+
+
+async def save_jobs_to_db(rows: List[tuple], session: AsyncSession) -> Set[str]:
+    """
+    Inserta o actualiza un lote de filas validadas (orden de JOB_COLUMNS)
+    con INSERT multi-valor ... ON CONFLICT. No hace commit: se ejecuta dentro
+    de la transacción del llamador. Devuelve los ids de las ofertas que no
+    existían (xmax = 0 en las filas insertadas, no en las actualizadas).
+    """
+    # Un mismo INSERT no puede afectar dos veces la misma fila: gana el último evento.
+    # Ordenadas por id, dos upserts concurrentes bloquean las filas en el mismo orden (sin deadlocks)
+    unique_rows = sorted({row[0]: row for row in rows}.values(), key=itemgetter(0))
+    inserted: Set[str] = set()
+    for start in range(0, len(unique_rows), UPSERT_CHUNK_SIZE):
+        chunk = unique_rows[start:start + UPSERT_CHUNK_SIZE]
+        insert_stmt = insert(JobOffer).values([dict(zip(JOB_COLUMNS, row)) for row in chunk])
+        result = await session.execute(insert_stmt.on_conflict_do_update(
+            index_elements=['id'],
+            set_={column: insert_stmt.excluded[column] for column in UPSERT_UPDATE_COLUMNS}
+        ).returning(JobOffer.id, literal_column("xmax = 0")))
+        inserted.update(job_id for job_id, is_new in result if is_new)
+    logger.info("Lote de %d trabajos guardado/actualizado (%d nuevos)", len(unique_rows), len(inserted))
+    return inserted
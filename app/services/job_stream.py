@@ -0,0 +1,140 @@
+# services/job_stream.py
+"""
+Difusión en vivo de ofertas nuevas por Server-Sent Events.
+
+El worker que guarda un lote de ofertas nuevas lo publica en un canal de
+Redis; cada worker escucha el canal y reparte las ofertas entre sus
+suscriptores locales. Los filtros de los suscriptores se indexan con el mismo
+percolador de las búsquedas guardadas, así que una oferta solo se compara con
+los suscriptores que podrían recibirla y miles de conexiones inactivas no
+cuestan trabajo por oferta. Cada suscriptor tiene un buffer acotado: si se
+llena (cliente lento), se le desconecta.
+"""
+import asyncio
+import json
+import logging
+import os
+import uuid
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from redis.asyncio import Redis
+
+from app.core.metrics import registry
+from app.core.readiness import readiness
+from app.services.search_percolator import PercolatorQuery, SearchPercolator
+
+logger = logging.getLogger(__name__)
+
+JOB_STREAM_ENABLED = os.getenv("JOB_STREAM_ENABLED", "true").lower() == "true"
+JOB_STREAM_CHANNEL = "jobs:stream"
+# Ofertas pendientes por suscriptor antes de desconectarlo
+JOB_STREAM_BUFFER = int(os.getenv("JOB_STREAM_BUFFER", 100))
+JOB_STREAM_MAX_SUBSCRIBERS = int(os.getenv("JOB_STREAM_MAX_SUBSCRIBERS", 10000))
+# Comentario periódico para que proxies y balanceadores no cierren la conexión
+JOB_STREAM_HEARTBEAT_SECONDS = float(os.getenv("JOB_STREAM_HEARTBEAT_SECONDS", 15))
+
+# Campos de la oferta que viajan por el canal y llegan al cliente
+STREAM_FIELDS = (
+    "id", "title", "company", "location", "is_remote", "job_type", "level", "salary_range", "created_at",
+)
+
+stream_subscribers = registry.gauge("job_stream_subscribers", "Suscriptores SSE conectados al worker")
+stream_events = registry.counter("job_stream_events_total", "Ofertas entregadas a suscriptores SSE")
+stream_dropped = registry.counter("job_stream_dropped_total", "Suscriptores SSE desconectados por buffer lleno")
+
+
+class Subscription:
+    __slots__ = ("id", "queue", "dropped")
+
+    def __init__(self):
+        self.id = str(uuid.uuid4())
+        self.queue: "asyncio.Queue[Dict[str, Any]]" = asyncio.Queue(maxsize=JOB_STREAM_BUFFER)
+        self.dropped = False
+
+
+class JobStreamHub:
+    def __init__(self):
+        self._filters = SearchPercolator()
+        self._subscriptions: Dict[str, Subscription] = {}
+
+    def __len__(self) -> int:
+        return len(self._subscriptions)
+
+    def subscribe(
+            self,
+            q: Optional[str] = None,
+            location: Optional[str] = None,
+            is_remote: Optional[bool] = None
+    ) -> Optional[Subscription]:
+        """Registra un suscriptor; None si el worker ya tiene el máximo"""
+        if len(self._subscriptions) >= JOB_STREAM_MAX_SUBSCRIBERS:
+            return None
+        subscription = Subscription()
+        self._subscriptions[subscription.id] = subscription
+        self._filters.add(PercolatorQuery(
+            id=subscription.id, user_id="",
+            q=q.lower() if q else None, location=location.lower() if location else None, is_remote=is_remote,
+        ))
+        stream_subscribers.set(len(self._subscriptions))
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        if self._subscriptions.pop(subscription.id, None) is not None:
+            self._filters.remove(subscription.id)
+            stream_subscribers.set(len(self._subscriptions))
+
+    def dispatch(self, jobs: List[Dict[str, Any]]):
+        """Encola cada oferta en los suscriptores cuyo filtro cumple; desconecta a los llenos"""
+        delivered = 0
+        for job in jobs:
+            for query in self._filters.match(job):
+                subscription = self._subscriptions[query.id]
+                try:
+                    subscription.queue.put_nowait(job)
+                    delivered += 1
+                except asyncio.QueueFull:
+                    subscription.dropped = True
+                    self.unsubscribe(subscription)
+                    stream_dropped.inc()
+        if delivered:
+            stream_events.inc(delivered)
+
+    async def listen(self, redis: Redis):
+        """Reparte lo publicado en JOB_STREAM_CHANNEL por cualquier worker"""
+        pubsub = redis.pubsub(ignore_subscribe_messages=True)
+        try:
+            await pubsub.subscribe(JOB_STREAM_CHANNEL)
+            readiness.mark_ready("job_stream")
+            async for message in pubsub.listen():
+                try:
+                    self.dispatch(json.loads(message["data"]))
+                except Exception as e:
+                    logger.error("Mensaje inválido en %s: %s", JOB_STREAM_CHANNEL, e)
+        finally:
+            await pubsub.aclose()
+
+    async def events(self, subscription: Subscription) -> AsyncIterator[str]:
+        """Flujo SSE de un suscriptor: un evento `job` por oferta y comentarios de latido"""
+        try:
+            # Espera del cliente antes de reconectar tras un corte
+            yield "retry: 5000\n\n"
+            while not subscription.dropped:
+                try:
+                    job = await asyncio.wait_for(subscription.queue.get(), JOB_STREAM_HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": ping\n\n"
+                    continue
+                yield f"event: job\nid: {job['id']}\ndata: {json.dumps(job)}\n\n"
+            # El cliente no leyó a tiempo: se le avisa y se cierra (EventSource reconecta)
+            yield "event: dropped\ndata: {}\n\n"
+        finally:
+            self.unsubscribe(subscription)
+
+
+def stream_payload(jobs: List[Dict[str, Any]]) -> str:
+    """Ofertas nuevas (filas del upsert) como mensaje del canal"""
+    return json.dumps([{field: job.get(field) for field in STREAM_FIELDS} for job in jobs], default=str)
+
+
+# Instancia global del worker
+hub = JobStreamHub()
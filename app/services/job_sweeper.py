@@ -0,0 +1,137 @@
+# services/job_sweeper.py
+import asyncio
+import logging
+import os
+from datetime import datetime, timedelta
+from typing import List, Optional
+
+from sqlalchemy import select, update, delete, exists
+from sqlalchemy.dialects.postgresql import insert
+
+from app.cache.redis_service import RedisService
+from app.db.database import async_session
+from app.model.models import JobOffer, JobApplication, job_offers_archive
+from app.services.job_service import invalidate_jobs
+
+logger = logging.getLogger(__name__)
+
+# Días sin que el scraper vea una oferta antes de desactivarla
+JOB_STALE_AFTER_DAYS = int(os.getenv("JOB_STALE_AFTER_DAYS", 30))
+# Días que una oferta inactiva permanece en la tabla caliente antes de archivarse
+JOB_ARCHIVE_AFTER_DAYS = int(os.getenv("JOB_ARCHIVE_AFTER_DAYS", 90))
+JOB_SWEEP_INTERVAL_SECONDS = int(os.getenv("JOB_SWEEP_INTERVAL_SECONDS", 3600))
+JOB_SWEEP_BATCH_SIZE = int(os.getenv("JOB_SWEEP_BATCH_SIZE", 1000))
+
+# Columnas que se copian a la tabla de archivo
+ARCHIVED_COLUMNS = [column.name for column in JobOffer.__table__.columns]
+
+
+class JobSweeper:
+    """
+    Mantiene acotada la tabla caliente `job_offers`:
+    - Desactiva ofertas que el scraper no ve hace JOB_STALE_AFTER_DAYS.
+    - Mueve a `job_offers_archive` las inactivas con más de JOB_ARCHIVE_AFTER_DAYS.
+    Trabaja por lotes con `FOR UPDATE SKIP LOCKED`, así varios workers pueden
+    barrer a la vez sin bloquearse entre sí ni bloquear la ingesta.
+    Las ofertas barridas salen de las cachés de fichas y, con Redis, del
+    ranking de tendencias.
+    """
+
+    def __init__(self, session_factory=async_session, redis_service: Optional[RedisService] = None):
+        self.session_factory = session_factory
+        self.redis_service = redis_service
+
+    async def deactivate_stale_jobs(self) -> int:
+        """Desactiva por lotes las ofertas no vistas dentro de la ventana"""
+        cutoff = datetime.utcnow() - timedelta(days=JOB_STALE_AFTER_DAYS)
+        stale_ids = (
+            select(JobOffer.id)
+            .where(JobOffer.active == True, JobOffer.last_seen_at < cutoff)
+            .limit(JOB_SWEEP_BATCH_SIZE)
+            .with_for_update(skip_locked=True)
+            .scalar_subquery()
+        )
+        stmt = (
+            update(JobOffer)
+            .where(JobOffer.id.in_(stale_ids))
+            .values(active=False, updated_at=datetime.utcnow())
+            .returning(JobOffer.id)
+            .execution_options(synchronize_session=False)
+        )
+        return await self._run_in_batches(stmt)
+
+    async def archive_inactive_jobs(self) -> int:
+        """
+        Mueve por lotes las ofertas inactivas vencidas a la tabla de archivo
+        (DELETE ... RETURNING + INSERT en una sola sentencia).
+        Las ofertas con aplicaciones se quedan por la clave foránea.
+        """
+        cutoff = datetime.utcnow() - timedelta(days=JOB_ARCHIVE_AFTER_DAYS)
+        expired_ids = (
+            select(JobOffer.id)
+            .where(
+                JobOffer.active == False,
+                JobOffer.updated_at < cutoff,
+                ~exists().where(JobApplication.job_offer_id == JobOffer.id)
+            )
+            .limit(JOB_SWEEP_BATCH_SIZE)
+            .with_for_update(skip_locked=True)
+            .scalar_subquery()
+        )
+        moved = (
+            delete(JobOffer)
+            .where(JobOffer.id.in_(expired_ids))
+            .returning(*[JobOffer.__table__.c[name] for name in ARCHIVED_COLUMNS])
+            .cte("moved")
+        )
+        stmt = insert(job_offers_archive).from_select(
+            ARCHIVED_COLUMNS, select(*[moved.c[name] for name in ARCHIVED_COLUMNS])
+        )
+        # Una oferta ya archivada (reactivada y vuelta a vencer) se sobrescribe: nunca se
+        # borra sin quedar en el archivo, y el INSERT afecta tantas filas como el DELETE
+        stmt = stmt.on_conflict_do_update(
+            index_elements=['id'],
+            set_={
+                **{name: stmt.excluded[name] for name in ARCHIVED_COLUMNS if name != 'id'},
+                'archived_at': datetime.utcnow(),
+            }
+        ).returning(job_offers_archive.c.id)
+        return await self._run_in_batches(stmt)
+
+    async def _run_in_batches(self, stmt) -> int:
+        """
+        Ejecuta la sentencia en transacciones cortas hasta que un lote quede
+        incompleto; la sentencia devuelve los ids de las filas barridas.
+        """
+        total = 0
+        while True:
+            async with self.session_factory() as session:
+                async with session.begin():
+                    job_ids = (await session.execute(stmt)).scalars().all()
+            total += len(job_ids)
+            await self._forget(job_ids)
+            if len(job_ids) < JOB_SWEEP_BATCH_SIZE:
+                return total
+
+    async def _forget(self, job_ids: List[str]):
+        """Quita las ofertas barridas de las cachés y del ranking de tendencias"""
+        if not job_ids:
+            return
+        await invalidate_jobs(job_ids, self.redis_service)
+        if self.redis_service:
+            await self.redis_service.remove_job_popularity(job_ids)
+
+    async def run_once(self):
+        deactivated = await self.deactivate_stale_jobs()
+        archived = await self.archive_inactive_jobs()
+        logger.info("Barrido de ofertas: %d desactivadas, %d archivadas", deactivated, archived)
+
+    async def start(self):
+        """Ejecuta el barrido periódicamente"""
+        logger.info("Iniciando barrido periódico de ofertas...")
+        while True:
+            try:
+                await self.run_once()
+            except Exception as e:
+                logger.error("Error en el barrido de ofertas: %s", e)
+            await asyncio.sleep(JOB_SWEEP_INTERVAL_SECONDS)
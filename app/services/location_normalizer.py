@@ -0,0 +1,177 @@
+# services/location_normalizer.py
+"""
+Normalización de `location` (texto libre del scraper) a un lugar canónico
+de un gazetteer local.
+
+"Lima, Perú", "Lima - PE" y "Remote/Lima" resuelven al mismo `place_id`
+(pe-lima). El texto se separa por comas, guiones, barras y paréntesis, se
+pasa a minúsculas sin tildes, y en cada parte se buscan los nombres y alias
+del gazetteer de más palabras a menos. Gana el lugar más específico
+(distrito sobre ciudad sobre país) con la coincidencia más larga; el país
+mencionado desempata alias compartidos. Sin coincidencias ("Remoto") no hay
+lugar.
+
+Los lugares forman una jerarquía (país > ciudad > distrito). Las búsquedas
+por lugar (con sus descendientes) o por radio se resuelven contra el
+gazetteer en memoria a una lista de `place_id`, que la base filtra por índice.
+"""
+import csv
+import math
+import os
+import re
+import unicodedata
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+GAZETTEER_PATH = os.getenv(
+    "GAZETTEER_PATH", os.path.join(os.path.dirname(__file__), "..", "data", "gazetteer.csv")
+)
+# Textos de ubicación distintos cuya resolución se recuerda
+LOCATION_CACHE_SIZE = int(os.getenv("LOCATION_CACHE_SIZE", 16384))
+
+# Columnas de job_offers derivadas de location
+LOCATION_COLUMNS = ("place_id", "latitude", "longitude")
+
+EARTH_RADIUS_KM = 6371.0
+# Más específico, mayor prioridad al resolver
+KIND_RANK = {"country": 0, "city": 1, "district": 2}
+_SEPARATORS = re.compile(r"[,;/|()\-–]")
+_NOT_ALNUM = re.compile(r"[^a-z0-9]+")
+
+
+class Place(NamedTuple):
+    id: str
+    name: str
+    parent: Optional[str]  # place_id del lugar que lo contiene
+    country: str  # place_id del país
+    kind: str  # country, city o district
+    latitude: float
+    longitude: float
+
+
+def fold(text: str) -> str:
+    """Minúsculas, sin tildes y solo letras/dígitos separados por un espacio"""
+    decomposed = unicodedata.normalize("NFKD", text.lower())
+    stripped = "".join(char for char in decomposed if not unicodedata.combining(char))
+    return _NOT_ALNUM.sub(" ", stripped).strip()
+
+
+class Gazetteer:
+    def __init__(self, places: Iterable[Place], aliases: Dict[str, List[str]]):
+        self.places: Dict[str, Place] = {place.id: place for place in places}
+        # Alias (ya plegado) -> lugares, en el orden del archivo
+        self._by_alias: Dict[str, List[Place]] = {}
+        for place in self.places.values():
+            for alias in [place.name, *aliases.get(place.id, ())]:
+                matches = self._by_alias.setdefault(fold(alias), [])
+                if place not in matches:
+                    matches.append(place)
+        self._max_words = max((len(alias.split()) for alias in self._by_alias), default=1)
+        self._children: Dict[str, List[str]] = {}
+        for place in self.places.values():
+            if place.parent:
+                self._children.setdefault(place.parent, []).append(place.id)
+
+    @classmethod
+    def load(cls, path: str = GAZETTEER_PATH) -> "Gazetteer":
+        with open(path, encoding="utf-8", newline="") as file:
+            rows = {row["place_id"]: row for row in csv.DictReader(file)}
+
+        def country_of(place_id: str) -> str:
+            parent = rows[place_id]["parent"]
+            return country_of(parent) if parent else place_id
+
+        places = [
+            Place(place_id, row["name"], row["parent"] or None, country_of(place_id), row["kind"],
+                  float(row["latitude"]), float(row["longitude"]))
+            for place_id, row in rows.items()
+        ]
+        aliases = {place_id: [alias for alias in (row.get("aliases") or "").split("|") if alias]
+                   for place_id, row in rows.items()}
+        return cls(places, aliases)
+
+    def get(self, place_id: str) -> Optional[Place]:
+        return self.places.get(place_id)
+
+    def resolve(self, raw: Optional[str]) -> Optional[Place]:
+        """Lugar más específico mencionado en un texto de ubicación"""
+        if not raw:
+            return None
+        found: List[tuple] = []  # (palabras del alias, lugares)
+        for part in _SEPARATORS.split(raw):
+            words = fold(part).split()
+            for size in range(min(len(words), self._max_words), 0, -1):
+                for start in range(len(words) - size + 1):
+                    places = self._by_alias.get(" ".join(words[start:start + size]))
+                    if places:
+                        found.append((size, places))
+        if not found:
+            return None
+        countries = {place.id for _, places in found for place in places if place.kind == "country"}
+        best, best_rank = None, None
+        for order, (size, places) in enumerate(found):
+            for place in places:
+                # Más específico, luego del país mencionado, luego alias más largo, luego primero en el texto
+                rank = (KIND_RANK[place.kind], place.country in countries, size, -order)
+                if best_rank is None or rank > best_rank:
+                    best, best_rank = place, rank
+        return best
+
+    def expand(self, place_id: str) -> List[str]:
+        """El lugar y todos los que contiene"""
+        ids = [place_id]
+        for contained in ids:
+            ids.extend(self._children.get(contained, ()))
+        return ids
+
+    def within(self, latitude: float, longitude: float, radius_km: float) -> List[str]:
+        """Ciudades y distritos a menos de `radius_km` (haversine) del punto"""
+        lat1, lon1 = math.radians(latitude), math.radians(longitude)
+        ids = []
+        for place in self.places.values():
+            if place.kind == "country":
+                continue
+            lat2, lon2 = math.radians(place.latitude), math.radians(place.longitude)
+            a = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+            if 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(a)) <= radius_km:
+                ids.append(place.id)
+        return ids
+
+
+@lru_cache(maxsize=1)
+def get_gazetteer() -> Gazetteer:
+    return Gazetteer.load()
+
+
+@lru_cache(maxsize=LOCATION_CACHE_SIZE)
+def resolve_location(raw: Optional[str]) -> Optional[Place]:
+    return get_gazetteer().resolve(raw)
+
+
+def location_columns(raw: Any) -> Dict[str, Any]:
+    """Valores de LOCATION_COLUMNS para una ubicación (todo None si no se reconoce)"""
+    if not isinstance(raw, str):
+        return dict.fromkeys(LOCATION_COLUMNS)
+    place = resolve_location(raw)
+    if place is None:
+        return dict.fromkeys(LOCATION_COLUMNS)
+    return {"place_id": place.id, "latitude": place.latitude, "longitude": place.longitude}
+
+
+def find_place(query: str) -> Optional[Place]:
+    """Un place_id o un texto de ubicación"""
+    return get_gazetteer().get(query) or resolve_location(query)
+
+
+@lru_cache(maxsize=1024)
+def place_filter(query: str, radius_km: Optional[float] = None) -> Optional[Tuple[str, ...]]:
+    """
+    place_id que cumplen un filtro de lugar: el lugar y los que contiene o,
+    con `radius_km`, los que están dentro del radio. None si el lugar no existe.
+    """
+    place = find_place(query)
+    if place is None:
+        return None
+    if radius_km is None:
+        return tuple(get_gazetteer().expand(place.id))
+    return tuple(get_gazetteer().within(place.latitude, place.longitude, radius_km))
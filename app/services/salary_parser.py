@@ -0,0 +1,165 @@
+# services/salary_parser.py
+"""
+Normalización de `salary_range` (texto libre del scraper) a columnas
+numéricas filtrables en SQL.
+
+Reconoce rangos ("S/ 3,000 - 4,500 mensual", "$40k - $60k al año"), cotas
+("Hasta USD 3000", "Desde 2.500 €"), separadores de miles y decimales de
+ambos estilos, sufijos k/mil/M, moneda (símbolo o código) y periodo. Los
+importes se guardan mensuales para poder compararlos entre ofertas; el
+periodo original queda en `salary_period`. Sin periodo explícito se asume
+SALARY_DEFAULT_PERIOD y sin moneda SALARY_DEFAULT_CURRENCY. Un texto sin
+importes ("A convenir") deja las columnas en NULL.
+
+Las cantidades de otra cosa ("2 años de experiencia", "3 días a la semana",
+"40 horas semanales") se descartan antes de buscar importes y periodo, y un
+rango cuyos extremos difieren más de MAX_RANGE_RATIO veces no se acepta:
+
+>>> parse_salary("S/ 3000 al mes, 2 años de experiencia")
+SalaryRange(min=3000, max=3000, currency='PEN', period='MONTH')
+>>> parse_salary("3 días a la semana, S/ 3000")
+SalaryRange(min=3000, max=3000, currency='PEN', period='MONTH')
+>>> parse_salary("2 500 - 3 000")
+SalaryRange(min=2500, max=3000, currency='PEN', period='MONTH')
+>>> parse_salary("$40k - $60k al año")
+SalaryRange(min=3333, max=5000, currency='USD', period='YEAR')
+>>> parse_salary("2 - 500") is None
+True
+
+Un salary_range que no es texto deja las columnas en NULL:
+
+>>> salary_columns(3000)["salary_min"] is None
+True
+>>> salary_columns(["S/ 3000"])["salary_currency"] is None
+True
+"""
+import os
+import re
+from functools import lru_cache
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+SALARY_DEFAULT_CURRENCY = os.getenv("SALARY_DEFAULT_CURRENCY", "PEN")
+SALARY_DEFAULT_PERIOD = os.getenv("SALARY_DEFAULT_PERIOD", "MONTH")
+# Moneda de "$" sin otra indicación
+SALARY_DOLLAR_CURRENCY = os.getenv("SALARY_DOLLAR_CURRENCY", "USD")
+
+# Columnas de job_offers derivadas de salary_range
+SALARY_COLUMNS = ("salary_min", "salary_max", "salary_currency", "salary_period")
+
+# Importe de un periodo expresado en meses (40 h semanales, 5 días por semana)
+MONTHLY_FACTORS = {
+    "HOUR": 40 * 52 / 12,
+    "DAY": 5 * 52 / 12,
+    "WEEK": 52 / 12,
+    "MONTH": 1.0,
+    "YEAR": 1 / 12,
+}
+# Máximo cociente entre los extremos de un rango; más allá es un error de lectura
+MAX_RANGE_RATIO = 10
+
+# En orden: los más específicos antes que "$"
+_CURRENCY_PATTERNS = [(re.compile(pattern), code) for pattern, code in (
+    (r"s/\.?|(?<![a-z])pen\b|\bsoles?\b", "PEN"),
+    (r"us\$|(?<![a-z])usd\b|d[oó]lares?|dollars?", "USD"),
+    (r"€|(?<![a-z])eur\b|\beuros?\b", "EUR"),
+    (r"£|(?<![a-z])gbp\b", "GBP"),
+    (r"r\$|(?<![a-z])brl\b", "BRL"),
+    (r"(?<![a-z])mxn\b", "MXN"),
+    (r"(?<![a-z])cop\b", "COP"),
+    (r"(?<![a-z])clp\b", "CLP"),
+    (r"(?<![a-z])ars\b", "ARS"),
+)]
+_PERIOD_PATTERNS = [(re.compile(pattern), period) for pattern, period in (
+    (r"hora|hour|\bhr\b|/\s*h\b", "HOUR"),
+    (r"\bd[ií]a|diari|\bday|daily|jornal", "DAY"),
+    (r"semana|week", "WEEK"),
+    (r"\bmes|mensual|month|\bmo\b", "MONTH"),
+    (r"\baño|anual|year|annum|\byr\b|\bp\.?a\.?(?!\w)", "YEAR"),
+)]
+# Un espacio solo separa miles si le siguen grupos de tres dígitos ("2 500")
+_AMOUNT = re.compile(r"(\d{1,3}(?:[ \u00a0]\d{3})+(?![\d.,])|\d[\d.,]*\d|\d)(?:\s*(k|mil|m)(?![a-z]))?")
+# Cantidad de tiempo (no de dinero), con su frecuencia si la tiene: "3 días a la semana"
+_COUNTED_UNIT = re.compile(
+    r"\d+(?:[.,]\d+)?\s*(?:a[ñn]os?|years?|yrs?|d[ií]as?|days?|horas?|hours?|hrs?|h|semanas?|weeks?|meses|months)\b"
+    r"(?:\s*(?:a la|al|por|x|/|per|a)?\s*(?:semanas?|semanales|weeks?|meses|mes|mensuales|months?|d[ií]as?|diari[oa]s|days?))?"
+)
+_UPPER_BOUND = re.compile(r"\bhasta\b|\bm[aá]x(imo)?\b|\bup to\b")
+_LOWER_BOUND = re.compile(r"\bdesde\b|\ba partir de\b|\bm[ií]n(imo)?\b|\bfrom\b|\+\s*$")
+_MULTIPLIERS = {"k": 1_000, "mil": 1_000, "m": 1_000_000}
+
+
+class SalaryRange(NamedTuple):
+    min: Optional[int]  # Mensual
+    max: Optional[int]
+    currency: str
+    period: str  # Periodo en que venía expresado
+
+
+def _number(token: str) -> float:
+    """'3,000' / '40.000' / '2 500' / '1.5' / '2,5' / '1.234,56' → float"""
+    token = token.replace(" ", "").replace("\u00a0", "")
+    if "," in token and "." in token:
+        decimal = "," if token.rfind(",") > token.rfind(".") else "."
+        return float(token.replace("." if decimal == "," else ",", "").replace(decimal, "."))
+    for separator in (",", "."):
+        if separator in token:
+            head, *groups = token.split(separator)
+            # Grupos de tres dígitos: separador de miles; si no, decimal
+            if all(len(group) == 3 for group in groups):
+                return float(head + "".join(groups))
+            return float(head + "." + "".join(groups)) if len(groups) == 1 else float(token.replace(separator, ""))
+    return float(token)
+
+
+def _amounts(text: str) -> List[float]:
+    """Hasta dos importes; el sufijo del segundo se extiende al primero ('40-60k')"""
+    found: List[Tuple[float, Optional[str]]] = []
+    for match in _AMOUNT.finditer(text):
+        value = _number(match.group(1))
+        if value > 0:
+            found.append((value, match.group(2)))
+        if len(found) == 2:
+            break
+    if len(found) == 2 and found[1][1] and not found[0][1] and found[0][0] < 1000:
+        found[0] = (found[0][0], found[1][1])
+    return [value * _MULTIPLIERS.get(suffix, 1) for value, suffix in found]
+
+
+def _is_plausible(amounts: List[float]) -> bool:
+    return max(amounts) <= min(amounts) * MAX_RANGE_RATIO
+
+
+@lru_cache(maxsize=4096)
+def parse_salary(text: Optional[str]) -> Optional[SalaryRange]:
+    """Rango salarial mensual de un texto libre; None si no tiene importes"""
+    if not text:
+        return None
+    lowered = _COUNTED_UNIT.sub(" ", text.lower())
+    amounts = _amounts(lowered)
+    if not amounts or not _is_plausible(amounts):
+        return None
+
+    currency = next((code for pattern, code in _CURRENCY_PATTERNS if pattern.search(lowered)), None)
+    if currency is None:
+        currency = SALARY_DOLLAR_CURRENCY if "$" in lowered else SALARY_DEFAULT_CURRENCY
+    period = next((period for pattern, period in _PERIOD_PATTERNS if pattern.search(lowered)),
+                  SALARY_DEFAULT_PERIOD)
+
+    factor = MONTHLY_FACTORS[period]
+    low, high = (round(amount * factor) for amount in (min(amounts), max(amounts)))
+    if len(amounts) == 1:
+        if _UPPER_BOUND.search(lowered):
+            low = None
+        elif _LOWER_BOUND.search(lowered):
+            high = None
+    return SalaryRange(low, high, currency, period)
+
+
+def salary_columns(text: Any) -> Dict[str, Any]:
+    """Valores de SALARY_COLUMNS para un salary_range (todo None si no se reconoce)"""
+    if not isinstance(text, str):
+        return dict.fromkeys(SALARY_COLUMNS)
+    parsed = parse_salary(text)
+    if parsed is None:
+        return dict.fromkeys(SALARY_COLUMNS)
+    return dict(zip(SALARY_COLUMNS, parsed))
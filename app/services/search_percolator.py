@@ -0,0 +1,190 @@
+# services/search_percolator.py
+"""
+Percolador de búsquedas guardadas: en lugar de ejecutar cada búsqueda
+guardada contra la base al llegar una oferta, se indexan las búsquedas y se
+consulta el índice con la oferta.
+
+Los criterios tienen la misma semántica que /jobs/search/val: `q` y
+`location` son subcadenas (ILIKE '%...%') del título y la ubicación, y
+`is_remote`, `job_type` y `level` son igualdades. Cada búsqueda se indexa
+bajo una sola clave ("ancla"): un 4-grama de `q` (un trigrama si solo tiene
+tres caracteres), o si no tiene, de `location`, o el valor de un filtro
+exacto; entre sus n-gramas se elige el de menos búsquedas ya indexadas. Una
+oferta solo revisa las búsquedas ancladas en los n-gramas de su título y su
+ubicación y en sus valores exactos, y cada candidata se verifica completa.
+"""
+import logging
+import os
+import time
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import select
+
+from app.core.metrics import registry
+from app.db.database import async_session
+from app.model.models import SavedSearch
+
+logger = logging.getLogger(__name__)
+
+# Antigüedad máxima de las búsquedas cargadas antes de recargar los cambios
+SAVED_SEARCH_REFRESH_SECONDS = float(os.getenv("SAVED_SEARCH_REFRESH_SECONDS", 30))
+
+saved_searches_indexed = registry.gauge("saved_searches_indexed", "Búsquedas guardadas activas en el percolador")
+saved_search_matches = registry.counter("saved_search_matches_total", "Coincidencias de ofertas nuevas con búsquedas guardadas")
+
+# Ancla: (tipo, valor), p. ej. ("q:4", "pyth") o ("job_type", "FULL_TIME")
+Anchor = Tuple[str, Any]
+# Largo de los n-gramas de anclaje: más largos, menos candidatas por oferta
+ANCHOR_GRAM = 4
+
+
+@dataclass(frozen=True)
+class PercolatorQuery:
+    id: str
+    user_id: str
+    q: Optional[str] = None
+    location: Optional[str] = None
+    is_remote: Optional[bool] = None
+    job_type: Optional[str] = None
+    level: Optional[str] = None
+
+    def matches(self, title: str, location: str, job: Dict[str, Any]) -> bool:
+        """`title` y `location` ya en minúsculas"""
+        return ((not self.q or self.q in title)
+                and (not self.location or self.location in location)
+                and (self.is_remote is None or self.is_remote == bool(job.get("is_remote")))
+                and (not self.job_type or self.job_type == job.get("job_type"))
+                and (not self.level or self.level == job.get("level")))
+
+
+def _grams(text: str, size: int) -> Set[str]:
+    return {text[index:index + size] for index in range(len(text) - size + 1)}
+
+
+class SearchPercolator:
+    def __init__(self):
+        self._queries: Dict[str, PercolatorQuery] = {}
+        self._anchor_of: Dict[str, Anchor] = {}
+        # Tipo de ancla -> valor -> búsquedas
+        self._by_anchor: Dict[str, Dict[Any, Dict[str, PercolatorQuery]]] = {}
+        # Marca de la última recarga (updated_at más reciente visto)
+        self._loaded_until: Optional[Any] = None
+        self._refreshed_at = 0.0
+
+    def __len__(self) -> int:
+        return len(self._queries)
+
+    def _anchor(self, query: PercolatorQuery) -> Anchor:
+        for field, text in (("q", query.q), ("location", query.location)):
+            if text and len(text) >= 3:
+                # El n-grama menos cargado reparte las búsquedas entre anclas
+                size = min(len(text), ANCHOR_GRAM)
+                kind = f"{field}:{size}"
+                loaded = self._by_anchor.get(kind, {})
+                return kind, min(sorted(_grams(text, size)), key=lambda gram: len(loaded.get(gram, ())))
+        for field, text in (("q", query.q), ("location", query.location)):
+            if text:
+                # Uno o dos caracteres: se revisan con todas las ofertas
+                return field + ":short", None
+        for field in ("job_type", "level", "is_remote"):
+            value = getattr(query, field)
+            if value is not None:
+                return field, value
+        return "all", None
+
+    def add(self, query: PercolatorQuery):
+        """Agrega o reemplaza una búsqueda (criterios de texto en minúsculas)"""
+        self.remove(query.id)
+        anchor = self._anchor(query)
+        self._queries[query.id] = query
+        self._anchor_of[query.id] = anchor
+        kind, value = anchor
+        self._by_anchor.setdefault(kind, {}).setdefault(value, {})[query.id] = query
+
+    def remove(self, query_id: str):
+        anchor = self._anchor_of.pop(query_id, None)
+        if anchor is None:
+            return
+        del self._queries[query_id]
+        kind, value = anchor
+        queries = self._by_anchor[kind][value]
+        queries.pop(query_id, None)
+        if not queries:
+            del self._by_anchor[kind][value]
+
+    def match(self, job: Dict[str, Any]) -> List[PercolatorQuery]:
+        """Búsquedas guardadas que cumple una oferta"""
+        title = (job.get("title") or "").lower()
+        location = (job.get("location") or "").lower()
+        anchors: List[Anchor] = [
+            ("q:short", None), ("location:short", None), ("all", None),
+            ("job_type", job.get("job_type")), ("level", job.get("level")),
+            ("is_remote", bool(job.get("is_remote"))),
+        ]
+        candidates: List[Dict[str, PercolatorQuery]] = []
+        for kind, value in anchors:
+            queries = self._by_anchor.get(kind, {}).get(value)
+            if queries:
+                candidates.append(queries)
+        for field, text in (("q", title), ("location", location)):
+            for size in range(3, ANCHOR_GRAM + 1):
+                by_gram = self._by_anchor.get(f"{field}:{size}")
+                if not by_gram:
+                    continue
+                for gram in _grams(text, size):
+                    queries = by_gram.get(gram)
+                    if queries:
+                        candidates.append(queries)
+        return [query for queries in candidates for query in queries.values()
+                if query.matches(title, location, job)]
+
+    def match_batch(self, jobs: Iterable[Dict[str, Any]]) -> Dict[str, Tuple[PercolatorQuery, List[str]]]:
+        """Por búsqueda guardada: (búsqueda, ids de las ofertas del lote que la cumplen)"""
+        matches: Dict[str, Tuple[PercolatorQuery, List[str]]] = {}
+        count = 0
+        for job in jobs:
+            for query in self.match(job):
+                matches.setdefault(query.id, (query, []))[1].append(job["id"])
+                count += 1
+        if count:
+            saved_search_matches.inc(count)
+        return matches
+
+    async def refresh(self, session_factory=async_session, force: bool = False):
+        """
+        Carga las búsquedas creadas, editadas o desactivadas desde la última
+        recarga, si pasó SAVED_SEARCH_REFRESH_SECONDS.
+        """
+        if not force and time.monotonic() - self._refreshed_at < SAVED_SEARCH_REFRESH_SECONDS:
+            return
+        stmt = select(SavedSearch)
+        if self._loaded_until is not None:
+            # updated_at lo pone la aplicación antes del commit: una fila marcada antes que la
+            # última cargada puede confirmarse después. Se relee un intervalo hacia atrás
+            # (reaplicar filas es inocuo)
+            since = self._loaded_until - timedelta(seconds=SAVED_SEARCH_REFRESH_SECONDS)
+            stmt = stmt.where(SavedSearch.updated_at >= since)
+        else:
+            stmt = stmt.where(SavedSearch.active == True)
+        async with session_factory() as session:
+            rows = (await session.execute(stmt)).scalars().all()
+        for row in rows:
+            if row.active:
+                self.add(PercolatorQuery(
+                    id=row.id, user_id=row.id_user,
+                    q=row.q.lower() if row.q else None,
+                    location=row.location.lower() if row.location else None,
+                    is_remote=row.is_remote, job_type=row.job_type or None, level=row.level or None,
+                ))
+            else:
+                self.remove(row.id)
+            if self._loaded_until is None or row.updated_at > self._loaded_until:
+                self._loaded_until = row.updated_at
+        self._refreshed_at = time.monotonic()
+        saved_searches_indexed.set(len(self._queries))
+
+
+# Instancia global del worker
+percolator = SearchPercolator()
@@ -0,0 +1,379 @@
+# services/similar_jobs.py
+"""
+Listas precalculadas de ofertas similares.
+
+Cada oferta se vectoriza con TF-IDF sobre términos hasheados (título,
+descripción y requisitos) y se reduce a SIMILAR_JOBS_DIMENSIONS dimensiones
+con una proyección aleatoria dispersa; la similitud es el coseno.
+
+La construcción completa busca vecinos aproximados con SimHash: las firmas de
+64 bits se ordenan bajo varias permutaciones de sus bits y cada ventana de
+ofertas consecutivas se compara con un producto de matrices. Las ofertas que
+llegan después se comparan con todo el índice (producto por bloques) y entran
+también en las listas de sus vecinos. Las listas se guardan en Redis, así que
+leerlas es una sola consulta.
+"""
+import logging
+import os
+import re
+import unicodedata
+import zlib
+from collections import Counter
+from functools import lru_cache
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy import select
+
+from app.db.database import SessionLocal
+from app.model.models import JobOffer
+from app.services.skill_index import normalize_skill
+
+logger = logging.getLogger(__name__)
+
+# Vecinos guardados por oferta
+SIMILAR_JOBS_K = int(os.getenv("SIMILAR_JOBS_K", 10))
+# Dimensiones del vector reducido (memoria del índice: 4 bytes por dimensión y oferta)
+SIMILAR_JOBS_DIMENSIONS = int(os.getenv("SIMILAR_JOBS_DIMENSIONS", 128))
+# Permutaciones de la firma y ofertas por ventana en la construcción completa
+SIMILAR_JOBS_PERMUTATIONS = int(os.getenv("SIMILAR_JOBS_PERMUTATIONS", 16))
+SIMILAR_JOBS_WINDOW = int(os.getenv("SIMILAR_JOBS_WINDOW", 512))
+# Coseno mínimo para considerar similar una oferta
+SIMILAR_JOBS_MIN_SCORE = float(os.getenv("SIMILAR_JOBS_MIN_SCORE", 0.2))
+# Cada cuánto se reconstruye el índice desde la base
+SIMILAR_JOBS_REBUILD_SECONDS = int(os.getenv("SIMILAR_JOBS_REBUILD_SECONDS", 86400))
+SIMILAR_JOBS_SNAPSHOT_BATCH = int(os.getenv("SIMILAR_JOBS_SNAPSHOT_BATCH", 5000))
+
+# Espacio de términos hasheados y posiciones no nulas de cada término en la proyección
+HASH_FEATURES = 1 << 20
+PROJECTION_NONZEROS = 4
+SIGNATURE_BITS = 64
+# El título pesa como varias apariciones en la descripción
+TITLE_WEIGHT = 3
+# Ofertas nuevas por producto de matrices y columnas del índice por bloque
+LINK_BATCH = 256
+LINK_COLUMN_BLOCK = 65536
+# Semilla fija: la proyección y las firmas no cambian entre procesos
+SEED = 20240611
+
+TEXT_COLUMNS = ("id", "title", "description", "requirements")
+
+_WORD = re.compile(r"[^\W_]{2,}")
+
+
+@lru_cache(maxsize=1 << 18)
+def _feature(term: str) -> int:
+    """Posición hasheada de un término, sin tildes (crc32: estable entre procesos)"""
+    term = unicodedata.normalize("NFKD", term)
+    term = "".join(char for char in term if not unicodedata.combining(char))
+    return zlib.crc32(term.encode("utf-8")) & (HASH_FEATURES - 1)
+
+
+def job_terms(title: Optional[str], description: Optional[str], requirements: Optional[Iterable[str]]) -> Dict[int, int]:
+    """Frecuencia de cada término hasheado de una oferta"""
+    counts = Counter(_WORD.findall((description or "").lower()))
+    for word in _WORD.findall((title or "").lower()):
+        counts[word] += TITLE_WEIGHT
+    terms: Dict[int, int] = {}
+    for word, count in counts.items():
+        feature = _feature(word)
+        terms[feature] = terms.get(feature, 0) + count
+    # Cada requisito es un término propio ("req:node.js"), además de sus palabras
+    for requirement in requirements or ():
+        skill = normalize_skill(requirement)
+        if skill:
+            feature = _feature("req:" + skill)
+            terms[feature] = terms.get(feature, 0) + 1
+    return terms
+
+
+def _top_k(ids: np.ndarray, scores: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Por fila, los `k` candidatos de mayor puntaje sin ids repetidos (-1 = vacío)"""
+    # Ordenar por id deja juntos los repetidos: se anula el puntaje de todos salvo uno
+    order = np.lexsort((-scores, ids), axis=1)
+    ids = np.take_along_axis(ids, order, axis=1)
+    scores = np.take_along_axis(scores, order, axis=1)
+    repeated = np.zeros(ids.shape, dtype=bool)
+    repeated[:, 1:] = ids[:, 1:] == ids[:, :-1]
+    scores[repeated | (ids < 0)] = -np.inf
+    best = np.argsort(-scores, axis=1, kind="stable")[:, :k]
+    ids = np.take_along_axis(ids, best, axis=1)
+    scores = np.take_along_axis(scores, best, axis=1)
+    ids[np.isneginf(scores)] = -1
+    return ids, scores
+
+
+def _best_columns(similarity: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Columnas de los `k` mayores valores de cada fila y esos valores"""
+    if similarity.shape[1] > k:
+        columns = np.argpartition(-similarity, k - 1, axis=1)[:, :k]
+    else:
+        columns = np.broadcast_to(np.arange(similarity.shape[1]), similarity.shape)
+    return columns, np.take_along_axis(similarity, columns, axis=1)
+
+
+class SimilarJobIndex:
+    def __init__(self, dimensions: int = SIMILAR_JOBS_DIMENSIONS, k: int = SIMILAR_JOBS_K):
+        self.dimensions = dimensions
+        self.k = k
+        rng = np.random.default_rng(SEED)
+        # Proyección dispersa: cada término suma ±1 en PROJECTION_NONZEROS dimensiones
+        self._projection_dims = rng.integers(0, dimensions, (HASH_FEATURES, PROJECTION_NONZEROS), dtype=np.int16)
+        self._projection_signs = rng.choice(np.array([-1, 1], dtype=np.int8),
+                                            (HASH_FEATURES, PROJECTION_NONZEROS))
+        self._planes = rng.standard_normal((dimensions, SIGNATURE_BITS)).astype(np.float32)
+        # Frecuencia documental de la construcción; las ofertas posteriores usan estos pesos
+        self._df = np.zeros(HASH_FEATURES, dtype=np.int32)
+        self._idf = np.ones(HASH_FEATURES, dtype=np.float32)
+
+        self.ids: List[str] = []
+        self._rows: Dict[str, int] = {}
+        self.size = 0
+        self.vectors = np.zeros((0, dimensions), dtype=np.float32)
+        self.neighbor_rows = np.zeros((0, k), dtype=np.int32)
+        self.neighbor_scores = np.zeros((0, k), dtype=np.float32)
+
+    def fit_idf(self, documents: Iterable[Dict[int, int]]):
+        """Calcula el idf suavizado con una pasada sobre los términos de todas las ofertas"""
+        df = np.zeros(HASH_FEATURES, dtype=np.int64)
+        count = 0
+        block: List[int] = []
+        for terms in documents:
+            block.extend(terms)
+            count += 1
+            if len(block) >= 1 << 20:
+                df += np.bincount(block, minlength=HASH_FEATURES)
+                block = []
+        if block:
+            df += np.bincount(block, minlength=HASH_FEATURES)
+        self._df = df.astype(np.int32)
+        self._idf = (np.log((1 + count) / (1 + df)) + 1).astype(np.float32)
+
+    def embed(self, documents: Sequence[Dict[int, int]]) -> np.ndarray:
+        """Vectores TF-IDF proyectados y normalizados (sublinear tf: 1 + ln tf)"""
+        vectors = np.zeros((len(documents), self.dimensions), dtype=np.float32)
+        if not documents:
+            return vectors
+        lengths = np.fromiter((len(terms) for terms in documents), dtype=np.int64, count=len(documents))
+        features = np.fromiter((feature for terms in documents for feature in terms), dtype=np.int64,
+                               count=int(lengths.sum()))
+        frequencies = np.fromiter((frequency for terms in documents for frequency in terms.values()),
+                                  dtype=np.float32, count=features.size)
+        docs = np.repeat(np.arange(len(documents)), lengths)
+        weights = (1 + np.log(frequencies)) * self._idf[features]
+        cells = docs[:, None] * self.dimensions + self._projection_dims[features]
+        values = weights[:, None] * self._projection_signs[features]
+        vectors[:] = np.bincount(cells.ravel(), weights=values.ravel(),
+                                 minlength=vectors.size).reshape(vectors.shape)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        np.divide(vectors, norms, out=vectors, where=norms > 0)
+        return vectors
+
+    def _reserve(self, size: int):
+        if size <= len(self.vectors):
+            return
+        capacity = max(size, len(self.vectors) * 2, 1024)
+        vectors = np.zeros((capacity, self.dimensions), dtype=np.float32)
+        vectors[:self.size] = self.vectors[:self.size]
+        neighbor_rows = np.full((capacity, self.k), -1, dtype=np.int32)
+        neighbor_rows[:self.size] = self.neighbor_rows[:self.size]
+        neighbor_scores = np.full((capacity, self.k), -np.inf, dtype=np.float32)
+        neighbor_scores[:self.size] = self.neighbor_scores[:self.size]
+        self.vectors, self.neighbor_rows, self.neighbor_scores = vectors, neighbor_rows, neighbor_scores
+
+    def add(self, job_ids: Sequence[str], documents: Sequence[Dict[int, int]]) -> np.ndarray:
+        """Agrega o reemplaza el vector de cada oferta; devuelve sus filas"""
+        vectors = self.embed(documents)
+        rows = np.empty(len(job_ids), dtype=np.int64)
+        for index, job_id in enumerate(job_ids):
+            row = self._rows.get(job_id)
+            if row is None:
+                row = self.size
+                self._reserve(row + 1)
+                self.size += 1
+                self._rows[job_id] = row
+                self.ids.append(job_id)
+            rows[index] = row
+        self.vectors[rows] = vectors
+        return rows
+
+    def contains(self, job_id: str) -> bool:
+        return job_id in self._rows
+
+    def remove(self, job_ids: Iterable[str]) -> List[str]:
+        """
+        Retira ofertas: su vector queda en cero y salen de las listas que las
+        incluían. Devuelve las ofertas cuya lista cambió.
+        """
+        rows = [self._rows[job_id] for job_id in job_ids if job_id in self._rows]
+        if not rows:
+            return []
+        self.vectors[rows] = 0
+        self.neighbor_rows[rows] = -1
+        self.neighbor_scores[rows] = -np.inf
+        size = self.size
+        holders = np.isin(self.neighbor_rows[:size], rows)
+        changed = np.flatnonzero(holders.any(axis=1))
+        self.neighbor_rows[:size][holders] = -1
+        self.neighbor_scores[:size][holders] = -np.inf
+        if changed.size:
+            self.neighbor_rows[changed], self.neighbor_scores[changed] = _top_k(
+                self.neighbor_rows[changed], self.neighbor_scores[changed], self.k
+            )
+        return [self.ids[row] for row in changed]
+
+    def _merge(self, rows: np.ndarray, candidate_rows: np.ndarray, candidate_scores: np.ndarray):
+        """Combina candidatos con las listas actuales de `rows` (filas sin repetir)"""
+        self.neighbor_rows[rows], self.neighbor_scores[rows] = _top_k(
+            np.hstack([self.neighbor_rows[rows], candidate_rows.astype(np.int32)]),
+            np.hstack([self.neighbor_scores[rows], candidate_scores]),
+            self.k,
+        )
+
+    def signatures(self) -> np.ndarray:
+        """Bits de SimHash de cada fila: signo de la proyección sobre hiperplanos aleatorios"""
+        bits = np.empty((self.size, SIGNATURE_BITS), dtype=bool)
+        for start in range(0, self.size, LINK_COLUMN_BLOCK):
+            stop = min(start + LINK_COLUMN_BLOCK, self.size)
+            bits[start:stop] = self.vectors[start:stop] @ self._planes > 0
+        return bits
+
+    def build_neighbors(self, permutations: int = SIMILAR_JOBS_PERMUTATIONS, window: int = SIMILAR_JOBS_WINDOW):
+        """
+        Vecinos aproximados de todas las filas. Por cada permutación de los bits
+        de la firma se ordenan las filas y cada ventana de `window` filas
+        consecutivas (firmas con prefijo común) se compara con un producto de
+        matrices. Las ventanas se desplazan a la mitad en permutaciones alternas.
+        """
+        size = self.size
+        self.neighbor_rows[:size] = -1
+        self.neighbor_scores[:size] = -np.inf
+        if size < 2:
+            return
+        bits = self.signatures()
+        rng = np.random.default_rng(SEED)
+        for permutation in range(permutations):
+            packed = np.packbits(bits[:, rng.permutation(SIGNATURE_BITS)], axis=1)
+            keys = np.ascontiguousarray(packed).view(">u8").ravel()
+            order = np.argsort(keys, kind="stable")
+            offset = window // 2 if permutation % 2 else 0
+            starts = [0] + list(range(offset or window, size, window))
+            for start, stop in zip(starts, starts[1:] + [size]):
+                rows = order[start:stop]
+                if rows.size < 2:
+                    continue
+                block = self.vectors[rows]
+                similarity = block @ block.T
+                np.fill_diagonal(similarity, -np.inf)
+                columns, scores = _best_columns(similarity, self.k)
+                self._merge(rows, rows[columns], scores)
+
+    def link(self, rows: np.ndarray) -> List[str]:
+        """
+        Recalcula de forma exacta los vecinos de `rows` contra todo el índice y
+        las agrega a las listas de las ofertas para las que ahora son más
+        similares que su último vecino. Devuelve las ofertas cuya lista cambió.
+        """
+        changed = set()
+        size = self.size
+        for start in range(0, len(rows), LINK_BATCH):
+            batch = np.asarray(rows[start:start + LINK_BATCH])
+            queries = self.vectors[batch]
+            best_rows = np.full((batch.size, self.k), -1, dtype=np.int32)
+            best_scores = np.full((batch.size, self.k), -np.inf, dtype=np.float32)
+            for column_start in range(0, size, LINK_COLUMN_BLOCK):
+                column_stop = min(column_start + LINK_COLUMN_BLOCK, size)
+                similarity = queries @ self.vectors[column_start:column_stop].T
+                inside = (batch >= column_start) & (batch < column_stop)
+                similarity[np.flatnonzero(inside), batch[inside] - column_start] = -np.inf
+
+                columns, scores = _best_columns(similarity, self.k)
+                best_rows, best_scores = _top_k(
+                    np.hstack([best_rows, (columns + column_start).astype(np.int32)]),
+                    np.hstack([best_scores, scores]), self.k
+                )
+
+                # Filas del bloque para las que alguna oferta nueva supera a su último vecino
+                last = self.neighbor_scores[column_start:column_stop, -1]
+                entering = (similarity > last) & (similarity >= SIMILAR_JOBS_MIN_SCORE)
+                targets = np.flatnonzero(entering.any(axis=0))
+                if targets.size:
+                    candidates = np.where(entering[:, targets], similarity[:, targets], -np.inf).T
+                    columns, scores = _best_columns(candidates, self.k)
+                    self._merge(targets + column_start, batch[columns], scores)
+                    changed.update((targets + column_start).tolist())
+            self.neighbor_rows[batch], self.neighbor_scores[batch] = best_rows, best_scores
+            changed.update(batch.tolist())
+        return [self.ids[row] for row in sorted(changed)]
+
+    def neighbors(self, job_id: str, min_score: float = SIMILAR_JOBS_MIN_SCORE) -> Dict[str, float]:
+        """Vecinos de una oferta con su similitud, de mayor a menor"""
+        row = self._rows.get(job_id)
+        if row is None:
+            return {}
+        return {
+            self.ids[neighbor]: round(float(score), 4)
+            for neighbor, score in zip(self.neighbor_rows[row], self.neighbor_scores[row])
+            if neighbor >= 0 and score >= min_score
+        }
+
+    def memory_bytes(self) -> int:
+        return (self.vectors.nbytes + self.neighbor_rows.nbytes + self.neighbor_scores.nbytes
+                + self._projection_dims.nbytes + self._projection_signs.nbytes + self._planes.nbytes
+                + self._df.nbytes + self._idf.nbytes)
+
+
+def build_index(
+        iter_rows: Callable[[], Iterator[Dict[str, Any]]],
+        batch_size: int = SIMILAR_JOBS_SNAPSHOT_BATCH
+) -> SimilarJobIndex:
+    """
+    Construye el índice en dos pasadas sobre `iter_rows()` (idf y luego
+    vectores, sin retener los términos) y calcula los vecinos de todas las filas.
+    """
+    index = SimilarJobIndex()
+    index.fit_idf(job_terms(row["title"], row["description"], row["requirements"]) for row in iter_rows())
+    job_ids: List[str] = []
+    documents: List[Dict[int, int]] = []
+    for row in iter_rows():
+        job_ids.append(row["id"])
+        documents.append(job_terms(row["title"], row["description"], row["requirements"]))
+        if len(documents) >= batch_size:
+            index.add(job_ids, documents)
+            job_ids, documents = [], []
+    index.add(job_ids, documents)
+    index.build_neighbors()
+    return index
+
+
+def iter_active_jobs(session_factory=SessionLocal) -> Iterator[Dict[str, Any]]:
+    """Texto de las ofertas activas, leído con un cursor del servidor por bloques"""
+    columns = [JobOffer.__table__.c[name] for name in TEXT_COLUMNS]
+    stmt = select(*columns).where(JobOffer.active == True).order_by(JobOffer.id)
+    db = session_factory()
+    try:
+        result = db.execute(stmt.execution_options(yield_per=SIMILAR_JOBS_SNAPSHOT_BATCH))
+        for partition in result.partitions():
+            for row in partition:
+                yield dict(zip(TEXT_COLUMNS, row))
+    finally:
+        db.close()
+
+
+def load_index(session_factory=SessionLocal) -> SimilarJobIndex:
+    """Construye el índice desde la base. Es bloqueante: se ejecuta en un hilo."""
+    index = build_index(lambda: iter_active_jobs(session_factory))
+    logger.info("Índice de ofertas similares: %d ofertas, %.1f MB",
+                index.size, index.memory_bytes() / 1e6)
+    return index
+
+
+def load_jobs(job_ids: Iterable[str], session_factory=SessionLocal) -> Dict[str, Dict[str, Any]]:
+    """Texto actual de algunas ofertas activas, por id"""
+    columns = [JobOffer.__table__.c[name] for name in TEXT_COLUMNS]
+    db = session_factory()
+    try:
+        rows = db.execute(select(*columns).where(JobOffer.id.in_(list(job_ids)), JobOffer.active == True))
+        return {row[0]: dict(zip(TEXT_COLUMNS, row)) for row in rows}
+    finally:
+        db.close()
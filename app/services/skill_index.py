@@ -0,0 +1,200 @@
+# services/skill_index.py
+"""
+Índice invertido de requisitos (skills) para recomendar ofertas a un perfil.
+
+Cada oferta es un documento con sus requisitos normalizados; la similitud
+con la lista de skills del perfil es el coseno de vectores TF-IDF binarios.
+Las listas de postings son append-only: cambiar los requisitos de una
+oferta retira su documento y agrega uno nuevo. Los pesos (idf y normas) se
+recalculan en lote con NumPy; entre recálculos los documentos nuevos usan
+los pesos vigentes.
+"""
+import math
+import sys
+import unicodedata
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+# Skills distintas por consulta
+MAX_QUERY_SKILLS = 64
+
+
+# El vocabulario de skills es chico y se repite en cada oferta
+@lru_cache(maxsize=65536)
+def normalize_skill(skill: str) -> str:
+    """Minúsculas, sin tildes y con espacios simples: "  Node.JS " -> "node.js" """
+    skill = unicodedata.normalize("NFKD", skill.strip().lower())
+    skill = "".join(char for char in skill if not unicodedata.combining(char))
+    return " ".join(skill.split())
+
+
+def _grown(array: np.ndarray, size: int) -> np.ndarray:
+    """Copia de `array` con capacidad para al menos `size` elementos"""
+    capacity = max(size, len(array) * 2, 1024)
+    grown = np.zeros(capacity, dtype=array.dtype)
+    grown[:len(array)] = array
+    return grown
+
+
+class SkillIndex:
+    def __init__(self):
+        self._tokens: Dict[str, int] = {}
+        self.token_names: List[str] = []
+        # Por token: postings ya consolidados y documentos agregados desde el último recálculo
+        self._postings: List[np.ndarray] = []
+        self._pending: List[List[int]] = []
+        self._df: List[int] = []
+        self.pending_count = 0
+        # Por documento: fila del modelo de lectura, vigencia y norma del vector TF-IDF
+        self.doc_count = 0
+        self.live_count = 0
+        self.row_of_doc = np.zeros(0, dtype=np.int32)
+        self.live = np.zeros(0, dtype=bool)
+        self.norms = np.zeros(0, dtype=np.float32)
+        # Tokens de cada documento, contiguos: los del documento d están en
+        # _doc_tokens[_doc_start[d]:_doc_start[d + 1]]
+        self._doc_start = np.zeros(1, dtype=np.int64)
+        self._doc_tokens = np.zeros(0, dtype=np.int32)
+        # Documento vigente de cada fila (-1 sin requisitos)
+        self.doc_of_row = np.zeros(0, dtype=np.int32)
+
+    def _token_id(self, token: str) -> int:
+        token_id = self._tokens.get(token)
+        if token_id is None:
+            token_id = len(self.token_names)
+            token = sys.intern(token)
+            self._tokens[token] = token_id
+            self.token_names.append(token)
+            self._postings.append(np.zeros(0, dtype=np.int32))
+            self._pending.append([])
+            self._df.append(0)
+        return token_id
+
+    def _idf(self, token_id: int) -> float:
+        """idf suavizado: ln((1 + N) / (1 + df)) + 1"""
+        return math.log((1 + self.live_count) / (1 + self._df[token_id])) + 1
+
+    def set(self, row: int, requirements: Optional[Iterable[str]]):
+        """Asigna los requisitos de una fila, retirando su documento anterior"""
+        self.retire(row)
+        token_ids = sorted({self._token_id(token) for token in map(normalize_skill, requirements or ()) if token})
+        if not token_ids:
+            return
+        doc = self.doc_count
+        self.doc_count += 1
+        if doc >= len(self.live):
+            self.row_of_doc = _grown(self.row_of_doc, doc + 1)
+            self.live = _grown(self.live, doc + 1)
+            self.norms = _grown(self.norms, doc + 1)
+        if doc + 2 > len(self._doc_start):
+            self._doc_start = _grown(self._doc_start, doc + 2)
+        start = self._doc_start[doc]
+        end = start + len(token_ids)
+        if end > len(self._doc_tokens):
+            self._doc_tokens = _grown(self._doc_tokens, end)
+        self._doc_tokens[start:end] = token_ids
+        self._doc_start[doc + 1] = end
+        if row >= len(self.doc_of_row):
+            start = len(self.doc_of_row)
+            self.doc_of_row = _grown(self.doc_of_row, row + 1)
+            self.doc_of_row[start:] = -1
+        for token_id in token_ids:
+            self._pending[token_id].append(doc)
+            self._df[token_id] += 1
+        self.pending_count += len(token_ids)
+        self.row_of_doc[doc] = row
+        self.live[doc] = True
+        self.live_count += 1
+        self.norms[doc] = math.sqrt(sum(self._idf(token_id) ** 2 for token_id in token_ids))
+        self.doc_of_row[row] = doc
+
+    def retire(self, row: int):
+        """Retira el documento vigente de una fila (sus postings quedan hasta el recálculo)"""
+        if row >= len(self.doc_of_row) or self.doc_of_row[row] < 0:
+            return
+        doc = self.doc_of_row[row]
+        self.live[doc] = False
+        self.live_count -= 1
+        self.doc_of_row[row] = -1
+        for token_id in self._doc_tokens[self._doc_start[doc]:self._doc_start[doc + 1]]:
+            self._df[token_id] -= 1
+
+    def reweight(self):
+        """
+        Recálculo en lote: consolida los postings pendientes, descarta los
+        documentos retirados y recalcula las normas con el idf actual.
+        """
+        live = self.live[:self.doc_count]
+        idf = np.array([self._idf(token_id) for token_id in range(len(self.token_names))], dtype=np.float32)
+        norms_sq = np.zeros(self.doc_count, dtype=np.float32)
+        for token_id, pending in enumerate(self._pending):
+            postings = self._postings[token_id]
+            if pending:
+                postings = np.concatenate([postings, np.array(pending, dtype=np.int32)])
+                self._pending[token_id] = []
+            postings = postings[live[postings]]
+            self._postings[token_id] = postings
+            norms_sq[postings] += idf[token_id] ** 2
+        self.norms[:self.doc_count] = np.sqrt(norms_sq)
+        self.pending_count = 0
+
+    def _posting(self, token_id: int) -> np.ndarray:
+        pending = self._pending[token_id]
+        if not pending:
+            return self._postings[token_id]
+        return np.concatenate([self._postings[token_id], np.array(pending, dtype=np.int32)])
+
+    def score(
+            self,
+            skills: Iterable[str],
+            allowed_rows: np.ndarray,
+            k: int
+    ) -> List[Tuple[int, float, List[str]]]:
+        """
+        Las `k` filas con mayor similitud coseno a `skills`, entre las filas
+        con `allowed_rows[row]` en True. Devuelve (fila, puntaje, skills coincidentes).
+        """
+        query = [self._tokens[token] for token in dict.fromkeys(map(normalize_skill, skills))
+                 if token in self._tokens][:MAX_QUERY_SKILLS]
+        if not query or not self.doc_count:
+            return []
+        weights = np.array([self._idf(token_id) for token_id in query], dtype=np.float32)
+        query_norm = float(np.sqrt(np.sum(weights ** 2)))
+
+        scores = np.zeros(self.doc_count, dtype=np.float32)
+        for token_id, weight in zip(query, weights):
+            # Un documento aparece una sola vez por token: la suma indexada no pierde valores
+            scores[self._posting(token_id)] += weight * weight
+
+        docs = np.flatnonzero(scores)
+        docs = docs[self.live[docs]]
+        rows = self.row_of_doc[docs]
+        keep = allowed_rows[rows]
+        docs, rows = docs[keep], rows[keep]
+        if not docs.size:
+            return []
+        similarity = scores[docs] / (self.norms[docs] * query_norm)
+        if docs.size > k:
+            top = np.argpartition(-similarity, k - 1)[:k]
+        else:
+            top = np.arange(docs.size)
+        top = top[np.argsort(-similarity[top], kind="stable")]
+
+        query_tokens = set(query)
+        results = []
+        for index in top:
+            doc = docs[index]
+            doc_tokens = self._doc_tokens[self._doc_start[doc]:self._doc_start[doc + 1]]
+            matched = [self.token_names[token_id] for token_id in doc_tokens.tolist() if token_id in query_tokens]
+            results.append((int(rows[index]), round(float(similarity[index]), 4), matched))
+        return results
+
+    def memory_bytes(self) -> int:
+        postings = sum(postings.nbytes for postings in self._postings)
+        pending = sum(sys.getsizeof(pending) for pending in self._pending)
+        documents = (self.row_of_doc.nbytes + self.live.nbytes + self.norms.nbytes + self.doc_of_row.nbytes
+                     + self._doc_start.nbytes + self._doc_tokens.nbytes)
+        tokens = sum(sys.getsizeof(token) for token in self.token_names) + sys.getsizeof(self._tokens)
+        return postings + pending + documents + tokens
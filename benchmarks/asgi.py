@@ -0,0 +1,101 @@
+# benchmarks/asgi.py
+"""
+Cliente ASGI en proceso: envía solicitudes directamente a la aplicación, sin
+sockets ni servidor, para medir el costo del framework y del código propio.
+"""
+import asyncio
+import json
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+Headers = Optional[Dict[str, str]]
+
+
+class AsgiClient:
+    def __init__(self, app):
+        self.app = app
+
+    async def request(self, method: str, path: str, query: str = "", headers: Headers = None,
+                      body: Any = None) -> Tuple[int, bytes]:
+        """Devuelve (estado, cuerpo) de una solicitud HTTP"""
+        payload = b"" if body is None else json.dumps(body).encode("utf-8")
+        raw_headers = [(b"host", b"bench")]
+        if body is not None:
+            raw_headers.append((b"content-type", b"application/json"))
+            raw_headers.append((b"content-length", str(len(payload)).encode()))
+        for name, value in (headers or {}).items():
+            raw_headers.append((name.lower().encode("latin-1"), value.encode("latin-1")))
+
+        scope = {
+            "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+            "method": method, "scheme": "http", "path": path, "raw_path": path.encode(),
+            "query_string": query.encode(), "root_path": "", "headers": raw_headers,
+            "server": ("bench", 80), "client": ("127.0.0.1", 50000),
+        }
+        received = False
+        status = 500
+        chunks: List[bytes] = []
+
+        async def receive():
+            nonlocal received
+            if received:
+                await asyncio.sleep(3600)
+            received = True
+            return {"type": "http.request", "body": payload, "more_body": False}
+
+        async def send(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body":
+                chunks.append(message.get("body", b""))
+
+        await self.app(scope, receive, send)
+        return status, b"".join(chunks)
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def summarize(latencies: List[float], elapsed: float, errors: int = 0) -> Dict[str, Any]:
+    """Rendimiento y percentiles de latencia (ms) de una corrida"""
+    ordered = sorted(latencies)
+    return {
+        "requests": len(ordered),
+        "errors": errors,
+        "requests_per_second": round(len(ordered) / elapsed, 1) if elapsed else 0.0,
+        "p50_ms": round(percentile(ordered, 0.50) * 1000, 3),
+        "p95_ms": round(percentile(ordered, 0.95) * 1000, 3),
+        "p99_ms": round(percentile(ordered, 0.99) * 1000, 3),
+    }
+
+
+async def load_test(send_request: Callable[[int], Awaitable[int]], requests: int,
+                    concurrency: int, warmup: int = 50) -> Dict[str, Any]:
+    """
+    Ejecuta `requests` llamadas con `concurrency` trabajadores concurrentes.
+    `send_request(i)` devuelve el estado HTTP; los estados >= 400 cuentan como error.
+    """
+    for index in range(min(warmup, requests)):
+        await send_request(-index - 1)
+
+    latencies: List[float] = []
+    errors = 0
+    counter = iter(range(requests))
+
+    async def worker():
+        nonlocal errors
+        for index in counter:
+            started_at = time.perf_counter()
+            status = await send_request(index)
+            latencies.append(time.perf_counter() - started_at)
+            if status >= 400:
+                errors += 1
+
+    started_at = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return summarize(latencies, time.perf_counter() - started_at, errors)
@@ -0,0 +1,92 @@
+# benchmarks/bench_auth.py
+"""
+Costo de la autenticación por solicitud.
+
+- validate_token: decodificación del JWT y lectura de la sesión en caché.
+- http: la misma ruta con y sin Depends(require_auth()) sobre FastAPI en
+  proceso; la diferencia es el costo que agrega la autenticación.
+
+Uso:
+    python -m benchmarks.bench_auth --requests 5000 --sessions 10000
+"""
+import argparse
+import asyncio
+import json
+import time
+from typing import Any, Dict
+
+import jwt
+from fastapi import Depends, FastAPI
+
+from benchmarks import fixtures  # noqa: F401  (configura LOG_LEVEL antes de importar app)
+from benchmarks.asgi import AsgiClient, load_test
+from app.middleware.auth_middleware import auth_handler, require_auth
+
+
+def build_app() -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/open")
+    async def open_route():
+        return {"ok": True}
+
+    @app.get("/private")
+    async def private_route(user: dict = Depends(require_auth())):
+        return {"ok": True}
+
+    return app
+
+
+def make_token(user_id: str) -> str:
+    payload = {"userId": user_id, "sub": user_id, "roles": ["USER"], "exp": int(time.time()) + 3600}
+    return jwt.encode(payload, auth_handler.token_cache.jwt_secret, algorithm="HS256")
+
+
+async def run_async(requests: int, sessions: int) -> Dict[str, Any]:
+    cache = auth_handler.token_cache
+    for index in range(sessions):
+        cache.add_user_session(f"user-{index}", {"username": f"user{index}", "roles": ["USER"], "courseIds": []})
+    token = make_token("user-1")
+
+    started_at = time.perf_counter()
+    for _ in range(requests):
+        cache.validate_token(token)
+    validate_us = (time.perf_counter() - started_at) / requests * 1e6
+
+    client = AsgiClient(build_app())
+    headers = {"authorization": f"Bearer {token}"}
+
+    async def open_request(index: int) -> int:
+        return (await client.request("GET", "/open"))[0]
+
+    async def private_request(index: int) -> int:
+        return (await client.request("GET", "/private", headers=headers))[0]
+
+    # Secuencial: mide costo por solicitud, no concurrencia
+    open_result = await load_test(open_request, requests, concurrency=1)
+    private_result = await load_test(private_request, requests, concurrency=1)
+    overhead_us = (1 / private_result["requests_per_second"] - 1 / open_result["requests_per_second"]) * 1e6
+
+    return {
+        "benchmark": "auth_overhead",
+        "requests": requests,
+        "sessions_in_cache": sessions,
+        "http": {"open": open_result, "private": private_result},
+        "metrics": {
+            "validate_token_us": round(validate_us, 3),
+            "auth_overhead_per_request_us": round(overhead_us, 3),
+            "private_requests_per_second": private_result["requests_per_second"],
+        },
+    }
+
+
+def run(requests: int = 5000, sessions: int = 10000) -> Dict[str, Any]:
+    return asyncio.run(run_async(requests, sessions))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--sessions", type=int, default=10000)
+    args = parser.parse_args()
+    print(json.dumps(run(args.requests, args.sessions), indent=2))
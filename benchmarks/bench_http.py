@@ -0,0 +1,117 @@
+# benchmarks/bench_http.py
+"""
+Rendimiento de los endpoints HTTP de /jobs sobre la aplicación completa
+(middlewares incluidos), con Postgres real y Redis/Kafka en memoria.
+
+Requiere BENCH_DATABASE_URL (ver benchmarks/fixtures.py).
+
+Uso:
+    python -m benchmarks.bench_http --jobs 100000 --requests 2000 --concurrency 32
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+from typing import Any, Awaitable, Callable, Dict
+
+from benchmarks.fixtures import DATABASE_CONFIGURED, SKIPPED_NO_DATABASE, load_catalog
+from benchmarks.asgi import AsgiClient, load_test
+from benchmarks.fakes import FakeAIOKafkaProducer, FakeRedis
+
+SCENARIOS = ("health", "list", "get", "batch", "search", "trending", "apply")
+
+
+def _profile(index: int) -> Dict[str, Any]:
+    return {
+        "first_name": "Bench", "last_name": f"User {index}", "headline": None, "about": None,
+        "location": "Lima", "contact_info": {}, "skills": ["python", "sql"], "languages": [],
+        "experiences": [], "education": [],
+    }
+
+
+def build_scenarios(client: AsgiClient, jobs: int, jwt_secret: str) -> Dict[str, Callable[[int], Awaitable[int]]]:
+    import jwt
+
+    rng = random.Random(7)
+
+    def job_id() -> str:
+        return f"job-{rng.randrange(jobs)}"
+
+    def token(index: int) -> str:
+        # Un usuario distinto por solicitud: cada aplicación es nueva
+        payload = {"userId": f"bench-user-{index}-{time.monotonic_ns()}", "sub": "bench", "roles": ["USER"],
+                   "exp": int(time.time()) + 3600}
+        return jwt.encode(payload, jwt_secret, algorithm="HS256")
+
+    async def status(*args, **kwargs) -> int:
+        return (await client.request(*args, **kwargs))[0]
+
+    return {
+        "health": lambda index: status("GET", "/health"),
+        "list": lambda index: status("GET", "/jobs/", query="limit=20"),
+        "get": lambda index: status("GET", f"/jobs/{job_id()}"),
+        "batch": lambda index: status("POST", "/jobs/batch", body={"ids": [job_id() for _ in range(50)]}),
+        "search": lambda index: status("GET", "/jobs/search/val", query="q=python&location=Lima&limit=10"),
+        "trending": lambda index: status("GET", "/jobs/trending", query="limit=10"),
+        "apply": lambda index: status(
+            "POST", "/jobs/apply",
+            headers={"authorization": f"Bearer {token(index)}"},
+            body={
+                "application_data": {"job_offer_id": job_id(), "applicant_name": "Bench",
+                                     "applicant_email": "bench@example.com"},
+                "profile_data": _profile(index),
+            },
+        ),
+    }
+
+
+async def run_async(jobs: int, requests: int, concurrency: int) -> Dict[str, Any]:
+    fixture = load_catalog(jobs)
+
+    # La app se importa dentro del loop: el productor de Kafka lo necesita al construirse
+    from main import app
+    from app.cache.redis_service import RedisService, get_redis_service
+    from app.middleware.auth_middleware import auth_handler
+    from app.services.job_service import kafka_producer
+
+    redis_service = RedisService(FakeRedis())
+
+    async def fake_redis_service() -> RedisService:
+        return redis_service
+
+    app.dependency_overrides[get_redis_service] = fake_redis_service
+    kafka_producer._producer = FakeAIOKafkaProducer(kafka_producer._serialize_value)
+    kafka_producer._started = True
+
+    client = AsgiClient(app)
+    scenarios = build_scenarios(client, jobs, auth_handler.token_cache.jwt_secret)
+    results = {name: await load_test(scenarios[name], requests, concurrency) for name in SCENARIOS}
+
+    metrics = {}
+    for name, result in results.items():
+        metrics[f"{name}_requests_per_second"] = result["requests_per_second"]
+        metrics[f"{name}_p95_ms"] = result["p95_ms"]
+    return {
+        "benchmark": "http_endpoints",
+        "jobs": jobs,
+        "concurrency": concurrency,
+        "fixture": fixture,
+        "scenarios": results,
+        "metrics": metrics,
+    }
+
+
+def run(jobs: int = 10000, requests: int = 2000, concurrency: int = 32) -> Dict[str, Any]:
+    if not DATABASE_CONFIGURED:
+        return {"benchmark": "http_endpoints", "skipped": SKIPPED_NO_DATABASE}
+    return asyncio.run(run_async(jobs, requests, concurrency))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--jobs", type=int, default=10000)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    args = parser.parse_args()
+    print(json.dumps(run(args.jobs, args.requests, args.concurrency), indent=2))
@@ -0,0 +1,103 @@
+# benchmarks/bench_ingestion.py
+"""
+Tasa de ingesta de eventos de trabajos contra Postgres real.
+
+- consumer: bucle completo de JobEventConsumer (getmany, coalescencia,
+  validación por lote, upsert y commit) alimentado por un consumidor de
+  Kafka en memoria, con distintos tamaños de lote.
+- save_job_to_db: el upsert de una oferta por transacción, como referencia.
+
+Requiere BENCH_DATABASE_URL (ver benchmarks/fixtures.py).
+
+Uso:
+    python -m benchmarks.bench_ingestion --events 20000 --batch-sizes 10,100,500
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+from typing import Any, Dict, List
+
+from benchmarks.fixtures import DATABASE_CONFIGURED, SKIPPED_NO_DATABASE, reset_tables
+from benchmarks.catalog import generate_job_events
+from benchmarks.fakes import FakeKafkaConsumer
+
+
+def build_event_stream(events: int, seed: int = 42) -> List[Dict[str, Any]]:
+    """Altas de `events` ofertas intercaladas con un 20% de actualizaciones y un 5% de bajas"""
+    rng = random.Random(seed)
+    stream = []
+    for index, event in enumerate(generate_job_events(events, seed)):
+        stream.append(event)
+        if index and rng.random() < 0.20:
+            target = f"job-{rng.randrange(index)}"
+            stream.append({"type": "JOB_UPDATED", "data": {"source_job_id": target, "title": f"Actualizado {index}"},
+                           "metadata": {"source": "benchmark"}})
+        if index and rng.random() < 0.05:
+            target = f"job-{rng.randrange(index)}"
+            stream.append({"type": "JOB_DELETED", "data": {"source_job_id": target}, "metadata": {"source": "benchmark"}})
+    return stream
+
+
+async def consume(stream: List[Dict[str, Any]], batch_size: int) -> float:
+    """Segundos que tarda JobEventConsumer en procesar el flujo completo"""
+    from app.event.consumers.job_event_consumer import JobEventConsumer
+
+    consumer = JobEventConsumer()
+    await consumer.consumer.stop()
+    consumer.consumer = FakeKafkaConsumer("job-events", stream, max_records=batch_size)
+    started_at = time.perf_counter()
+    try:
+        await consumer.start()
+    except asyncio.CancelledError:
+        pass
+    return time.perf_counter() - started_at
+
+
+async def save_one_by_one(events: List[Dict[str, Any]]) -> float:
+    from app.db.database import async_session
+    from app.services.job_ingestion import build_job_create
+    from app.services.job_service import save_job_to_db
+
+    started_at = time.perf_counter()
+    async with async_session() as session:
+        for event in events:
+            await save_job_to_db(build_job_create(event["data"], event["metadata"]), session)
+    return time.perf_counter() - started_at
+
+
+async def run_async(events: int, batch_sizes: List[int], single_events: int) -> Dict[str, Any]:
+    stream = build_event_stream(events)
+    result: Dict[str, Any] = {"benchmark": "ingestion", "events": len(stream), "consumer": {}, "metrics": {}}
+
+    for batch_size in batch_sizes:
+        reset_tables()
+        elapsed = await consume(stream, batch_size)
+        rate = round(len(stream) / elapsed, 1)
+        result["consumer"][str(batch_size)] = {"seconds": round(elapsed, 3), "events_per_second": rate}
+        result["metrics"][f"consumer_batch_{batch_size}_events_per_second"] = rate
+
+    reset_tables()
+    creates = generate_job_events(single_events)
+    elapsed = await save_one_by_one(creates)
+    rate = round(single_events / elapsed, 1)
+    result["save_job_to_db"] = {"events": single_events, "seconds": round(elapsed, 3), "events_per_second": rate}
+    result["metrics"]["save_job_to_db_events_per_second"] = rate
+    return result
+
+
+def run(events: int = 20000, batch_sizes: List[int] = (10, 100, 500), single_events: int = 2000) -> Dict[str, Any]:
+    if not DATABASE_CONFIGURED:
+        return {"benchmark": "ingestion", "skipped": SKIPPED_NO_DATABASE}
+    return asyncio.run(run_async(events, list(batch_sizes), single_events))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--events", type=int, default=20000)
+    parser.add_argument("--batch-sizes", default="10,100,500")
+    parser.add_argument("--single-events", type=int, default=2000)
+    args = parser.parse_args()
+    sizes = [int(size) for size in args.batch_sizes.split(",") if size.strip()]
+    print(json.dumps(run(args.events, sizes, args.single_events), indent=2))
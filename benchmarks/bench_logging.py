@@ -0,0 +1,109 @@
+# benchmarks/bench_logging.py
+"""
+Costo de logging por solicitud de /jobs/apply: patrón anterior vs actual.
+
+- Anterior: print() de los datos de la solicitud, f-strings evaluados siempre
+  (incluido el volcado completo de la caché de sesiones y del evento) e INFO
+  por cada evento enviado.
+- Actual: argumentos `%s` perezosos, contenido solo en DEBUG y el INFO por
+  evento limitado por SampledLogger.
+
+Los registros se formatean con el handler de configure_logging y se escriben
+en un stream descartable, para medir solo el costo del lado de la aplicación.
+
+Uso:
+    python -m benchmarks.bench_logging --requests 20000 --sessions 1000
+"""
+import argparse
+import contextlib
+import io
+import json
+import logging
+import time
+from typing import Dict, Any, Callable
+
+from app.core.logging_config import configure_logging, get_sampled_logger
+from app.middleware.auth_middleware import TokenCache
+from benchmarks.catalog import generate_job_events
+
+legacy_logger = logging.getLogger("benchmarks.legacy")
+current_logger = logging.getLogger("benchmarks.current")
+current_send_logger = get_sampled_logger("benchmarks.current.producer")
+
+
+def build_fixture(sessions: int) -> Dict[str, Any]:
+    cache = TokenCache()
+    for index in range(sessions):
+        cache.add_user_session(f"user-{index}", {"username": f"user{index}", "roles": ["USER"], "courseIds": []})
+    job = generate_job_events(1)[0]["data"]
+    profile = {"first_name": "Ana", "last_name": "Pérez", "skills": job["requirements"], "experiences": [{}] * 5}
+    event = {"type": "job-application-created", "data": {"profile": profile, "job_offer": job}, "metadata": {}}
+    return {"cache": cache, "user_id": "user-1", "profile": profile, "job": job, "event": event}
+
+
+def legacy_request(fixture: Dict[str, Any]):
+    cache, user_id, event = fixture["cache"], fixture["user_id"], fixture["event"]
+    # apply_to_job
+    print(f"user_id: {user_id}")
+    print(f"application_data: {fixture['job']['source_job_id']}")
+    print(f"profile_data: {fixture['profile']}")
+    # TokenCache.get_user_session
+    legacy_logger.info(f"Obteniendo sesión de usuario {user_id} desde la caché")
+    legacy_logger.info(f"Cache: {cache._cache}")
+    # KafkaProducer.send_event
+    legacy_logger.debug(f"Attempting to send event to topic job-events: {event}")
+    legacy_logger.info(f"Successfully sent event type '{event.get('type')}' to topic job-events")
+    legacy_logger.debug(f"Event details: {event}")
+    # create_application
+    legacy_logger.info(f"Evento enviado al tópico 'job-events': {event}")
+
+
+def current_request(fixture: Dict[str, Any]):
+    cache, user_id, event = fixture["cache"], fixture["user_id"], fixture["event"]
+    current_logger.debug("Usuario %s aplica a la oferta %s", user_id, fixture["job"]["source_job_id"])
+    cache.get_user_session(user_id)
+    current_send_logger.debug("Attempting to send event to topic %s: %s", "job-events", event)
+    current_send_logger.info("Successfully sent event type '%s' to topic %s", event.get("type"), "job-events")
+    current_logger.info("Evento %s enviado al tópico 'job-events' (aplicación %s)", event["type"], "app-1")
+
+
+def measure(function: Callable[[Dict[str, Any]], None], fixture: Dict[str, Any], requests: int) -> float:
+    """Microsegundos por solicitud"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        started_at = time.perf_counter()
+        for _ in range(requests):
+            function(fixture)
+        elapsed = time.perf_counter() - started_at
+    return round(elapsed / requests * 1e6, 3)
+
+
+def run(requests: int = 20000, sessions: int = 1000) -> Dict[str, Any]:
+    configure_logging(force=True)
+    # Los registros se formatean completos pero se descartan al escribir
+    logging.getLogger().handlers[0].setStream(io.StringIO())
+    stream = logging.getLogger().handlers[0].stream
+    fixture = build_fixture(sessions)
+
+    results = {}
+    for level_name in ("INFO", "WARNING"):
+        logging.getLogger().setLevel(level_name)
+        results[level_name] = {
+            "legacy_us": measure(legacy_request, fixture, requests),
+            "current_us": measure(current_request, fixture, requests),
+        }
+        stream.seek(0)
+        stream.truncate()
+    metrics = {
+        f"{level_name.lower()}_{variant}": value
+        for level_name, values in results.items() for variant, value in values.items()
+    }
+    return {"benchmark": "logging_overhead", "requests": requests, "sessions_in_cache": sessions,
+            "per_request_by_level": results, "metrics": metrics}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--sessions", type=int, default=1000)
+    args = parser.parse_args()
+    print(json.dumps(run(args.requests, args.sessions), indent=2))
@@ -0,0 +1,105 @@
+# benchmarks/bench_read_model.py
+"""
+Modelo de lectura en memoria: tiempo de construcción, memoria por oferta y
+latencia de búsqueda (filtros vectorizados y, con --facets, conteos por
+faceta; sin hidratar la página) y de recomendación por skills.
+
+Por defecto cada título lleva el número de oferta, para que el diccionario
+de títulos tenga tantas entradas como ofertas (el peor caso para `q`).
+
+Uso:
+    python -m benchmarks.bench_read_model --jobs 100000 --queries 2000
+"""
+import argparse
+import json
+import random
+import time
+from typing import Any, Dict, List, Optional
+
+from benchmarks import fixtures  # noqa: F401  (configura LOG_LEVEL antes de importar app)
+from benchmarks.asgi import percentile
+from benchmarks.catalog import iter_job_events
+from app.services.job_ingestion import JOB_COLUMNS, validate_job_batch
+from app.services.job_read_model import JobReadModel
+
+QUERIES = [
+    {"q": "developer"},
+    {"q": "data", "location": "lima"},
+    {"location": "perú", "is_remote": True},
+    {"q": "senior", "job_type": "FULL_TIME", "level": "SENIOR"},
+    {"q": "no existe"},
+    {},
+]
+PROFILES = [
+    ["python", "sql", "docker"],
+    ["java", "spring", "kafka", "kubernetes", "aws"],
+    ["React", "TypeScript", "git"],
+    ["excel", "scrum"],
+]
+
+
+def build_rows(jobs: int, unique_titles: bool) -> List[Dict[str, Any]]:
+    rows = []
+    for index, event in enumerate(iter_job_events(jobs)):
+        if unique_titles:
+            event["data"]["title"] = f"{event['data']['title']} {index}"
+        rows.append(event)
+    return [dict(zip(JOB_COLUMNS, row)) for row in validate_job_batch(rows).rows]
+
+
+def run(jobs: int = 100000, queries: int = 2000, unique_titles: bool = True,
+        facet_limit: Optional[int] = None) -> Dict[str, Any]:
+    rows = build_rows(jobs, unique_titles)
+
+    started_at = time.perf_counter()
+    model = JobReadModel.from_rows(rows)
+    build_seconds = time.perf_counter() - started_at
+    stats = model.stats()
+
+    rng = random.Random(7)
+    latencies: Dict[str, List[float]] = {json.dumps(query, sort_keys=True): [] for query in QUERIES}
+    for _ in range(queries):
+        query = rng.choice(QUERIES)
+        started_at = time.perf_counter()
+        model.search(**query, limit=20, facet_limit=facet_limit)
+        latencies[json.dumps(query, sort_keys=True)].append((time.perf_counter() - started_at) * 1000)
+
+    all_latencies = sorted(value for values in latencies.values() for value in values)
+
+    recommend_latencies = []
+    for _ in range(queries):
+        skills = rng.choice(PROFILES)
+        started_at = time.perf_counter()
+        model.recommend(skills, k=20)
+        recommend_latencies.append((time.perf_counter() - started_at) * 1000)
+    recommend_latencies.sort()
+    return {
+        "benchmark": "read_model",
+        "jobs": jobs,
+        "unique_titles": unique_titles,
+        "facet_limit": facet_limit,
+        "stats": stats,
+        "queries": {
+            query: {"p50_ms": round(percentile(sorted(values), 0.50), 4),
+                    "p95_ms": round(percentile(sorted(values), 0.95), 4)}
+            for query, values in latencies.items() if values
+        },
+        "metrics": {
+            "build_seconds": round(build_seconds, 3),
+            "bytes_per_job": stats["bytes_per_job"],
+            "search_p50_ms": round(percentile(all_latencies, 0.50), 4),
+            "search_p95_ms": round(percentile(all_latencies, 0.95), 4),
+            "recommend_p50_ms": round(percentile(recommend_latencies, 0.50), 4),
+            "recommend_p95_ms": round(percentile(recommend_latencies, 0.95), 4),
+        },
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--jobs", type=int, default=100000)
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--shared-titles", action="store_true", help="Títulos repetidos del catálogo base")
+    parser.add_argument("--facets", type=int, default=None, help="Calcula facetas con este límite por faceta")
+    args = parser.parse_args()
+    print(json.dumps(run(args.jobs, args.queries, not args.shared_titles, args.facets), indent=2))
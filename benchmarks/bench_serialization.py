@@ -0,0 +1,80 @@
+# benchmarks/bench_serialization.py
+"""
+Costo de serializar respuestas de ofertas (response_model=List[Job] y
+SearchResponse) a partir de objetos JobOffer del ORM, por tamaño de página.
+
+Las rutas devuelven objetos ya construidos en memoria: lo medido es FastAPI
+(validación del response_model y render JSON), sin base de datos.
+
+Uso:
+    python -m benchmarks.bench_serialization --sizes 10,100,1000 --requests 500
+"""
+import argparse
+import asyncio
+import json
+from typing import Any, Dict, List
+
+from fastapi import FastAPI
+
+from benchmarks import fixtures  # noqa: F401  (configura LOG_LEVEL antes de importar app)
+from benchmarks.asgi import AsgiClient, load_test
+from benchmarks.catalog import generate_job_events
+from app.model.models import JobOffer
+from app.model.schemas import Job, SearchResponse
+from app.services.job_ingestion import JOB_COLUMNS, validate_job_batch
+
+
+def build_offers(count: int) -> List[JobOffer]:
+    rows = validate_job_batch(generate_job_events(count)).rows
+    return [JobOffer(**dict(zip(JOB_COLUMNS, row))) for row in rows]
+
+
+def build_app(offers: List[JobOffer]) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/list/{size}", response_model=List[Job])
+    async def list_route(size: int):
+        return offers[:size]
+
+    @app.get("/search/{size}", response_model=SearchResponse)
+    async def search_route(size: int):
+        # Misma forma que devuelve job_service.search_jobs
+        return {"jobs": offers[:size], "total": len(offers), "page": 1,
+                "totalPages": (len(offers) + size - 1) // size}
+
+    return app
+
+
+async def run_async(sizes: List[int], requests: int) -> Dict[str, Any]:
+    offers = build_offers(max(sizes))
+    client = AsgiClient(build_app(offers))
+    result: Dict[str, Any] = {"benchmark": "serialization", "requests": requests, "pages": {}, "metrics": {}}
+
+    for size in sizes:
+        status, body = await client.request("GET", f"/list/{size}")
+        if status != 200:
+            raise RuntimeError(f"/list/{size} respondió {status}: {body[:200]!r}")
+        page = {"response_bytes": len(body)}
+        for route in ("list", "search"):
+            async def send_request(index: int, route=route, size=size) -> int:
+                return (await client.request("GET", f"/{route}/{size}"))[0]
+
+            stats = await load_test(send_request, requests, concurrency=1, warmup=10)
+            per_job_us = 1e6 / stats["requests_per_second"] / size
+            page[route] = {**stats, "per_job_us": round(per_job_us, 3)}
+            result["metrics"][f"{route}_{size}_per_job_us"] = round(per_job_us, 3)
+        result["pages"][str(size)] = page
+    return result
+
+
+def run(sizes: List[int] = (10, 100, 1000), requests: int = 500) -> Dict[str, Any]:
+    return asyncio.run(run_async(list(sizes), requests))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", default="10,100,1000")
+    parser.add_argument("--requests", type=int, default=500)
+    args = parser.parse_args()
+    sizes = [int(size) for size in args.sizes.split(",") if size.strip()]
+    print(json.dumps(run(sizes, args.requests), indent=2))
@@ -0,0 +1,84 @@
+# benchmarks/bench_similar_jobs.py
+"""
+Ofertas similares: tiempo de construcción del índice, recall de los vecinos
+aproximados frente al top-k exacto y razón entre sus similitudes medias (en
+una muestra), y latencia de enlazar un lote de ofertas nuevas contra todo el
+índice.
+
+El catálogo sintético repite plantillas de descripción: hay muchos empates
+cerca del k-ésimo vecino, así que el recall estricto subestima la calidad.
+
+Uso:
+    python -m benchmarks.bench_similar_jobs --jobs 100000
+"""
+import argparse
+import json
+import time
+from typing import Any, Dict, List
+
+import numpy as np
+
+from benchmarks import fixtures  # noqa: F401  (configura LOG_LEVEL antes de importar app)
+from benchmarks.catalog import iter_job_events
+from app.services.similar_jobs import build_index, job_terms
+
+TEXT_FIELDS = ("title", "description", "requirements")
+
+
+def build_rows(jobs: int, seed: int = 42, prefix: str = "job") -> List[Dict[str, Any]]:
+    return [
+        {"id": f"{prefix}-{index}", **{field: event["data"][field] for field in TEXT_FIELDS}}
+        for index, event in enumerate(iter_job_events(jobs, seed))
+    ]
+
+
+def run(jobs: int = 100000, sample: int = 500, link_batch: int = 100) -> Dict[str, Any]:
+    rows = build_rows(jobs)
+
+    started_at = time.perf_counter()
+    index = build_index(lambda: iter(rows))
+    build_seconds = time.perf_counter() - started_at
+
+    # Recall: vecinos encontrados con similitud al menos igual a la del k-ésimo exacto
+    rng = np.random.default_rng(7)
+    sample_rows = rng.choice(index.size, min(sample, index.size), replace=False)
+    vectors = index.vectors[:index.size]
+    similarity = vectors[sample_rows] @ vectors.T
+    similarity[np.arange(sample_rows.size), sample_rows] = -np.inf
+    kth = np.sort(similarity, axis=1)[:, -index.k]
+    recall = float(np.mean(index.neighbor_scores[sample_rows] >= kth[:, None] - 1e-5))
+    # Calidad: similitud media de los vecinos encontrados frente a la de los exactos
+    found = np.where(np.isinf(index.neighbor_scores[sample_rows]), 0, index.neighbor_scores[sample_rows])
+    exact = np.sort(similarity, axis=1)[:, -index.k:]
+    quality = float(np.mean(found.mean(axis=1) / np.maximum(exact.mean(axis=1), 1e-9)))
+
+    new_rows = build_rows(link_batch, seed=43, prefix="new")
+    started_at = time.perf_counter()
+    added = index.add([row["id"] for row in new_rows],
+                      [job_terms(row["title"], row["description"], row["requirements"]) for row in new_rows])
+    changed = index.link(added)
+    link_ms = (time.perf_counter() - started_at) * 1000
+
+    return {
+        "benchmark": "similar_jobs",
+        "jobs": jobs,
+        "k": index.k,
+        "metrics": {
+            "build_seconds": round(build_seconds, 3),
+            "memory_mb": round(index.memory_bytes() / 1e6, 1),
+            "recall_at_k": round(recall, 3),
+            "similarity_ratio": round(quality, 3),
+            "link_batch": link_batch,
+            "link_ms": round(link_ms, 2),
+            "lists_changed": len(changed),
+        },
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--jobs", type=int, default=100000)
+    parser.add_argument("--sample", type=int, default=500)
+    parser.add_argument("--link-batch", type=int, default=100)
+    args = parser.parse_args()
+    print(json.dumps(run(args.jobs, args.sample, args.link_batch), indent=2))
@@ -0,0 +1,55 @@
+# benchmarks/catalog.py
+"""Generadores deterministas de ofertas y eventos sintéticos para los benchmarks."""
+import random
+from typing import Dict, Any, Iterator, List
+
+TITLES = [
+    "Backend Developer", "Frontend Developer", "Data Engineer", "Data Scientist", "DevOps Engineer",
+    "QA Analyst", "Product Manager", "Mobile Developer", "Analista de Sistemas", "Soporte TI",
+]
+SENIORITY = ["Junior", "Semi Senior", "Senior", "Lead"]
+COMPANIES = [f"Empresa {index}" for index in range(500)]
+LOCATIONS = [
+    "Lima, Perú", "Lima - PE", "Arequipa, Perú", "Trujillo, Perú", "Cusco, Perú",
+    "Remoto", "Bogotá, Colombia", "Santiago, Chile", "Ciudad de México, México", "Buenos Aires, Argentina",
+]
+SKILLS = [
+    "python", "java", "javascript", "typescript", "sql", "postgresql", "docker", "kubernetes", "aws",
+    "react", "angular", "fastapi", "django", "spring", "kafka", "redis", "git", "linux", "excel", "scrum",
+]
+JOB_TYPES = ["FULL_TIME", "PART_TIME", "CONTRACT", "NOT_SPECIFIED"]
+LEVELS = ["JUNIOR", "MID", "SENIOR", "NOT_SPECIFIED"]
+SALARIES = [None, "S/ 3,000 - 4,500 mensual", "USD 2000-3000", "S/ 5000", "A convenir", "$40k - $60k al año"]
+
+
+def generate_job_data(index: int, rng: random.Random) -> Dict[str, Any]:
+    """Datos de una oferta con la forma que publica el scraper"""
+    title = f"{rng.choice(TITLES)} {rng.choice(SENIORITY)}"
+    return {
+        "source_job_id": f"job-{index}",
+        "title": title,
+        "company": rng.choice(COMPANIES),
+        "description": f"Buscamos {title} para proyecto {index}. " * rng.randint(1, 6),
+        "requirements": rng.sample(SKILLS, rng.randint(2, 7)),
+        "location": rng.choice(LOCATIONS),
+        "salary_range": rng.choice(SALARIES),
+        "job_type": rng.choice(JOB_TYPES),
+        "level": rng.choice(LEVELS),
+        "is_remote": rng.random() < 0.3,
+        "source_url": f"https://example.com/jobs/{index}",
+    }
+
+
+def generate_job_events(count: int, seed: int = 42, event_type: str = "JOB_CREATED") -> List[Dict[str, Any]]:
+    """Lista de `count` eventos de trabajos reproducibles para una semilla"""
+    return list(iter_job_events(count, seed, event_type))
+
+
+def iter_job_events(count: int, seed: int = 42, event_type: str = "JOB_CREATED") -> Iterator[Dict[str, Any]]:
+    rng = random.Random(seed)
+    for index in range(count):
+        yield {
+            "type": event_type,
+            "data": generate_job_data(index, rng),
+            "metadata": {"source": "benchmark", "processed_at": "2024-01-01T00:00:00"},
+        }
@@ -0,0 +1,71 @@
+# benchmarks/compare.py
+"""
+Compara dos reportes de benchmarks.run y marca las regresiones.
+
+Cada benchmark publica sus valores comparables en "metrics". Las métricas
+terminadas en `_per_second` y `speedup` son mejores cuanto más altas; el
+resto (tiempos y latencias) cuanto más bajas.
+
+Uso:
+    python -m benchmarks.compare base.json head.json --threshold 0.10
+Sale con código 1 si alguna métrica empeora más que el umbral.
+"""
+import argparse
+import json
+import sys
+from typing import Any, Dict, List, Tuple
+
+
+def higher_is_better(metric: str) -> bool:
+    return metric.endswith("_per_second") or metric == "speedup"
+
+
+def compare(base: Dict[str, Any], head: Dict[str, Any], threshold: float) -> Tuple[List[tuple], int]:
+    """Filas (benchmark, métrica, base, head, cambio relativo, estado) y número de regresiones"""
+    rows = []
+    regressions = 0
+    for name, head_result in head.get("results", {}).items():
+        base_metrics = base.get("results", {}).get(name, {}).get("metrics", {})
+        for metric, head_value in head_result.get("metrics", {}).items():
+            base_value = base_metrics.get(metric)
+            if not isinstance(base_value, (int, float)) or not base_value:
+                rows.append((name, metric, base_value, head_value, None, "nuevo"))
+                continue
+            change = (head_value - base_value) / base_value
+            # Positivo = mejora, independiente de la dirección de la métrica
+            improvement = change if higher_is_better(metric) else -change
+            if improvement < -threshold:
+                status = "REGRESIÓN"
+                regressions += 1
+            elif improvement > threshold:
+                status = "mejora"
+            else:
+                status = "="
+            rows.append((name, metric, base_value, head_value, change, status))
+    return rows, regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("base")
+    parser.add_argument("head")
+    parser.add_argument("--threshold", type=float, default=0.10, help="Cambio relativo tolerado (0.10 = 10%%)")
+    args = parser.parse_args(argv)
+
+    with open(args.base, encoding="utf-8") as file:
+        base = json.load(file)
+    with open(args.head, encoding="utf-8") as file:
+        head = json.load(file)
+
+    rows, regressions = compare(base, head, args.threshold)
+    print(f"base {base['meta']['commit'][:10]}  ->  head {head['meta']['commit'][:10]}")
+    for name, metric, base_value, head_value, change, status in rows:
+        change_text = "" if change is None else f"{change:+.1%}"
+        print(f"{name:16} {metric:44} {base_value!s:>12} {head_value!s:>12} {change_text:>8}  {status}")
+    if regressions:
+        print(f"{regressions} métricas empeoraron más de {args.threshold:.0%}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
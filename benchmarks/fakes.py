@@ -0,0 +1,205 @@
+# benchmarks/fakes.py
+"""
+Transportes en memoria para los benchmarks: sustituyen a Redis y Kafka con la
+misma interfaz asíncrona que usa la aplicación, para medir el código propio
+sin depender de la red ni de servicios externos.
+"""
+import asyncio
+import json
+import time
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List, Optional
+
+from aiokafka.structs import ConsumerRecord, TopicPartition
+
+
+class FakeRedis:
+    """Subconjunto de redis.asyncio.Redis que usa RedisService (valores ya decodificados)"""
+
+    def __init__(self):
+        self._values: Dict[str, Any] = {}
+        self._expires_at: Dict[str, float] = {}
+        self._sets: Dict[str, set] = defaultdict(set)
+        self._zsets: Dict[str, Dict[str, float]] = defaultdict(dict)
+        self.commands = 0
+
+    def _alive(self, name: str) -> bool:
+        expires_at = self._expires_at.get(name)
+        if expires_at is not None and expires_at <= time.monotonic():
+            self._values.pop(name, None)
+            self._sets.pop(name, None)
+            self._expires_at.pop(name, None)
+            return False
+        return name in self._values or name in self._sets or name in self._zsets
+
+    async def get(self, name: str) -> Optional[str]:
+        self.commands += 1
+        return self._values.get(name) if self._alive(name) else None
+
+    async def set(self, name: str, value: Any, ex: Optional[int] = None, nx: bool = False):
+        self.commands += 1
+        if nx and self._alive(name):
+            return None
+        self._values[name] = value if isinstance(value, str) else str(value)
+        if ex:
+            self._expires_at[name] = time.monotonic() + ex
+        return True
+
+    async def mget(self, keys: Iterable[str]) -> List[Optional[str]]:
+        self.commands += 1
+        return [self._values.get(key) if self._alive(key) else None for key in keys]
+
+    async def exists(self, *names: str) -> int:
+        self.commands += 1
+        return sum(1 for name in names if self._alive(name))
+
+    async def delete(self, *names: str) -> int:
+        self.commands += 1
+        removed = 0
+        for name in names:
+            removed += int(self._alive(name))
+            self._values.pop(name, None)
+            self._sets.pop(name, None)
+            self._zsets.pop(name, None)
+        return removed
+
+    async def expire(self, name: str, seconds: int) -> bool:
+        self.commands += 1
+        self._expires_at[name] = time.monotonic() + seconds
+        return True
+
+    async def sadd(self, name: str, *values: str) -> int:
+        self.commands += 1
+        before = len(self._sets[name])
+        self._sets[name].update(values)
+        return len(self._sets[name]) - before
+
+    async def sismember(self, name: str, value: str) -> bool:
+        self.commands += 1
+        return self._alive(name) and value in self._sets.get(name, ())
+
+    async def zincrby(self, name: str, amount: float, value: str) -> float:
+        self.commands += 1
+        self._zsets[name][value] = self._zsets[name].get(value, 0) + amount
+        return self._zsets[name][value]
+
+    async def zadd(self, name: str, mapping: Dict[str, float]) -> int:
+        self.commands += 1
+        added = len(set(mapping) - set(self._zsets[name]))
+        self._zsets[name].update(mapping)
+        return added
+
+    async def zrevrange(self, name: str, start: int, end: int) -> List[str]:
+        self.commands += 1
+        ranking = sorted(self._zsets.get(name, {}).items(), key=lambda item: (-item[1], item[0]))
+        stop = None if end == -1 else end + 1
+        return [member for member, _ in ranking[start:stop]]
+
+    async def zremrangebyrank(self, name: str, start: int, end: int) -> int:
+        self.commands += 1
+        ranking = sorted(self._zsets.get(name, {}).items(), key=lambda item: (item[1], item[0]))
+        stop = None if end == -1 else end + 1
+        removed = [member for member, _ in ranking[start:stop]]
+        for member in removed:
+            del self._zsets[name][member]
+        return len(removed)
+
+    async def publish(self, channel: str, message: str) -> int:
+        self.commands += 1
+        return 0
+
+    def pipeline(self, transaction: bool = True) -> "FakePipeline":
+        return FakePipeline(self)
+
+
+class FakePipeline:
+    """Encola comandos y los ejecuta en orden con execute()"""
+
+    def __init__(self, redis: FakeRedis):
+        self._redis = redis
+        self._commands: List[tuple] = []
+
+    def __getattr__(self, name: str):
+        command = getattr(self._redis, name)
+
+        def queue(*args, **kwargs):
+            self._commands.append((command, args, kwargs))
+            return self
+
+        return queue
+
+    async def execute(self, raise_on_error: bool = True) -> List[Any]:
+        commands, self._commands = self._commands, []
+        return [await command(*args, **kwargs) for command, args, kwargs in commands]
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        self._commands = []
+
+
+class FakeAIOKafkaProducer:
+    """Sustituto de AIOKafkaProducer: serializa como el real y guarda los mensajes"""
+
+    def __init__(self, value_serializer=None, latency: float = 0.0):
+        self.value_serializer = value_serializer or (lambda value: json.dumps(value).encode("utf-8"))
+        self.latency = latency
+        self.sent: List[tuple] = []
+
+    async def start(self):
+        pass
+
+    async def stop(self):
+        pass
+
+    async def send_and_wait(self, topic: str, value: Any = None, key: Any = None, headers=None, **kwargs):
+        payload = self.value_serializer(value)
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        self.sent.append((topic, payload, headers))
+
+
+class FakeKafkaConsumer:
+    """
+    Sustituto de AIOKafkaConsumer alimentado con valores ya deserializados.
+    getmany() entrega lotes de hasta `max_records`; al agotarse cancela el
+    bucle del consumidor con CancelledError, que atraviesa sus `except Exception`.
+    """
+
+    def __init__(self, topic: str, values: List[Any], max_records: int = 10, headers=None):
+        self.partition = TopicPartition(topic, 0)
+        self.max_records = max_records
+        self._records = [
+            ConsumerRecord(topic, 0, offset, 0, 0, None, value, None, 0, len(str(value)), headers or [])
+            for offset, value in enumerate(values)
+        ]
+        self._position = 0
+        self.committed = 0
+
+    async def start(self):
+        pass
+
+    async def stop(self):
+        pass
+
+    async def getmany(self, *partitions, timeout_ms: int = 0, max_records: Optional[int] = None):
+        if self._position >= len(self._records):
+            raise asyncio.CancelledError()
+        size = max_records or self.max_records
+        batch = self._records[self._position:self._position + size]
+        self._position += len(batch)
+        return {self.partition: batch}
+
+    async def commit(self, offsets=None):
+        self.committed = self._position
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if self._position >= len(self._records):
+            raise asyncio.CancelledError()
+        record = self._records[self._position]
+        self._position += 1
+        return record
@@ -0,0 +1,123 @@
+# benchmarks/run.py
+"""
+Ejecuta la suite de benchmarks y guarda un único JSON por corrida, con el
+commit y los parámetros, para comparar entre commits con benchmarks.compare.
+
+Los benchmarks que necesitan Postgres se marcan como omitidos si no hay
+BENCH_DATABASE_URL.
+
+Uso:
+    python -m benchmarks.run --jobs 100000 --output bench-results/$(git rev-parse --short HEAD).json
+    python -m benchmarks.run --only auth,serialization
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict
+
+from benchmarks import fixtures
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "HEAD"], stderr=subprocess.DEVNULL, text=True).strip()
+    except Exception:
+        return "desconocido"
+
+
+def build_suite(args) -> Dict[str, Callable[[], Dict[str, Any]]]:
+    # Importación diferida: cada benchmark carga la app solo si se ejecuta
+    def job_validation():
+        from benchmarks import bench_job_validation
+        return bench_job_validation.run(min(args.jobs, 50000), repeat=3)
+
+    def logging_overhead():
+        from benchmarks import bench_logging
+        return bench_logging.run(args.requests)
+
+    def auth():
+        from benchmarks import bench_auth
+        return bench_auth.run(args.requests)
+
+    def serialization():
+        from benchmarks import bench_serialization
+        return bench_serialization.run(requests=max(args.requests // 10, 50))
+
+    def ingestion():
+        from benchmarks import bench_ingestion
+        return bench_ingestion.run(events=min(args.jobs, 100000))
+
+    def read_model():
+        from benchmarks import bench_read_model
+        return bench_read_model.run(min(args.jobs, 1000000), args.requests)
+
+    def similar_jobs():
+        from benchmarks import bench_similar_jobs
+        return bench_similar_jobs.run(min(args.jobs, 1000000))
+
+    def http():
+        from benchmarks import bench_http
+        return bench_http.run(args.jobs, args.requests, args.concurrency)
+
+    return {
+        "job_validation": job_validation,
+        "logging": logging_overhead,
+        "auth": auth,
+        "serialization": serialization,
+        "ingestion": ingestion,
+        "read_model": read_model,
+        "similar_jobs": similar_jobs,
+        "http": http,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--jobs", type=int, default=10000, help="Ofertas del catálogo sintético (10k a 1M)")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--only", default="", help="Lista separada por comas de benchmarks a ejecutar")
+    parser.add_argument("--output", help="Archivo JSON de resultados (por defecto stdout)")
+    args = parser.parse_args(argv)
+
+    suite = build_suite(args)
+    selected = [name.strip() for name in args.only.split(",") if name.strip()] or list(suite)
+    unknown = set(selected) - set(suite)
+    if unknown:
+        parser.error(f"Benchmarks desconocidos: {', '.join(sorted(unknown))}")
+
+    report: Dict[str, Any] = {
+        "meta": {
+            "commit": _git_commit(),
+            "started_at": datetime.now(timezone.utc).isoformat(),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "database": fixtures.DATABASE_CONFIGURED,
+            "params": {"jobs": args.jobs, "requests": args.requests, "concurrency": args.concurrency},
+        },
+        "results": {},
+    }
+    for name in selected:
+        print(f"[bench] {name}...", file=sys.stderr)
+        started_at = time.perf_counter()
+        result = suite[name]()
+        result["duration_seconds"] = round(time.perf_counter() - started_at, 3)
+        report["results"][name] = result
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+        with open(args.output, "w", encoding="utf-8") as file:
+            file.write(output + "\n")
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,19 +1,37 @@
+import time
+
+# Inicio del import del worker, para medir el tiempo de arranque
+_import_started_at = time.perf_counter()
+
 from fastapi import FastAPI
+from fastapi.responses import JSONResponse, PlainTextResponse
 
 import asyncio
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.api.v1.endpoints import jobs
 from app.cache.redis_service import get_redis_service
-from app.core.datastore.redis_connector import redis_connector
-from app.db.database import init_db
+from app.core.datastore.redis_connector import redis_connector, get_redis_connection
+from app.core.logging_config import configure_logging
+from app.core.readiness import readiness, initialize, supervise
+from app.core.tracing import configure_tracing, shutdown_tracing
+from app.core.metrics import METRICS_ENABLED, METRICS_PATH, MetricsMiddleware, instrument_sqlalchemy, registry
+from app.db.database import prepare_database
 from app.event.consumers.auth_event_consumer import AuthEventConsumer
 from app.event.consumers.job_event_consumer import JobEventConsumer
 import logging
+import os
+
+from app.services import job_service
+from app.services.job_service import READ_MODEL_ENABLED, kafka_producer
+from app.services.job_stream import JOB_STREAM_ENABLED
+from app.services.job_sweeper import JobSweeper
 
-from app.services.job_service import kafka_producer
+configure_logging()
+configure_tracing()
 
-app = FastAPI()
+# Spans HTTP nativos de FastAPI (solo si hay TracerProvider); las métricas van por /metrics
+app = FastAPI(telemetry={"metrics": False, "logs": False})
 
 # CORS middleware
 app.add_middleware(
@@ -24,13 +42,16 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Métricas por ruta (se agrega al final para envolver también a CORS)
+if METRICS_ENABLED:
+    instrument_sqlalchemy()
+    app.add_middleware(MetricsMiddleware)
+
 app.include_router(
     jobs.router
 )
 
-# Inicializa la base de datos
-init_db()
-
+readiness.record_timing("import", time.perf_counter() - _import_started_at)
 
 # Health check endpoint
 @app.get("/health")
@@ -42,39 +63,112 @@ async def health_check():
     }
 
 
+# Readiness probe: 200 solo cuando base, Redis, Kafka, consumidores y caché están listos
+@app.get("/ready")
+async def readiness_check():
+    snapshot = readiness.snapshot()
+    return JSONResponse(snapshot, status_code=200 if snapshot["status"] == "ready" else 503)
+
+
+if METRICS_ENABLED:
+    @app.get(METRICS_PATH, include_in_schema=False)
+    async def metrics():
+        """Métricas del worker en formato de texto de Prometheus"""
+        return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+
+
+async def init_redis():
+    """Crea el pool de Redis y abre su primera conexión"""
+    await redis_connector.init_redis_pool()
+    redis = await get_redis_connection()
+    await redis.ping()
+
+
+async def run_auth_consumer():
+    consumer = AuthEventConsumer(await get_redis_service())
+    await consumer.start()
+
+
+async def run_job_consumer():
+    # No consume hasta que el esquema exista
+    await readiness.wait("database")
+    await JobEventConsumer(await get_redis_service()).start()
+
+
+async def run_read_model():
+    # Solo con READ_MODEL_ENABLED: importa NumPy
+    from app.event.consumers.job_projection_consumer import JobProjectionConsumer
+
+    await readiness.wait("database")
+    await JobProjectionConsumer().start()
+
+
+async def run_job_stream():
+    from app.services.job_stream import hub
+
+    await readiness.wait("redis")
+    await hub.listen(await get_redis_connection())
+
+
+async def run_job_sweeper():
+    await JobSweeper(redis_service=await get_redis_service()).start()
+
+
+async def warm_cache():
+    await readiness.wait("database")
+    await readiness.wait("redis")
+    await job_service.warm_cache(await get_redis_service())
+
+
 @app.on_event("startup")
 async def startup_event():
     """
     Evento de inicio de la aplicación.
-    - Inicializa la conexión a Redis.
-    - Crea la tarea asíncrona para el consumidor de eventos.
+    Las dependencias se inicializan en segundo plano y en paralelo, con
+    reintentos; el worker acepta conexiones de inmediato y /ready indica
+    cuándo puede recibir tráfico.
+    - Base de datos (esquema según DB_INIT_ON_STARTUP y pools calientes),
+      Redis y productor de Kafka.
+    - Consumidores de eventos (el de trabajos espera a la base).
+    - Modelo de lectura en memoria, si READ_MODEL_ENABLED.
+    - Difusión de ofertas nuevas a /jobs/stream por Redis pub/sub, si JOB_STREAM_ENABLED.
+    - Precarga de la caché de tendencias.
+    - Programa el barrido periódico de ofertas vencidas.
     """
-    # Inicializar el pool de conexiones Redis
-    await redis_connector.init_redis_pool()
-
-    # Inicializar el productor de Kafka
-    try:
-        await kafka_producer.start()
-        logging.info("Kafka producer started successfully.")
-    except Exception as e:
-        logging.error(f"Error initializing Kafka producer: {str(e)}")
-        raise
-
-    # Instanciar los consumidores de eventos
-    auth_consumer = AuthEventConsumer(await get_redis_service())
-    job_consumer = JobEventConsumer()
+    hook_started_at = time.perf_counter()
+    for name in ("database", "redis", "kafka_producer", "auth_consumer", "job_consumer", "cache"):
+        readiness.register(name)
+
+    app.state.startup_tasks = [
+        asyncio.create_task(initialize("database", prepare_database)),
+        asyncio.create_task(initialize("redis", init_redis)),
+        asyncio.create_task(initialize("kafka_producer", kafka_producer.start)),
+        asyncio.create_task(initialize("cache", warm_cache)),
+    ]
 
-    # Crear las tareas asíncronas para que los consumidores empiecen a escuchar
-    # y almacenarlas en el estado de la aplicación
+    # Los consumidores se reinician si se caen; cada uno se marca listo al unirse a su grupo
     app.state.consumer_tasks = [
-        asyncio.create_task(auth_consumer.start()),
-        asyncio.create_task(job_consumer.start())
+        asyncio.create_task(supervise("auth_consumer", run_auth_consumer)),
+        asyncio.create_task(supervise("job_consumer", run_job_consumer)),
     ]
+    if READ_MODEL_ENABLED:
+        readiness.register("read_model")
+        app.state.consumer_tasks.append(asyncio.create_task(supervise("read_model", run_read_model)))
+    if JOB_STREAM_ENABLED:
+        # No bloquea /ready: sin Redis el resto de la API sigue sirviendo
+        readiness.register("job_stream", required=False)
+        app.state.consumer_tasks.append(asyncio.create_task(supervise("job_stream", run_job_stream)))
+
+    # Barrido de ofertas vencidas y archivado (seguro con varios workers por SKIP LOCKED)
+    if os.getenv("JOB_SWEEPER_ENABLED", "true").lower() == "true":
+        app.state.consumer_tasks.append(asyncio.create_task(run_job_sweeper()))
 
     # Agregar manejador de errores para las tareas
-    for task in app.state.consumer_tasks:
+    for task in app.state.startup_tasks + app.state.consumer_tasks:
         task.add_done_callback(lambda t: handle_consumer_task_result(t))
 
+    readiness.record_timing("startup_hook", time.perf_counter() - hook_started_at)
+
 
 def handle_consumer_task_result(task):
     """
@@ -96,18 +190,17 @@ async def shutdown_event():
     - Cancela las tareas de los consumidores.
     - Cierra la conexión al pool de Redis.
     """
-    # Cancelar todas las tareas de los consumidores
-    if hasattr(app.state, 'consumer_tasks'):
-        for task in app.state.consumer_tasks:
-            if not task.done():
-                task.cancel()
-        # Esperar a que todas las tareas se cancelen
-        await asyncio.gather(*app.state.consumer_tasks, return_exceptions=True)
+    # Cancelar la inicialización pendiente y las tareas de los consumidores
+    tasks = getattr(app.state, 'startup_tasks', []) + getattr(app.state, 'consumer_tasks', [])
+    for task in tasks:
+        if not task.done():
+            task.cancel()
+    # Esperar a que todas las tareas se cancelen
+    await asyncio.gather(*tasks, return_exceptions=True)
 
     if redis_connector.pool:
         await redis_connector.pool.disconnect()
 
-
     # Detener el productor de Kafka
     try:
         await kafka_producer.stop()
@@ -115,6 +208,9 @@ async def shutdown_event():
     except Exception as e:
         logging.error(f"Error stopping Kafka producer: {str(e)}")
 
+    # Exportar los spans pendientes
+    shutdown_tracing()
+
 
 if __name__ == "__main__":
     import uvicorn